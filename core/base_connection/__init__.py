@@ -1 +1,2 @@
-from .base_connection import BaseConnection
\ No newline at end of file
+from .base_connection import BaseConnection, ConnectionState
+from .startup import connect_all
@@ -1,13 +1,42 @@
 import asyncio
+import enum
+import random
+import time
 from abc import ABC, abstractmethod
 
 from ..loggers import log
 
 
+class ConnectionState(str, enum.Enum):
+	HEALTHY = 'healthy'
+	DEGRADED = 'degraded'  # Probes fail, the connection is still used
+	RECONNECTING = 'reconnecting'
+	DISCONNECTED = 'disconnected'  # Not set up or closed
+
+
 class BaseConnection(ABC):
+	"""
+	Process-wide connection, set up once and shared by the class and its subclasses.
+
+	After setup a background monitor probes the connection every 'probe_interval'
+	seconds. A failed probe marks it degraded, 'failure_threshold' failed probes
+	in a row make the monitor reconnect with jittered exponential backoff.
+	'get_connection' only reads the connection, it never probes nor reconnects.
+	"""
 	_connection: None = None
 	_url: str | None = None
 	_name: str | None = None
+	_state: ConnectionState = ConnectionState.DISCONNECTED
+	_state_since: float | None = None
+	_monitor: asyncio.Task | None = None
+
+	connect_backoff: float = 0.25
+	connect_max_backoff: float = 10.0
+	probe_interval: float = 5.0
+	probe_timeout: float = 2.0
+	failure_threshold: int = 3
+	reconnect_backoff: float = 0.5
+	reconnect_max_backoff: float = 30.0
 
 	@classmethod
 	async def validate_url(cls, url: str):
@@ -19,25 +48,50 @@ class BaseConnection(ABC):
 		return url
 
 	@classmethod
-	async def setup_connection(cls, url: str | None = None, max_attempts: int = 10) -> None:
+	async def setup_connection(
+			cls,
+			url: str | None = None,
+			max_attempts: int = 10,
+			deadline: float | None = None,
+	) -> int:
+		"""
+		Connects, retrying with jittered exponential backoff, and starts the health monitor.
+		Gives up after 'max_attempts' or at 'deadline' (loop time). Returns the attempts made.
+		"""
 		cls._url = await cls.validate_url(url)
-		for attempt in range(1, max_attempts + 1):
+		loop = asyncio.get_running_loop()
+		attempt = 0
+		while True:
+			attempt += 1
 			try:
 				await cls._connect(url)
-				connection = await cls._check_connection()
-				if connection:
+				if await cls._check_connection():
 					log.info(f"Successfully connected to {cls._name}")
 					break
+
+				error = "connection check failed"
 			except Exception as e:
-				log.warning(
-					f"[{attempt}/{max_attempts}] "
-					f"Failed to connect to {cls._name}: {e} "
-					f"Retrying in 5 seconds...")
-				await asyncio.sleep(5)
+				error = e
 
-		if not cls._connection:
-			log.error(f"Exceeded max connection attempts to {cls._name}")
-			raise ConnectionError(f"Could not connect to {cls._name} after several attempts")
+			delay = cls._backoff_delay(attempt, cls.connect_backoff, cls.connect_max_backoff)
+			if attempt >= max_attempts or (deadline is not None and loop.time() + delay >= deadline):
+				log.error(f"Failed to connect to {cls._name} after {attempt} attempt(s): {error}")
+				raise ConnectionError(f"Could not connect to {cls._name} after {attempt} attempt(s)")
+
+			log.warning(
+				f"[{attempt}/{max_attempts}] "
+				f"Failed to connect to {cls._name}: {error} "
+				f"Retrying in {delay:.2f} seconds...")
+			await asyncio.sleep(delay)
+
+		cls._set_state(ConnectionState.HEALTHY)
+		cls.start_monitor()
+		return attempt
+
+	@staticmethod
+	def _backoff_delay(attempt: int, base: float, cap: float) -> float:
+		""" Full jitter: uniform in [0, base * 2^attempt], so restarted processes don't retry in lockstep """
+		return random.uniform(0, min(cap, base * 2 ** attempt))
 
 	@classmethod
 	@abstractmethod
@@ -51,20 +105,98 @@ class BaseConnection(ABC):
 
 	@classmethod
 	async def get_connection(cls):
-		connection_established = await cls._check_connection()
-		if not connection_established:
-			log.warning(f"No connection to {cls._name}. Retrying to connect...")
-			await cls.setup_connection(cls._url)
-			# if cls._url is None:
-			# 	error = (f"No url provided for connection to {cls._name} "
-			# 			 f"(Probably wasn't connected at app startup)")
-			# 	log.error(error)
-			# 	raise ValueError(error)
-
-			return cls._connection
+		if cls._connection is None:
+			raise ConnectionError(f"No connection to {cls._name} (it wasn't set up at startup)")
 
 		return cls._connection
 
+	@classmethod
+	def get_state(cls) -> ConnectionState:
+		""" State cached by the health monitor """
+		return cls._state
+
+	@classmethod
+	def health(cls) -> dict:
+		since = cls._state_since
+		return {
+			'state': cls._state.value,
+			'for_seconds': round(time.monotonic() - since, 1) if since is not None else None,
+		}
+
+	@classmethod
+	def _set_state(cls, state: ConnectionState) -> None:
+		if state == cls._state:
+			return
+
+		if state in (ConnectionState.DEGRADED, ConnectionState.RECONNECTING):
+			log.warning(f"{cls._name} connection is {state.value}")
+		else:
+			log.info(f"{cls._name} connection is {state.value}")
+
+		cls._state = state
+		cls._state_since = time.monotonic()
+
+	@classmethod
+	def start_monitor(cls) -> None:
+		if cls._monitor is None or cls._monitor.done():
+			cls._monitor = asyncio.create_task(cls._monitor_health(), name=f'{cls._name} health monitor')
+
+	@classmethod
+	async def stop_monitor(cls) -> None:
+		monitor, cls._monitor = cls._monitor, None
+		if monitor is not None and not monitor.done():
+			monitor.cancel()
+			try:
+				await monitor
+			except asyncio.CancelledError:
+				pass
+
+		cls._set_state(ConnectionState.DISCONNECTED)
+
+	@classmethod
+	async def _probe(cls) -> bool:
+		try:
+			return await asyncio.wait_for(cls._check_connection(), cls.probe_timeout)
+		except Exception as e:
+			log.debug(f"{cls._name} probe failed: {e}")
+			return False
+
+	@classmethod
+	async def _monitor_health(cls) -> None:
+		failures = 0
+		while True:
+			await asyncio.sleep(cls.probe_interval)
+			if await cls._probe():
+				failures = 0
+				cls._set_state(ConnectionState.HEALTHY)
+				continue
+
+			failures += 1
+			if failures < cls.failure_threshold:
+				cls._set_state(ConnectionState.DEGRADED)
+				continue
+
+			cls._set_state(ConnectionState.RECONNECTING)
+			await cls._reconnect()
+			failures = 0
+			cls._set_state(ConnectionState.HEALTHY)
+
+	@classmethod
+	async def _reconnect(cls) -> None:
+		""" Reconnects until it succeeds, with jittered exponential backoff between attempts """
+		attempt = 0
+		while True:
+			attempt += 1
+			try:
+				await cls._connect(cls._url)
+				if await cls._probe():
+					log.info(f"Reconnected to {cls._name} after {attempt} attempt(s)")
+					return
+			except Exception as e:
+				log.warning(f"[{attempt}] Failed to reconnect to {cls._name}: {e}")
+
+			await asyncio.sleep(cls._backoff_delay(attempt, cls.reconnect_backoff, cls.reconnect_max_backoff))
+
 	@classmethod
 	@abstractmethod
 	async def disconnect(cls) -> None:
@@ -0,0 +1,24 @@
+from typing import Type
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from .base_connection import BaseConnection, ConnectionState
+
+READY_STATES = (ConnectionState.HEALTHY, ConnectionState.DEGRADED)
+
+
+def readiness_router(*connections: Type[BaseConnection], path: str = '/health/ready') -> APIRouter:
+	"""
+	Readiness endpoint reporting the state cached by the connections' health monitors,
+	503 while any of them is reconnecting or disconnected. It sends no probe itself.
+	"""
+	router = APIRouter(tags=['health'])
+
+	@router.get(path, include_in_schema=False)
+	async def readiness() -> JSONResponse:
+		report = {connection._name: connection.health() for connection in connections}
+		ready = all(connection.get_state() in READY_STATES for connection in connections)
+		return JSONResponse(report, status_code=200 if ready else 503)
+
+	return router
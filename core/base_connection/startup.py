@@ -0,0 +1,45 @@
+import asyncio
+import time
+from typing import Type
+
+from .base_connection import BaseConnection
+from ..loggers import log
+
+
+async def connect_all(*connections: tuple[Type[BaseConnection], str | None], timeout: float = 60.0) -> None:
+	"""
+	Sets up the connections concurrently, each retrying with its own jittered backoff,
+	all of them within 'timeout' seconds. Logs how long each one took.
+
+		await connect_all((CacheConnection, settings.redis_url), (MessagingConnection, settings.rabbitmq_url))
+
+	Raises ConnectionError if any of them failed or missed the deadline.
+	"""
+	loop = asyncio.get_running_loop()
+	deadline = loop.time() + timeout
+	report: dict[str, str] = {}
+
+	async def connect(connection: Type[BaseConnection], url: str | None) -> None:
+		start = time.perf_counter()
+		try:
+			attempts = await connection.setup_connection(url, deadline=deadline)
+			report[connection._name] = f"connected in {time.perf_counter() - start:.2f}s ({attempts} attempt(s))"
+		except BaseException as e:
+			outcome = 'timed out' if isinstance(e, asyncio.CancelledError) else f'failed ({e})'
+			report[connection._name] = f"{outcome} after {time.perf_counter() - start:.2f}s"
+			raise
+
+	start = time.perf_counter()
+	try:
+		async with asyncio.timeout_at(deadline):
+			async with asyncio.TaskGroup() as group:
+				for connection, url in connections:
+					group.create_task(connect(connection, url))
+	except (TimeoutError, ExceptionGroup) as e:
+		log.error(f"Startup connections failed after {time.perf_counter() - start:.2f}s: {report}")
+		raise ConnectionError(f"Could not connect to all dependencies: {report}") from e
+
+	log.info(
+		f"Startup connections ready in {time.perf_counter() - start:.2f}s: "
+		+ ', '.join(f"{name} {outcome}" for name, outcome in report.items())
+	)
@@ -1,2 +1,2 @@
 from .crud import RetrieverCRUD, ListCRUD, CreatorCRUD, UpdaterCRUD, DeleterCRUD
-
+from .unit_of_work import UnitOfWork
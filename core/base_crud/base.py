@@ -1,13 +1,18 @@
+import enum
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Type, Sequence, Any
+from typing import TypeVar, Generic, Type, Sequence, Any, Callable, Iterable
 
 from pydantic import BaseModel
-from sqlalchemy import Select, Update, Delete, RowMapping, select, and_, Insert, insert, update, delete, inspect
+from sqlalchemy import Select, Update, Delete, RowMapping, select, and_, Insert, insert, update, delete, inspect, \
+	bindparam, Executable, Integer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.cache import ETagCache
 from core.db import Base
 from core.loggers import log
-from exceptions import RecordNotUniqueCRUDException
+from core.utils import serializers
+from exceptions import RecordNotUniqueCRUDException, StaleRecordCRUDException
+from .unit_of_work import UnitOfWork
 
 M = TypeVar('M', bound=Base)  # SQLAlchemy model
 S = TypeVar('S', bound=BaseModel)  # Pydantic schema
@@ -15,9 +20,21 @@ RS = TypeVar('RS', bound=BaseModel)  # Pydantic return schema
 CS = TypeVar('CS', bound=BaseModel)  # Pydantic create schema
 US = TypeVar('US', bound=BaseModel)  # Pydantic update schema
 
+LOOKUP_PARAM = 'lookup_value'
+VERSION_PARAM = 'expected_version'
+AFTER_PARAM = 'after_value'
+LIMIT_PARAM = 'limit'
+MAX_QUERY_PARAMS = 32_767  # Postgres protocol limit of bound parameters per statement
+
 
 class BaseCRUD(Generic[M], ABC):
 	model: Type[M] | None = None
+	cache_statements: bool = True  # Set to False if statements depend on instance state
+	_stmt_cache: dict[str, Executable] = {}
+
+	def __init_subclass__(cls, **kwargs) -> None:
+		super().__init_subclass__(**kwargs)
+		cls._stmt_cache = {}
 
 	def __init__(self, db: AsyncSession) -> None:
 		self.__validate_attr_model()
@@ -27,6 +44,23 @@ class BaseCRUD(Generic[M], ABC):
 		if not self.model:
 			raise AttributeError('Model cannot be None')
 
+	def _get_cached_stmt(self, key: str, build: Callable[[], Executable]) -> Executable:
+		"""
+		Returns the statement built once per CRUD class.
+
+		Per-call values must be passed as bound parameters on execution,
+		so the statement (and its compiled form in SQLAlchemy's
+		compiled cache) can be reused by every call.
+		"""
+		if not self.cache_statements:
+			return build()
+
+		stmt = self._stmt_cache.get(key)
+		if stmt is None:
+			stmt = self._stmt_cache[key] = build()
+
+		return stmt
+
 	@abstractmethod
 	def _get_stmt(self) -> Select | Insert | Update | Delete:
 		raise NotImplementedError
@@ -38,6 +72,14 @@ class BaseCRUD(Generic[M], ABC):
 
 class SchemaCRUD(BaseCRUD[M], Generic[M, RS], ABC):
 	schema: Type[RS] | None = None
+	trusted_source: bool = False  # Rows come from our own db, skip schema validation
+	_schema_fields: tuple | None = None
+
+	def __init_subclass__(cls, **kwargs) -> None:
+		super().__init_subclass__(**kwargs)
+		cls._schema_fields = None
+		if cls.model is not None and cls.schema is not None:
+			cls._schema_fields = cls.__get_schema_fields(cls.model, cls.schema)
 
 	def __init__(self, db: AsyncSession) -> None:
 		self.__validate_attr_schema()
@@ -47,9 +89,42 @@ class SchemaCRUD(BaseCRUD[M], Generic[M, RS], ABC):
 		if not self.schema:
 			raise AttributeError('Schema cannot be None')
 
+	@staticmethod
+	def __get_schema_fields(model: Type[M], schema: Type[RS]) -> tuple:
+		schema_fields = schema.model_fields.keys()
+		return tuple(getattr(model, field) for field in schema_fields)
+
 	def _get_schema_fields(self) -> tuple:
-		schema_fields = self.schema.model_fields.keys()
-		return tuple(getattr(self.model, field) for field in schema_fields)
+		if self._schema_fields is None:
+			return self.__get_schema_fields(self.model, self.schema)
+
+		return self._schema_fields
+
+	@classmethod
+	def _to_schema(cls, row: RowMapping) -> RS:
+		if cls.trusted_source:
+			return cls.schema.model_construct(**row)
+
+		return cls.schema(**row)
+
+	@classmethod
+	def _to_schemas(cls, rows: Sequence[RowMapping]) -> list[RS]:
+		if cls.trusted_source:
+			construct = cls.schema.model_construct
+			return [construct(**row) for row in rows]
+
+		return [cls.schema(**row) for row in rows]
+
+	@staticmethod
+	def _to_json(rows: RowMapping | Sequence[RowMapping]) -> bytes:
+		"""
+		Encodes rows straight to JSON bytes, without building schema objects.
+		Selected columns are the schema fields, so the output matches the schema.
+		"""
+		if isinstance(rows, RowMapping):
+			return serializers.dumps_row(rows)
+
+		return serializers.dumps_rows(rows)
 
 
 class ReturningCRUD(SchemaCRUD[M, RS], ABC):
@@ -59,6 +134,34 @@ class ReturningCRUD(SchemaCRUD[M, RS], ABC):
 		return stmt.returning(*returning_fields)
 
 
+class StampCRUD(BaseCRUD[M], ABC):
+	"""
+	Invalidates the ETag stamps of the rows it writes, if 'etag_cache' is set.
+	Stamps are keyed by the string of the rows' 'etag_key_field' value.
+	Inside a UnitOfWork they are invalidated once it has committed.
+	"""
+	etag_cache: Type[ETagCache] | None = None
+	etag_key_field: str = 'id'
+
+	async def _invalidate_stamps(self, keys: Iterable[Any]) -> None:
+		if self.etag_cache is None:
+			return
+
+		keys = [str(key) for key in keys]
+		if not keys:
+			return
+
+		unit_of_work = UnitOfWork.get_active(self.db)
+		if unit_of_work is not None:
+			unit_of_work.defer_invalidation(self.etag_cache, keys)
+			return
+
+		await self.etag_cache.invalidate_many(keys)
+
+	async def _invalidate_row_stamps(self, rows: Iterable[RowMapping]) -> None:
+		await self._invalidate_stamps(row[self.etag_key_field] for row in rows)
+
+
 class LookupCRUD(BaseCRUD[M], ABC):
 	lookup_field: str = 'id'
 
@@ -77,8 +180,13 @@ class LookupCRUD(BaseCRUD[M], ABC):
 				f"Model: <{self.model.__name__}> has no field: <{self.lookup_field}>"
 			)
 
-	def _apply_lookup(self, stmt, lookup_value) -> Select | Update | Delete:
-		return stmt.where(getattr(self.model, self.lookup_field) == lookup_value)
+	def _apply_lookup(self, stmt) -> Select | Update | Delete:
+		lookup_column = getattr(self.model, self.lookup_field)
+		return stmt.where(lookup_column == bindparam(LOOKUP_PARAM))
+
+	@staticmethod
+	def _get_lookup_params(lookup_value: Any) -> dict:
+		return {LOOKUP_PARAM: lookup_value}
 
 
 class FilterCRUD(BaseCRUD[M], ABC):
@@ -86,7 +194,112 @@ class FilterCRUD(BaseCRUD[M], ABC):
 		return stmt
 
 
+class KeysetCRUD(BaseCRUD[M], ABC):
+	"""
+	Keyset pagination: rows are ordered by 'order_field' and a page
+	starts after the last value of the previous one.
+	"""
+	order_field: str | None = None
+
+	def __init__(self, db: AsyncSession) -> None:
+		self.__validate_models_order_field()
+		super().__init__(db)
+
+	def __validate_models_order_field(self) -> None:
+		if self.order_field is None:
+			return
+
+		if not hasattr(self.model, self.order_field):
+			raise AttributeError(
+				f"Model: <{self.model.__name__}> has no field: <{self.order_field}>"
+			)
+
+	def _get_order_column(self):
+		if self.order_field is None:
+			raise AttributeError(f"{self.__class__.__name__}: 'order_field' is not set")
+
+		return getattr(self.model, self.order_field)
+
+	def _apply_order(self, stmt: Select) -> Select:
+		if self.order_field is None:
+			return stmt
+
+		return stmt.order_by(self._get_order_column())
+
+	def _apply_keyset(self, stmt: Select, with_after: bool = False, with_limit: bool = False) -> Select:
+		if with_after:
+			stmt = stmt.where(self._get_order_column() > bindparam(AFTER_PARAM))
+
+		if with_limit:
+			stmt = stmt.limit(bindparam(LIMIT_PARAM, type_=Integer))
+
+		return stmt
+
+	@staticmethod
+	def _get_keyset_params(after: Any = None, limit: int | None = None) -> dict:
+		params = {}
+		if after is not None:
+			params[AFTER_PARAM] = after
+
+		if limit is not None:
+			params[LIMIT_PARAM] = limit
+
+		return params
+
+
+class VersionCRUD(BaseCRUD[M], ABC):
+	"""
+	Optimistic concurrency control: 'version_field' is an integer column
+	bumped by every update, an update can require the version it has read.
+	"""
+	version_field: str | None = None
+
+	def __init__(self, db: AsyncSession) -> None:
+		self.__validate_models_version_field()
+		super().__init__(db)
+
+	def __validate_models_version_field(self) -> None:
+		if self.version_field is None:
+			return
+
+		if not hasattr(self.model, self.version_field):
+			raise AttributeError(
+				f"Model: <{self.model.__name__}> has no field: <{self.version_field}>"
+			)
+
+	def _get_version_column(self):
+		if self.version_field is None:
+			raise AttributeError(f"{self.__class__.__name__}: 'version_field' is not set")
+
+		return getattr(self.model, self.version_field)
+
+	def _apply_version_bump(self, stmt: Update) -> Update:
+		if self.version_field is None:
+			return stmt
+
+		version_column = self._get_version_column()
+		return stmt.values({version_column: version_column + 1})
+
+	def _apply_version_check(self, stmt: Update) -> Update:
+		version_column = self._get_version_column()
+		return stmt.where(version_column == bindparam(VERSION_PARAM))
+
+	@staticmethod
+	def _get_version_params(expected_version: int) -> dict:
+		return {VERSION_PARAM: expected_version}
+
+	def _raise_stale_record(self, lookup_value: Any, expected_version: int) -> None:
+		error_message = \
+			(f"Record was changed concurrently "
+			 f"for value: <{lookup_value}>, "
+			 f"expected version: <{expected_version}>, "
+			 f"in model: <{self.model.__name__}>")
+		log.warning(error_message)
+		raise StaleRecordCRUDException(error_message)
+
+
 class ValueCRUD(BaseCRUD[M], Generic[M, S], ABC):
+	bulk_chunk_size: int = 1_000
 
 	def _apply_values(self, stmt: Insert | Update, schema_obj: S) -> Insert | Update:
 		values = self._get_values(schema_obj)
@@ -95,6 +308,11 @@ class ValueCRUD(BaseCRUD[M], Generic[M, S], ABC):
 	def _get_values(self, schema_obj: S) -> dict:
 		return schema_obj.model_dump()
 
+	def _get_bulk_chunk_size(self, params_per_row: int, chunk_size: int | None = None) -> int:
+		""" Rows per statement, capped so the statement fits in the bound parameters limit """
+		chunk_size = chunk_size or self.bulk_chunk_size
+		return max(1, min(chunk_size, MAX_QUERY_PARAMS // max(params_per_row, 1)))
+
 
 class ValueCreateCRUD(ValueCRUD[M, CS], Generic[M, CS], ABC):
 
@@ -111,6 +329,50 @@ class ValueCreateCRUD(ValueCRUD[M, CS], Generic[M, CS], ABC):
 
 		return [obj.model_dump() for obj in schema_objs]
 
+	def _get_copy_records(self, schema_objs: Sequence[CS]) -> tuple[list[str], list[tuple]]:
+		"""
+		Returns column names and value tuples for COPY.
+
+		COPY only applies server-side defaults, so python-side column defaults
+		(e.g. 'default=uuid.uuid4') are evaluated here for the missing columns.
+		Enum members are passed by name, as SQLAlchemy's Enum type stores them.
+		"""
+		values = self._get_values(list(schema_objs))
+		if not values:
+			return [], []
+
+		defaults = {
+			column.name: column.default
+			for column in self.model.__table__.columns
+			if column.default is not None and column.name not in values[0]
+			and (column.default.is_scalar or column.default.is_callable)
+		}
+		columns = [*values[0].keys(), *defaults.keys()]
+		records = [
+			tuple(
+				self.__to_copy_value(value) for value in (
+					*row.values(),
+					*(self.__get_default_value(default) for default in defaults.values()),
+				)
+			)
+			for row in values
+		]
+		return columns, records
+
+	@staticmethod
+	def __get_default_value(default) -> Any:
+		if default.is_callable:
+			return default.arg(None)  # SQLAlchemy wraps callables to accept a context
+
+		return default.arg
+
+	@staticmethod
+	def __to_copy_value(value: Any) -> Any:
+		if isinstance(value, enum.Enum):
+			return value.name
+
+		return value
+
 
 class ValueUpdateCRUD(ValueCRUD[M, US], Generic[M, US], ABC):
 	partial_update: bool = False
@@ -1,98 +1,595 @@
-from typing import Any, Sequence
-from sqlalchemy import Select, Insert, Update, Delete, select, RowMapping, insert, update, delete
+import asyncio
+import inspect
+import json
+import time
+from itertools import islice
+from typing import Any, Sequence, Iterable, Callable, Awaitable, NamedTuple
+from sqlalchemy import Select, Insert, Update, Delete, select, RowMapping, insert, update, delete, \
+	table, column, text, values, bindparam, tuple_, Integer, func
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import CompileError
 
+from core.db import get_driver_connection, REPLICA_OPTION
+from core.db.db_config import ReadOnlySessionLocal
+from core.loggers import log
 from .base import SchemaCRUD, M, RS, LookupCRUD, FilterCRUD, ReturningCRUD, CS, \
-	ValueCreateCRUD, ValueUpdateCRUD, US
+	ValueCreateCRUD, ValueUpdateCRUD, US, LOOKUP_PARAM, VersionCRUD, KeysetCRUD, StampCRUD
+from .unit_of_work import UnitOfWork
+
+BATCH_SIZE_PARAM = 'batch_size'
+TABLE_NAME_PARAM = 'table_name'
+
+
+class Count(NamedTuple):
+	total: int
+	exact: bool  # False for planner estimates
 
 
 class RetrieverCRUD(SchemaCRUD[M, RS], LookupCRUD[M]):
 
 	def _get_stmt(self) -> Select:
 		fields = self._get_schema_fields()
-		return select(*fields)
+		return select(*fields).execution_options(**{REPLICA_OPTION: True})
 
-	async def _execute_stmt(self, stmt: Select) -> RowMapping:
-		result = await self.db.execute(stmt)
+	def _get_retrieve_stmt(self) -> Select:
+		stmt = self._get_stmt()
+		return self._apply_lookup(stmt)
+
+	async def _execute_stmt(self, stmt: Select, params: dict | None = None) -> RowMapping:
+		result = await self.db.execute(stmt, params)
 		return result.mappings().one_or_none()
 
 	async def retrieve(self, lookup_value: Any) -> RS | None:
-		stmt = self._get_stmt()
-		stmt = self._apply_lookup(stmt, lookup_value)
-		row = await self._execute_stmt(stmt)
-		return self.schema(**row)
+		row = await self._retrieve_row(lookup_value)
+		return self._to_schema(row) if row else None
 
+	async def retrieve_json(self, lookup_value: Any) -> bytes | None:
+		row = await self._retrieve_row(lookup_value)
+		return self._to_json(row) if row else None
 
-class ListCRUD(SchemaCRUD[M, RS], LookupCRUD[M], FilterCRUD[M]):
+	async def _retrieve_row(self, lookup_value: Any) -> RowMapping | None:
+		stmt = self._get_cached_stmt('retrieve', self._get_retrieve_stmt)
+		params = self._get_lookup_params(lookup_value)
+		return await self._execute_stmt(stmt, params)
+
+
+class ListCRUD(SchemaCRUD[M, RS], LookupCRUD[M], FilterCRUD[M], KeysetCRUD[M]):
+	"""
+	'count_strategy' sets how 'count' gets the total:
+		'exact' - SELECT count(*) every time;
+		'estimated' - planner estimate (pg_class.reltuples without filters,
+			the EXPLAIN row estimate with them), exact below 'count_exact_threshold';
+		'cached' - 'estimated' kept in process for 'count_cache_ttl' seconds,
+			a stale total is returned while it's refreshed in the background,
+			cached totals are never reported as exact.
+	"""
+	count_strategy: str = 'exact'
+	count_exact_threshold: int = 10_000
+	count_cache_ttl: float = 60.0
+	_count_cache: dict[Any, tuple[Count, float]] = {}
+	_count_refreshing: dict[Any, asyncio.Task] = {}
+
+	def __init_subclass__(cls, **kwargs) -> None:
+		super().__init_subclass__(**kwargs)
+		cls._count_cache = {}
+		cls._count_refreshing = {}
 
 	def _get_stmt(self) -> Select:
 		fields = self._get_schema_fields()
-		return select(*fields)
+		return select(*fields).execution_options(**{REPLICA_OPTION: True})
 
-	async def _execute_stmt(self, stmt: Select) -> Sequence[RowMapping]:
-		result = await self.db.execute(stmt)
+	def _get_list_stmt(self, with_lookup: bool = False, with_after: bool = False, with_limit: bool = False) -> Select:
+		stmt = self._get_stmt()
+		if with_lookup:
+			stmt = self._apply_lookup(stmt)
+
+		stmt = self._apply_filters(stmt)
+		stmt = self._apply_order(stmt)
+		return self._apply_keyset(stmt, with_after, with_limit)
+
+	async def _execute_stmt(self, stmt: Select, params: dict | None = None) -> Sequence[RowMapping]:
+		result = await self.db.execute(stmt, params)
 		return result.mappings().all()
 
-	async def get_list(self, lookup_value: Any) -> list[RS]:
+	async def get_list(self, lookup_value: Any = None, after: Any = None, limit: int | None = None) -> list[RS]:
+		rows = await self.get_list_rows(lookup_value, after, limit)
+		return self._to_schemas(rows)
+
+	async def get_list_json(self, lookup_value: Any = None, after: Any = None, limit: int | None = None) -> bytes:
+		rows = await self.get_list_rows(lookup_value, after, limit)
+		return self._to_json(rows)
+
+	async def get_list_rows(
+			self,
+			lookup_value: Any = None,
+			after: Any = None,
+			limit: int | None = None,
+	) -> Sequence[RowMapping]:
+		"""
+		Rows of the list, optionally a keyset page: 'limit' rows
+		ordered by 'order_field' with values greater than 'after'.
+		"""
+		if after is not None:
+			self._get_order_column()  # Keyset paging needs 'order_field'
+
+		with_lookup, with_after, with_limit = lookup_value is not None, after is not None, limit is not None
+		key = 'list' + '_lookup' * with_lookup + '_after' * with_after + '_limit' * with_limit
+		stmt = self._get_cached_stmt(key, lambda: self._get_list_stmt(with_lookup, with_after, with_limit))
+		params = self._get_keyset_params(after, limit)
+		if with_lookup:
+			params.update(self._get_lookup_params(lookup_value))
+
+		return await self._execute_stmt(stmt, params or None)
+
+	async def count(self, lookup_value: Any = None) -> Count:
+		if self.count_strategy == 'cached':
+			return await self._cached_count(lookup_value)
+
+		if self.count_strategy == 'estimated':
+			return await self._estimated_count(lookup_value)
+
+		return await self._exact_count(lookup_value)
+
+	def _get_count_base_stmt(self, with_lookup: bool = False) -> Select:
 		stmt = self._get_stmt()
-		stmt = self._apply_lookup(stmt, lookup_value)
-		stmt = self._apply_filters(stmt)
-		rows = await self._execute_stmt(stmt)
-		return [self.schema(**row) for row in rows]
+		if with_lookup:
+			stmt = self._apply_lookup(stmt)
+
+		return self._apply_filters(stmt)
 
+	def _get_count_stmt(self, with_lookup: bool = False) -> Select:
+		subquery = self._get_count_base_stmt(with_lookup).subquery()
+		return select(func.count()).select_from(subquery).execution_options(**{REPLICA_OPTION: True})
 
-class CreatorCRUD(ReturningCRUD[M, RS], ValueCreateCRUD[M, CS]):
+	async def _exact_count(self, lookup_value: Any = None) -> Count:
+		with_lookup = lookup_value is not None
+		key = 'count_lookup' if with_lookup else 'count'
+		stmt = self._get_cached_stmt(key, lambda: self._get_count_stmt(with_lookup))
+		params = self._get_lookup_params(lookup_value) if with_lookup else None
+		result = await self.db.execute(stmt, params)
+		return Count(result.scalar_one(), exact=True)
+
+	async def _estimated_count(self, lookup_value: Any = None) -> Count:
+		with_lookup = lookup_value is not None
+		stmt = self._get_count_base_stmt(with_lookup)
+		if stmt.whereclause is None:
+			estimate = await self._table_estimate()
+		else:
+			params = self._get_lookup_params(lookup_value) if with_lookup else {}
+			estimate = await self._plan_estimate(stmt, params)
+
+		if estimate is None or estimate < self.count_exact_threshold:
+			return await self._exact_count(lookup_value)
+
+		return Count(estimate, exact=False)
+
+	async def _table_estimate(self) -> int | None:
+		""" Row count from the last ANALYZE, None if the table was never analyzed """
+		stmt = self._get_cached_stmt('count_reltuples', lambda: text(
+			f"SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:{TABLE_NAME_PARAM} AS regclass)"
+		).execution_options(**{REPLICA_OPTION: True}))
+		result = await self.db.execute(stmt, {TABLE_NAME_PARAM: self.model.__table__.fullname})
+		estimate = result.scalar_one_or_none()
+		return estimate if estimate is not None and estimate >= 0 else None
+
+	async def _plan_estimate(self, stmt: Select, params: dict) -> int | None:
+		""" Planner's row estimate, None if the statement can't be rendered for EXPLAIN """
+		try:
+			# asyncpg's dialect, so '%' in literals isn't doubled for a pyformat driver
+			sql = stmt.params(params).compile(
+				dialect=asyncpg.dialect(),
+				compile_kwargs={'literal_binds': True},
+			)
+		except CompileError as e:
+			log.warning(f"{self.__class__.__name__}: can't estimate count, counting exactly: {e}")
+			return None
+
+		# Sent as is: text() would parse ':name' in the inlined literals as bind parameters.
+		# The connection is picked like a replica-safe read
+		read = stmt.execution_options(**{REPLICA_OPTION: True})
+		connection = await self.db.connection(bind_arguments={'clause': read})
+		result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+		plan = result.scalar_one()
+		if isinstance(plan, str):
+			plan = json.loads(plan)
+
+		return int(plan[0]['Plan']['Plan Rows'])
+
+	async def _cached_count(self, lookup_value: Any = None) -> Count:
+		cached = self._count_cache.get(lookup_value)
+		if cached is None:
+			count = await self._estimated_count(lookup_value)
+			self._count_cache[lookup_value] = (count, time.monotonic())
+			return count
+
+		count, fetched_at = cached
+		if time.monotonic() - fetched_at > self.count_cache_ttl and lookup_value not in self._count_refreshing:
+			self._count_refreshing[lookup_value] = asyncio.create_task(self._refresh_count(lookup_value))
+
+		return Count(count.total, exact=False)  # Rows may have changed since it was counted
+
+	async def _refresh_count(self, lookup_value: Any = None) -> None:
+		""" Runs in the background, after the request's session may be closed """
+		try:
+			async with ReadOnlySessionLocal() as db:
+				count = await self.__class__(db)._estimated_count(lookup_value)
+
+			self._count_cache[lookup_value] = (count, time.monotonic())
+		except Exception as e:
+			log.warning(f"{self.__class__.__name__}: count refresh failed: {e}")
+		finally:
+			self._count_refreshing.pop(lookup_value, None)
+
+
+class CreatorCRUD(ReturningCRUD[M, RS], ValueCreateCRUD[M, CS], StampCRUD[M]):
+	bulk_chunk_size: int = 5_000
 
 	def _get_stmt(self) -> Insert:
 		return insert(self.model)
 
+	def _get_create_stmt(self) -> Insert:
+		stmt = self._get_stmt()
+		return self._apply_returning(stmt)
+
 	async def _execute_stmt(self, stmt: Insert) -> Sequence[RowMapping]:
 		result = await self.db.execute(stmt)
 		return result.mappings().all()
 
 	async def create(self, schema_objs: CS | list[CS]) -> RS | list[RS]:
-		stmt = self._get_stmt()
+		stmt = self._get_cached_stmt('create', self._get_create_stmt)
 		stmt = self._apply_values(stmt, schema_objs)
-		stmt = self._apply_returning(stmt)
 		rows = await self._execute_stmt(stmt)
+		await self._invalidate_row_stamps(rows)
 		if len(rows) == 1:
-			return self.schema(**rows[0])
+			return self._to_schema(rows[0])
 
-		return [self.schema(**row) for row in rows]
+		return self._to_schemas(rows)
 
+	async def bulk_create(
+			self,
+			schema_objs: Iterable[CS],
+			returning: bool = False,
+			ignore_conflicts: bool = False,
+			chunk_size: int | None = None,
+	) -> int | list[RS]:
+		"""
+		Inserts rows with COPY, streamed in chunks of 'chunk_size' rows.
 
-class UpdaterCRUD(ReturningCRUD[M, RS], LookupCRUD[M], FilterCRUD[M], ValueUpdateCRUD[M, US]):
+		COPY can't return rows or skip conflicting ones, so with 'returning' or
+		'ignore_conflicts' each chunk is copied into a temp staging table and
+		moved to the model's table with INSERT ... SELECT.
 
-	def _get_stmt(self) -> Update:
-		return update(self.model)
+		Runs in the session's transaction, the caller commits.
+		Returns created rows if 'returning', else the number of created rows.
+		Stamps of the created rows are invalidated when they are returned, plain COPY
+		and skipped conflicts leave existing rows unchanged.
+		"""
+		chunk_size = chunk_size or self.bulk_chunk_size
+		staged = returning or ignore_conflicts
+		connection = await get_driver_connection(self.db, in_transaction=True)
+		model_table = self.model.__table__
 
-	async def _execute_stmt(self, stmt: Update) -> Sequence[RowMapping]:
-		result = await self.db.execute(stmt)
-		return result.mappings().all()
+		created_count = 0
+		created_rows = []
+		schema_objs = iter(schema_objs)
+		while chunk := list(islice(schema_objs, chunk_size)):
+			columns, records = self._get_copy_records(chunk)
+			if not staged:
+				status = await connection.copy_records_to_table(
+					model_table.name,
+					records=records,
+					columns=columns,
+					schema_name=model_table.schema,
+				)
+				created_count += int(status.split()[-1])  # Status is 'COPY <count>'
+				continue
+
+			staging_table = await self._create_staging_table()
+			await connection.copy_records_to_table(staging_table, records=records, columns=columns)
+			stmt = self._get_staged_insert_stmt(staging_table, columns, returning, ignore_conflicts)
+			result = await self.db.execute(stmt)
+			if returning:
+				rows = result.mappings().all()
+				await self._invalidate_row_stamps(rows)
+				created_rows.extend(self._to_schemas(rows))
+				created_count += len(rows)
+			else:
+				created_count += result.rowcount
+
+			await self._truncate_staging_table(staging_table)
+
+		return created_rows if returning else created_count
+
+	async def _create_staging_table(self) -> str:
+		model_table = self.model.__table__
+		staging_table = f"_staging_{model_table.name}"
+		preparer = self.db.get_bind().dialect.identifier_preparer
+		await self.db.execute(text(
+			f"CREATE TEMP TABLE IF NOT EXISTS {preparer.quote(staging_table)} "
+			f"(LIKE {preparer.format_table(model_table)} INCLUDING DEFAULTS) ON COMMIT DROP"
+		))
+		return staging_table
+
+	async def _truncate_staging_table(self, staging_table: str) -> None:
+		preparer = self.db.get_bind().dialect.identifier_preparer
+		await self.db.execute(text(f"TRUNCATE {preparer.quote(staging_table)}"))
 
-	async def update(self, lookup_value: str, schema_objs: CS | list[CS]) -> RS | list[RS]:
+	def _get_staged_insert_stmt(
+			self,
+			staging_table: str,
+			columns: list[str],
+			returning: bool,
+			ignore_conflicts: bool,
+	) -> Insert:
+		staging = table(staging_table, *(column(name) for name in columns))
+		stmt = pg_insert(self.model.__table__).from_select(columns, select(*staging.c))
+		if ignore_conflicts:
+			stmt = stmt.on_conflict_do_nothing()
+
+		if returning:
+			stmt = self._apply_returning(stmt)
+
+		return stmt
+
+
+class UpdaterCRUD(ReturningCRUD[M, RS], LookupCRUD[M], FilterCRUD[M], VersionCRUD[M],
+				  ValueUpdateCRUD[M, US], StampCRUD[M]):
+
+	def _get_stmt(self) -> Update:
+		# Lookup value is a bound parameter, session can't evaluate it
+		return update(self.model).execution_options(synchronize_session=False)
+
+	def _get_update_stmt(self, check_version: bool = False) -> Update:
 		stmt = self._get_stmt()
-		stmt = self._apply_lookup(stmt, lookup_value)
+		stmt = self._apply_lookup(stmt)
 		stmt = self._apply_filters(stmt)
+		if check_version:
+			stmt = self._apply_version_check(stmt)
+
+		stmt = self._apply_version_bump(stmt)
+		return self._apply_returning(stmt)
+
+	def _get_exists_stmt(self) -> Select:
+		stmt = select(getattr(self.model, self.lookup_field))
+		return self._apply_lookup(stmt)
+
+	async def _execute_stmt(self, stmt: Update, params: dict | None = None) -> Sequence[RowMapping]:
+		result = await self.db.execute(stmt, params)
+		return result.mappings().all()
+
+	async def update(
+			self,
+			lookup_value: str,
+			schema_objs: CS | list[CS],
+			expected_version: int | None = None,
+	) -> RS | list[RS]:
+		"""
+		With 'expected_version' only rows still at that version are updated
+		(needs 'version_field'). If the row exists but its version has changed,
+		raises StaleRecordCRUDException.
+		"""
+		params = self._get_lookup_params(lookup_value)
+		if expected_version is None:
+			stmt = self._get_cached_stmt('update', self._get_update_stmt)
+		else:
+			stmt = self._get_cached_stmt(
+				'update_versioned', lambda: self._get_update_stmt(check_version=True)
+			)
+			params.update(self._get_version_params(expected_version))
+
 		stmt = self._apply_values(stmt, schema_objs)
-		stmt = self._apply_returning(stmt)
-		rows = await self._execute_stmt(stmt)
+		rows = await self._execute_stmt(stmt, params)
+		await self._invalidate_row_stamps(rows)
+		if not rows and expected_version is not None:
+			if await self._exists(lookup_value):
+				self._raise_stale_record(lookup_value, expected_version)
+
 		if len(rows) == 1:
-			return self.schema(**rows[0])
+			return self._to_schema(rows[0])
+
+		return self._to_schemas(rows)
+
+	async def _exists(self, lookup_value: Any) -> bool:
+		stmt = self._get_cached_stmt('exists', self._get_exists_stmt)
+		params = self._get_lookup_params(lookup_value)
+		result = await self.db.execute(stmt, params)
+		return result.first() is not None
+
+	async def bulk_update(
+			self,
+			items: Iterable[tuple[Any, US]],
+			chunk_size: int | None = None,
+	) -> list[RS]:
+		"""
+		Updates many rows with different values, 'items' are (lookup_value, schema_obj) pairs.
+
+		Rows are updated by chunks with one UPDATE ... FROM (VALUES ...) per chunk,
+		joined on 'lookup_field'. With 'partial_update' items are grouped
+		by their set of fields, each group gets its own statements.
+		"""
+		groups: dict[tuple[str, ...], list[tuple]] = {}
+		for lookup_value, schema_obj in items:
+			obj_values = self._get_values(schema_obj)
+			groups.setdefault(tuple(obj_values), []).append((lookup_value, *obj_values.values()))
+
+		updated = []
+		for fields, rows in groups.items():
+			size = self._get_bulk_chunk_size(len(fields) + 1, chunk_size)
+			for i in range(0, len(rows), size):
+				stmt = self._get_bulk_update_stmt(fields, rows[i:i + size])
+				updated.extend(await self._execute_stmt(stmt))
+
+		await self._invalidate_row_stamps(updated)
+		return self._to_schemas(updated)
+
+	def _get_bulk_update_stmt(self, fields: tuple[str, ...], rows: list[tuple]) -> Update:
+		model_table = self.model.__table__
+		lookup_column = model_table.c[self.lookup_field]
+		bulk_values = values(
+			column(LOOKUP_PARAM, lookup_column.type),
+			*(column(field, model_table.c[field].type) for field in fields),
+			name='bulk_values',
+		).data(rows)
+
+		stmt = self._get_stmt()
+		stmt = stmt.where(getattr(self.model, self.lookup_field) == bulk_values.c[LOOKUP_PARAM])
+		stmt = self._apply_filters(stmt)
+		stmt = self._apply_version_bump(stmt)
+		stmt = stmt.values({field: bulk_values.c[field] for field in fields})
+		return self._apply_returning(stmt)
 
-		return [self.schema(**row) for row in rows]
+	async def upsert(
+			self,
+			schema_objs: Iterable[US],
+			conflict_fields: Sequence[str] | None = None,
+			chunk_size: int | None = None,
+	) -> list[RS]:
+		"""
+		Inserts rows or updates them on conflict on 'conflict_fields'
+		(default is 'lookup_field'), with one INSERT ... ON CONFLICT DO UPDATE per chunk.
 
+		'conflict_fields' must match a unique index or constraint.
+		Rows that conflict and have no other fields to set are left unchanged
+		and are not returned.
+		"""
+		conflict_fields = tuple(conflict_fields or (self.lookup_field,))
+		groups: dict[tuple[str, ...], list[dict]] = {}
+		for schema_obj in schema_objs:
+			obj_values = self._get_values(schema_obj)
+			groups.setdefault(tuple(obj_values), []).append(obj_values)
 
-class DeleterCRUD(LookupCRUD[M], FilterCRUD[M]):
+		# Python-side column defaults are bound too, count every column
+		size = self._get_bulk_chunk_size(len(self.model.__table__.columns), chunk_size)
+		upserted = []
+		for fields, rows in groups.items():
+			for i in range(0, len(rows), size):
+				stmt = self._get_upsert_stmt(fields, conflict_fields, rows[i:i + size])
+				upserted.extend(await self._execute_stmt(stmt))
+
+		await self._invalidate_row_stamps(upserted)
+		return self._to_schemas(upserted)
+
+	def _get_upsert_stmt(
+			self,
+			fields: tuple[str, ...],
+			conflict_fields: tuple[str, ...],
+			rows: list[dict],
+	) -> Insert:
+		stmt = pg_insert(self.model).values(rows)
+		update_fields = [field for field in fields if field not in conflict_fields]
+		if update_fields:
+			set_ = {field: stmt.excluded[field] for field in update_fields}
+			if self.version_field is not None:
+				version_column = self.model.__table__.c[self.version_field]
+				set_[self.version_field] = version_column + 1
+
+			stmt = stmt.on_conflict_do_update(index_elements=conflict_fields, set_=set_)
+		else:
+			stmt = stmt.on_conflict_do_nothing(index_elements=conflict_fields)
+
+		return self._apply_returning(stmt)
+
+
+class DeleterCRUD(LookupCRUD[M], FilterCRUD[M], StampCRUD[M]):
 
 	def _get_stmt(self) -> Delete:
-		return delete(self.model)
+		# Lookup value is a bound parameter, session can't evaluate it
+		return delete(self.model).execution_options(synchronize_session=False)
 
-	async def _execute_stmt(self, stmt: Delete) -> int:
-		result = await self.db.execute(stmt)
+	def _get_destroy_stmt(self) -> Delete:
+		stmt = self._get_stmt()
+		stmt = self._apply_lookup(stmt)
+		return self._apply_filters(stmt)
+
+	async def _execute_stmt(self, stmt: Delete, params: dict | None = None) -> int:
+		result = await self.db.execute(stmt, params)
 		return result.rowcount
 
 	async def destroy(self, lookup_value: str) -> int:
+		stmt = self._get_cached_stmt('destroy', self._get_destroy_stmt)
+		params = self._get_lookup_params(lookup_value)
+		deleted = await self._execute_stmt(stmt, params)
+		if deleted and self.lookup_field == self.etag_key_field:
+			await self._invalidate_stamps((lookup_value,))
+
+		return deleted
+
+	async def destroy_in_batches(
+			self,
+			lookup_value: Any = None,
+			batch_size: int = 1_000,
+			pause: float = 0.0,
+			on_progress: Callable[[int, int], Awaitable[None] | None] | None = None,
+	) -> int:
+		"""
+		Deletes matching rows in batches of 'batch_size' rows and commits after
+		each batch, so locks are held and WAL is written one batch at a time.
+
+		Without 'lookup_value' only filters select rows to delete.
+		'pause' is a delay in seconds between batches, 'on_progress' is called
+		after each batch with (deleted in batch, deleted in total).
+		Returns the total number of deleted rows.
+		"""
+		if UnitOfWork.get_active(self.db) is not None:
+			raise RuntimeError("'destroy_in_batches' commits each batch, it can't run in a unit of work")
+
+		if lookup_value is None:
+			stmt = self._get_cached_stmt('destroy_batch', self._get_destroy_batch_stmt)
+			params = {}
+		else:
+			stmt = self._get_cached_stmt(
+				'destroy_batch_lookup', lambda: self._get_destroy_batch_stmt(with_lookup=True)
+			)
+			params = self._get_lookup_params(lookup_value)
+
+		params[BATCH_SIZE_PARAM] = batch_size
+		total = 0
+		while True:
+			deleted = await self._destroy_batch(stmt, params)
+			total += deleted
+
+			if on_progress is not None:
+				progress = on_progress(deleted, total)
+				if inspect.isawaitable(progress):
+					await progress
+
+			if deleted < batch_size:
+				return total
+
+			if pause:
+				await asyncio.sleep(pause)
+
+	async def _destroy_batch(self, stmt: Delete, params: dict) -> int:
+		""" Deletes and commits one batch, then invalidates the stamps of the deleted rows """
+		if self.etag_cache is None:
+			deleted = await self._execute_stmt(stmt, params)
+			await self.db.commit()
+			return deleted
+
+		result = await self.db.execute(stmt, params)
+		keys = result.scalars().all()
+		await self.db.commit()
+		await self._invalidate_stamps(keys)
+		return len(keys)
+
+	def _get_destroy_batch_stmt(self, with_lookup: bool = False) -> Delete:
+		primary_key = sa_inspect(self.model).primary_key
+		batch = select(*primary_key)
+		if with_lookup:
+			batch = self._apply_lookup(batch)
+
+		batch = self._apply_filters(batch)
+		batch = batch.limit(bindparam(BATCH_SIZE_PARAM, type_=Integer))
+
 		stmt = self._get_stmt()
-		stmt = self._apply_lookup(stmt, lookup_value)
-		stmt = self._apply_filters(stmt)
-		return await self._execute_stmt(stmt)
+		if len(primary_key) == 1:
+			stmt = stmt.where(primary_key[0].in_(batch))
+		else:
+			stmt = stmt.where(tuple_(*primary_key).in_(batch))
+
+		if self.etag_cache is not None:
+			stmt = stmt.returning(self.model.__table__.c[self.etag_key_field])
+
+		return stmt
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import ETagCache
+from core.loggers import log
+
+UNIT_OF_WORK_KEY = 'unit_of_work'
+
+
+class UnitOfWork:
+	"""
+	Runs the writes of several CRUD objects sharing a session in one transaction
+	with one commit.
+
+		async with UnitOfWork(db) as uow:
+			user = await user_updater.change_password(user_id, hashed_password)
+			await session_deleter.destroy(user_id)
+			uow.after_commit(lambda: publisher.publish(user))
+
+	Writes are sent as they are awaited, in the session's transaction; the block
+	commits once on exit and rolls everything back if it raises.
+	ETag stamps the writes invalidate are collected and invalidated after the
+	commit, in one round trip per cache, so a read can't stamp the rows' content
+	from before the commit. 'after_commit' callbacks (e.g. publishing events)
+	run after that and only if the commit succeeded.
+
+	CRUD methods that commit by themselves ('destroy_in_batches') can't run inside.
+	"""
+
+	def __init__(self, db: AsyncSession) -> None:
+		self.db = db
+		self._stamps: dict[Type[ETagCache], set[str]] = {}
+		self._callbacks: list[Callable[[], Awaitable[Any]]] = []
+
+	@staticmethod
+	def get_active(db: AsyncSession) -> 'UnitOfWork | None':
+		return db.info.get(UNIT_OF_WORK_KEY)
+
+	def defer_invalidation(self, etag_cache: Type[ETagCache], keys: Iterable[str]) -> None:
+		self._stamps.setdefault(etag_cache, set()).update(keys)
+
+	def after_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+		self._callbacks.append(callback)
+
+	async def __aenter__(self) -> 'UnitOfWork':
+		if self.get_active(self.db) is not None:
+			raise RuntimeError("A unit of work is already active on this session")
+
+		self.db.info[UNIT_OF_WORK_KEY] = self
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+		try:
+			if exc_type is not None:
+				await self.db.rollback()
+				return
+
+			try:
+				await self.db.commit()
+			except Exception as e:
+				log.warning(f"Unit of work commit failed, rolling back: {e}")
+				await self.db.rollback()
+				raise
+		finally:
+			self.db.info.pop(UNIT_OF_WORK_KEY, None)
+
+		await asyncio.gather(*(
+			etag_cache.invalidate_many(sorted(keys)) for etag_cache, keys in self._stamps.items()
+		))
+		for callback in self._callbacks:
+			await callback()
@@ -0,0 +1,74 @@
+"""
+Benchmark of CRUD response building on a 10k-row list.
+
+Compares the default path (validated schema per row + FastAPI serialization)
+with the trusted-source path (`model_construct`) and with encoding the rows
+straight to JSON bytes.
+
+Run from the repository root:
+	python -m core.benchmarks.crud_serialization [rows] [repeat]
+"""
+import enum
+import sys
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, EmailStr
+
+from core.utils import serializers
+
+
+class RoleEnum(enum.Enum):
+	user = "user"
+	admin = "admin"
+
+
+class UserRead(BaseModel):
+	id: uuid.UUID
+	email: EmailStr
+	role: RoleEnum
+	is_active: bool
+	created_at: datetime
+
+
+def make_rows(count: int) -> list[dict]:
+	now = datetime.now(timezone.utc)
+	return [
+		{
+			'id': uuid.uuid4(),
+			'email': f'user{i}@example.com',
+			'role': RoleEnum.user,
+			'is_active': bool(i % 2),
+			'created_at': now,
+		}
+		for i in range(count)
+	]
+
+
+def validated(rows: list[dict]) -> bytes:
+	objs = [UserRead(**row) for row in rows]
+	return JSONResponse(jsonable_encoder(objs)).body
+
+
+def constructed(rows: list[dict]) -> bytes:
+	objs = [UserRead.model_construct(**row) for row in rows]
+	return JSONResponse(jsonable_encoder(objs)).body
+
+
+def raw_json(rows: list[dict]) -> bytes:
+	return serializers.dumps_rows(rows)
+
+
+def main(count: int = 10_000, repeat: int = 5) -> None:
+	rows = make_rows(count)
+	print(f"{count} rows, best of {repeat}")
+	for func in (validated, constructed, raw_json):
+		best = min(timeit.repeat(lambda: func(rows), number=1, repeat=repeat))
+		print(f"{func.__name__:<12} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+	main(*map(int, sys.argv[1:3]))
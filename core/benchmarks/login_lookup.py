@@ -0,0 +1,110 @@
+"""
+Benchmark of the login lookup: RetrieverCRUD vs PreparedQuery.
+
+Creates a scratch 'bench_login_users' table in the service's database,
+fills it, looks rows up by email through both paths and drops the table.
+
+Needs the service's settings, run it inside a service container:
+	python -m core.benchmarks.login_lookup [rows] [lookups]
+"""
+import asyncio
+import random
+import sys
+import time
+import uuid
+from typing import NamedTuple
+
+from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.base_crud import RetrieverCRUD
+from core.db import AsyncSessionLocal, PreparedQuery
+from core.db.db_config import engine
+
+
+class BenchBase(DeclarativeBase):
+	pass
+
+
+class BenchUser(BenchBase):
+	__tablename__ = 'bench_login_users'
+
+	id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+	email: Mapped[str] = mapped_column(unique=True)
+	hashed_password: Mapped[str]
+	is_active: Mapped[bool]
+	role: Mapped[str]
+
+
+class BenchLogin(BaseModel):
+	id: uuid.UUID
+	hashed_password: str
+	is_active: bool
+	role: str
+
+
+class BenchLoginRetriever(RetrieverCRUD):
+	model = BenchUser
+	schema = BenchLogin
+	lookup_field = 'email'
+
+
+class BenchLoginRecord(NamedTuple):
+	id: uuid.UUID
+	hashed_password: str
+	is_active: bool
+	role: str
+
+
+class BenchLoginQuery(PreparedQuery[BenchLoginRecord]):
+	name = 'bench_login_by_email'
+	query = 'SELECT id, hashed_password, is_active, role FROM bench_login_users WHERE email = $1'
+	record = BenchLoginRecord
+
+
+async def crud_lookup(db, email: str):
+	return await BenchLoginRetriever(db).retrieve(email)
+
+
+async def prepared_lookup(db, email: str):
+	return await BenchLoginQuery.fetchrow(db, email)
+
+
+async def measure(func, emails: list[str]) -> float:
+	async with AsyncSessionLocal() as db:
+		await func(db, emails[0])  # Warm up statement caches
+		start = time.perf_counter()
+		for email in emails:
+			await func(db, email)
+
+		return (time.perf_counter() - start) / len(emails)
+
+
+async def main(rows: int = 10_000, lookups: int = 5_000) -> None:
+	async with engine.begin() as conn:
+		await conn.run_sync(BenchBase.metadata.create_all)
+
+	try:
+		emails = [f'user{i}@example.com' for i in range(rows)]
+		async with AsyncSessionLocal() as db:
+			await db.execute(insert(BenchUser), [
+				{'email': email, 'hashed_password': 'x' * 97, 'is_active': True, 'role': 'user'}
+				for email in emails
+			])
+			await db.commit()
+
+		sample = random.choices(emails, k=lookups)
+		print(f"{rows} rows, {lookups} lookups")
+		for func in (crud_lookup, prepared_lookup):
+			per_lookup = await measure(func, sample)
+			print(f"{func.__name__:<16} {per_lookup * 1_000_000:8.1f} us/lookup")
+	finally:
+		async with engine.begin() as conn:
+			await conn.run_sync(BenchBase.metadata.drop_all)
+
+		await engine.dispose()
+
+
+if __name__ == "__main__":
+	asyncio.run(main(*map(int, sys.argv[1:3])))
@@ -1 +1,4 @@
-from .cache_connection import CacheConnection
\ No newline at end of file
+from .cache_connection import CacheConnection
+from .auto_pipeline import AutoPipeline
+from .etag import ETagCache, make_etag, etag_matches, not_modified, json_response_with_etag
+from .idempotency import IdempotencyMiddleware
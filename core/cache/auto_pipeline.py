@@ -0,0 +1,137 @@
+import asyncio
+import types
+
+from redis.asyncio import Redis
+from redis.commands.core import AsyncCoreCommands
+
+from ..loggers import log
+
+COMMANDS = frozenset(
+	name for name in dir(AsyncCoreCommands)
+	if not name.startswith('_') and callable(getattr(AsyncCoreCommands, name))
+)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class PipelineStats:
+	""" Sizes of the batches sent by an auto-pipeline """
+
+	def __init__(self) -> None:
+		self.batches = 0
+		self.commands = 0
+		self.max_size = 0
+		self.errors = 0
+		self.histogram = dict.fromkeys(BATCH_SIZE_BUCKETS, 0)  # Batches by size, up to the bucket
+		self.histogram['more'] = 0
+
+	def record(self, size: int) -> None:
+		self.batches += 1
+		self.commands += size
+		self.max_size = max(self.max_size, size)
+		bucket = next((bucket for bucket in BATCH_SIZE_BUCKETS if size <= bucket), 'more')
+		self.histogram[bucket] += 1
+
+	def snapshot(self) -> dict[str, int | float | dict]:
+		return {
+			'batches': self.batches,
+			'commands': self.commands,
+			'avg_size': round(self.commands / self.batches, 2) if self.batches else 0.0,
+			'max_size': self.max_size,
+			'errors': self.errors,
+			'histogram': {f'<={bucket}' if bucket != 'more' else f'>{BATCH_SIZE_BUCKETS[-1]}': count
+						  for bucket, count in self.histogram.items() if count},
+		}
+
+
+class AutoPipeline:
+	"""
+	Redis client wrapper sending the commands issued in the same event-loop
+	tick as one pipeline.
+
+	Command methods (get, set, hgetall, ...) are queued and return a future.
+	Once the running callbacks are done, the queued commands are sent in a
+	single non-transactional pipeline (at most 'max_batch' commands per
+	pipeline) and each reply or error is set on its caller's future.
+	Concurrent coroutines get one round trip per tick instead of one per command,
+	a lone command is sent as is. Anything else (pipeline, pubsub, close, ...)
+	goes to the wrapped client.
+	"""
+
+	def __init__(self, client: Redis, max_batch: int = 512) -> None:
+		self.client = client
+		self.max_batch = max_batch
+		self.stats = PipelineStats()
+		self._queue: list[tuple[tuple, dict, asyncio.Future]] = []
+		self._flushes: set[asyncio.Task] = set()
+
+	def __getattr__(self, name: str):
+		if name not in COMMANDS:
+			return getattr(self.client, name)
+
+		# The command builds its arguments and calls self.execute_command, which queues them
+		command = types.MethodType(getattr(Redis, name), self)
+		setattr(self, name, command)
+		return command
+
+	def execute_command(self, *args, **options) -> asyncio.Future:
+		loop = asyncio.get_running_loop()
+		future = loop.create_future()
+		if not self._queue:
+			loop.call_soon(self._flush)
+
+		self._queue.append((args, options, future))
+		return future
+
+	def _flush(self) -> None:
+		queue, self._queue = self._queue, []
+		for i in range(0, len(queue), self.max_batch):
+			task = asyncio.create_task(self._send(queue[i:i + self.max_batch]))
+			self._flushes.add(task)
+			task.add_done_callback(self._flushes.discard)
+
+	async def _send(self, batch: list[tuple[tuple, dict, asyncio.Future]]) -> None:
+		self.stats.record(len(batch))
+		try:
+			await self._send_batch(batch)
+		finally:
+			# A cancelled or crashed flush must not leave its callers waiting forever
+			for _, _, future in batch:
+				self._set_result(future, ConnectionError("Auto-pipeline flush did not complete"))
+
+	async def _send_batch(self, batch: list[tuple[tuple, dict, asyncio.Future]]) -> None:
+		if len(batch) == 1:
+			args, options, future = batch[0]
+			try:
+				self._set_result(future, await self.client.execute_command(*args, **options))
+			except Exception as e:
+				self._set_result(future, e)
+
+			return
+
+		try:
+			async with self.client.pipeline(transaction=False) as pipe:
+				for args, options, _ in batch:
+					pipe.execute_command(*args, **options)
+
+				results = await pipe.execute(raise_on_error=False)
+		except Exception as e:
+			self.stats.errors += 1
+			log.warning(f"Auto-pipeline of {len(batch)} commands failed: {e}")
+			results = [e] * len(batch)
+
+		for (_, _, future), result in zip(batch, results):
+			self._set_result(future, result)
+
+	@staticmethod
+	def _set_result(future: asyncio.Future, result) -> None:
+		if future.done():  # Cancelled by its caller
+			return
+
+		if isinstance(result, Exception):
+			future.set_exception(result)
+		else:
+			future.set_result(result)
+
+	def log_report(self) -> None:
+		stats = self.stats.snapshot()
+		log.info("Redis auto-pipeline: " + " ".join(f"{key}={value}" for key, value in stats.items()))
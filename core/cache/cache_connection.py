@@ -1,25 +1,47 @@
 from core.base_connection import BaseConnection
 from redis.asyncio import Redis
 
+from .auto_pipeline import AutoPipeline
 from ..loggers import log
 
 
 class CacheConnection(BaseConnection):
-	_connection: Redis = None
+	"""
+	Redis connection. With 'auto_pipeline' the client is wrapped in an AutoPipeline,
+	commands issued concurrently are sent together in one round trip.
+	"""
+	_connection: Redis | AutoPipeline = None
 	_url: str | None = None
 	_name: str = "Reddis"
+	auto_pipeline: bool = True
 
 	@classmethod
-	async def _connect(cls, url: str | None = None) -> Redis:
-		if cls._connection is None:
-			cls._connection = await Redis.from_url(
-				url=url,
-				decode_responses=True
-			)
-			await cls._connection.ping()
+	async def _connect(cls, url: str | None = None) -> Redis | AutoPipeline:
+		""" Opens a new client; a stale one (reconnect) is swapped out and closed once the new one answers """
+		client = await Redis.from_url(
+			url=url,
+			decode_responses=True
+		)
+		try:
+			await client.ping()
+		except Exception:
+			await cls._close(client)
+			raise
+
+		stale, cls._connection = cls._connection, AutoPipeline(client) if cls.auto_pipeline else client
+		if stale is not None:
+			await cls._close(stale)
 
 		return cls._connection
 
+	@classmethod
+	async def _close(cls, connection: Redis | AutoPipeline) -> None:
+		try:
+			await connection.close()
+			await connection.connection_pool.disconnect()
+		except Exception as e:
+			log.debug(f"Closing a {cls._name} client failed: {e}")
+
 	@classmethod
 	async def _check_connection(cls) -> bool:
 		if cls._connection is None:
@@ -35,6 +57,9 @@ class CacheConnection(BaseConnection):
 
 	@classmethod
 	async def disconnect(cls) -> None:
-		await cls._connection.close()
-		await cls._connection.connection_pool.disconnect()
+		await cls.stop_monitor()
+		if isinstance(cls._connection, AutoPipeline):
+			cls._connection.log_report()
+
+		await cls._close(cls._connection)
 		log.info(f"Disconnected from {cls._name}")
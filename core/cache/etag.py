@@ -0,0 +1,123 @@
+import hashlib
+from typing import Iterable
+
+from fastapi import Request, Response
+
+from .cache_connection import CacheConnection
+from ..loggers import log
+
+
+def make_etag(content: bytes) -> str:
+	""" Strong ETag of the response body """
+	return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+	""" Weak comparison (RFC 9110), as required for If-None-Match """
+	if not if_none_match:
+		return False
+
+	if if_none_match.strip() == '*':
+		return True
+
+	opaque = etag.removeprefix('W/')
+	return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+	return Response(status_code=304, headers={**(headers or {}), 'ETag': etag})
+
+
+def json_response_with_etag(
+		request: Request,
+		content: bytes,
+		headers: dict[str, str] | None = None,
+) -> Response:
+	""" JSON response with an ETag, or 304 when the client already has this body """
+	etag = make_etag(content)
+	if etag_matches(request.headers.get('if-none-match'), etag):
+		return not_modified(etag, headers)
+
+	return Response(
+		content=content,
+		media_type="application/json",
+		headers={**(headers or {}), 'ETag': etag},
+	)
+
+
+class ETagCache(CacheConnection):
+	"""
+	Remembers the last ETag served for a resource, so a conditional GET
+	with a matching If-None-Match is answered 304 without loading it.
+
+	A stamp lives 'timeout' seconds, writers should 'invalidate' it
+	when the resource changes. Stamps are only set if absent, and an
+	invalidation leaves a marker for 'invalidation_window' seconds (at least
+	the replica lag), so a read served before the write can't stamp its stale
+	content after it.
+	"""
+	key_template: str = 'etag:{key}'
+	timeout: int = 60
+	invalidation_window: float = 5.0
+	invalidated_marker: str = '-'
+
+	@classmethod
+	def _get_key(cls, key: str) -> str:
+		return cls.key_template.format(key=key)
+
+	@classmethod
+	async def get_stamp(cls, key: str) -> str | None:
+		try:
+			cache = await cls.get_connection()
+			stamp = await cache.get(cls._get_key(key))
+		except Exception as e:
+			log.warning(f"Failed to read ETag stamp <{key}>: {e}")
+			return None
+
+		return stamp if stamp != cls.invalidated_marker else None
+
+	@classmethod
+	async def set_stamp(cls, key: str, etag: str) -> None:
+		try:
+			cache = await cls.get_connection()
+			await cache.set(cls._get_key(key), etag, ex=cls.timeout, nx=True)
+		except Exception as e:
+			log.warning(f"Failed to set ETag stamp <{key}>: {e}")
+
+	@classmethod
+	async def invalidate(cls, key: str) -> None:
+		await cls.invalidate_many((key,))
+
+	@classmethod
+	async def invalidate_many(cls, keys: Iterable[str]) -> None:
+		""" Replaces the stamps with the invalidation marker, in one round trip """
+		window = int(cls.invalidation_window * 1000)
+		try:
+			cache = await cls.get_connection()
+			async with cache.pipeline(transaction=False) as pipe:
+				for key in keys:
+					pipe.set(cls._get_key(key), cls.invalidated_marker, px=window)
+
+				await pipe.execute()
+		except Exception as e:
+			log.warning(f"Failed to invalidate ETag stamps: {e}")
+
+	@classmethod
+	async def check_not_modified(cls, request: Request, key: str) -> Response | None:
+		""" 304 response if If-None-Match matches the stamp, None otherwise """
+		if_none_match = request.headers.get('if-none-match')
+		if not if_none_match:
+			return None
+
+		stamp = await cls.get_stamp(key)
+		if stamp is not None and etag_matches(if_none_match, stamp):
+			return not_modified(stamp)
+
+		return None
+
+	@classmethod
+	async def respond(cls, request: Request, key: str, content: bytes) -> Response:
+		""" Stamps the content's ETag and builds the (possibly 304) response """
+		response = json_response_with_etag(request, content)
+		await cls.set_stamp(key, response.headers['ETag'])
+		return response
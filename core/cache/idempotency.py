@@ -0,0 +1,177 @@
+import asyncio
+import base64
+import hashlib
+import json
+
+from fastapi.responses import JSONResponse
+
+from .cache_connection import CacheConnection
+from ..loggers import log
+
+IDEMPOTENCY_HEADER = b'idempotency-key'
+MUTATING_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+MISSING = object()
+
+
+class IdempotencyMiddleware:
+	"""
+	Runs a mutating request with an 'Idempotency-Key' header at most once.
+
+	The first request takes an in-flight marker in Redis (SET NX) and stores
+	its final response for 'ttl' seconds. Duplicates wait for the first one to
+	finish (at most 'wait_timeout' seconds, 409 after that) and get the stored
+	response replayed with 'Idempotent-Replayed: true'. A key reused with a
+	different request body is answered 422. Responses with 5xx are not stored,
+	so the request can be retried.
+
+	Keys are scoped by method, path and the 'X-User-Id' header.
+	"""
+
+	def __init__(
+			self,
+			app,
+			ttl: int = 86_400,
+			lock_timeout: int = 60,
+			wait_timeout: float = 10.0,
+			key_prefix: str = 'idempotency',
+	) -> None:
+		self.app = app
+		self.ttl = ttl
+		self.lock_timeout = lock_timeout
+		self.wait_timeout = wait_timeout
+		self.key_prefix = key_prefix
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope['type'] != 'http' or scope['method'] not in MUTATING_METHODS:
+			return await self.app(scope, receive, send)
+
+		headers = dict(scope['headers'])
+		idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+		if not idempotency_key:
+			return await self.app(scope, receive, send)
+
+		body = await self._read_body(receive)
+		fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+		user_id = headers.get(b'x-user-id', b'').decode()
+		key = f"{self.key_prefix}:{scope['method']}:{scope['path']}:{user_id}:{idempotency_key.decode()}"
+
+		# Only cache failures fall back to running the request without idempotency,
+		# the app's own errors must propagate from a single run
+		acquired, stored = False, MISSING
+		try:
+			cache = await CacheConnection.get_connection()
+			in_flight = json.dumps({'state': 'in_flight', 'fingerprint': fingerprint})
+			for _ in range(2):  # Second round if the first request failed and released the key
+				if await cache.set(key, in_flight, nx=True, ex=self.lock_timeout):
+					acquired = True
+					break
+
+				stored = await self._wait_for_response(cache, key)
+				if stored is not MISSING:
+					break
+		except Exception as e:
+			log.warning(f"Idempotency cache unavailable, running request without it: {e}")
+			return await self.app(scope, self._replay_body(body, receive), send)
+
+		if acquired:
+			return await self._run_first(scope, body, receive, send, cache, key, fingerprint)
+
+		if stored is None or stored is MISSING:
+			response = JSONResponse({'detail': "A request with this Idempotency-Key is in progress"}, status_code=409)
+		elif stored['fingerprint'] != fingerprint:
+			response = JSONResponse({'detail': "Idempotency-Key was used with a different request"}, status_code=422)
+		else:
+			return await self._replay_response(stored, send)
+
+		await response(scope, receive, send)
+
+	@staticmethod
+	async def _read_body(receive) -> bytes:
+		chunks = []
+		while True:
+			message = await receive()
+			chunks.append(message.get('body', b''))
+			if not message.get('more_body', False):
+				return b''.join(chunks)
+
+	@staticmethod
+	def _replay_body(body: bytes, receive):
+		""" 'receive' for the app: the already read body, then the client's own messages """
+		sent = False
+
+		async def replay():
+			nonlocal sent
+			if sent:
+				return await receive()
+
+			sent = True
+			return {'type': 'http.request', 'body': body, 'more_body': False}
+
+		return replay
+
+	async def _run_first(self, scope, body: bytes, receive, send, cache, key: str, fingerprint: str) -> None:
+		status = 500
+		response_headers = []
+		response_body = []
+
+		async def send_wrapper(message) -> None:
+			nonlocal status, response_headers
+			if message['type'] == 'http.response.start':
+				status = message['status']
+				response_headers = message.get('headers', [])
+			elif message['type'] == 'http.response.body':
+				response_body.append(message.get('body', b''))
+
+			await send(message)
+
+		try:
+			await self.app(scope, self._replay_body(body, receive), send_wrapper)
+		finally:
+			await self._store_response(cache, key, fingerprint, status, response_headers, b''.join(response_body))
+
+	async def _store_response(self, cache, key: str, fingerprint: str, status: int, headers, body: bytes) -> None:
+		try:
+			if status >= 500:
+				await cache.delete(key)
+				return
+
+			stored = {
+				'state': 'done',
+				'fingerprint': fingerprint,
+				'status': status,
+				'headers': [[name.decode('latin-1'), value.decode('latin-1')] for name, value in headers],
+				'body': base64.b64encode(body).decode(),
+			}
+			await cache.set(key, json.dumps(stored), ex=self.ttl)
+		except Exception as e:
+			log.warning(f"Failed to store idempotent response <{key}>: {e}")
+
+	async def _wait_for_response(self, cache, key: str) -> dict | object | None:
+		"""
+		Stored response once the first request is done, None if it's still
+		running after 'wait_timeout', MISSING if it failed and released the key.
+		"""
+		delay = 0.05
+		loop = asyncio.get_running_loop()
+		deadline = loop.time() + self.wait_timeout
+		while True:
+			raw = await cache.get(key)
+			if raw is None:
+				return MISSING
+
+			stored = json.loads(raw)
+			if stored['state'] == 'done':
+				return stored
+
+			if loop.time() >= deadline:
+				return None
+
+			await asyncio.sleep(delay)
+			delay = min(delay * 2, 0.5)
+
+	@staticmethod
+	async def _replay_response(stored: dict, send) -> None:
+		headers = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in stored['headers']]
+		headers.append((b'idempotent-replayed', b'true'))
+		await send({'type': 'http.response.start', 'status': stored['status'], 'headers': headers})
+		await send({'type': 'http.response.body', 'body': base64.b64decode(stored['body'])})
@@ -1,2 +1,8 @@
 from .base import Base
-from .db_dependency import get_async_session, AsyncSessionLocal
+from .db_dependency import get_async_session, get_read_only_session, get_snapshot_session, \
+	is_read_only, AsyncSessionLocal
+from .session_stats import SessionUsageStats
+from .statement_cache import StatementCacheStats
+from .prepared_query import PreparedQuery, get_driver_connection
+from .routing import PrimaryPinMiddleware, REPLICA_OPTION
+from .db_config import warm_up_pools
@@ -1,6 +1,49 @@
+from prometheus_client import REGISTRY
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from config import settings
+from .metrics import DBStatsCollector
+from .pool import get_pool_options, warm_up_pool
+from .routing import RoutingSession, ReplicaSelector
+from .session_stats import SessionUsageStats
+from .statement_cache import StatementCacheStats
+from .statement_timeout import StatementTimeout
 
-engine = create_async_engine(settings.db_url, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+pool_options = get_pool_options(settings)
+engine = create_async_engine(settings.db_url, echo=False, **pool_options)
+replica_engines = [create_async_engine(url, echo=False, **pool_options) for url in settings.db_replica_urls]
+
+RoutingSession.configure(
+	ReplicaSelector(replica_engines, settings.DB_REPLICA_STRATEGY) if replica_engines else None,
+	settings.DB_PRIMARY_PIN_SECONDS,
+)
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, sync_session_class=RoutingSession)
+
+# Read-only transactions, 'read_only' in session info routes them to replicas
+read_only_engine = engine.execution_options(postgresql_readonly=True)
+ReadOnlySessionLocal = async_sessionmaker(
+	read_only_engine, expire_on_commit=False, info={'read_only': True},
+	sync_session_class=RoutingSession,
+)
+
+# Deferrable snapshots for long exports: wait once for a safe snapshot,
+# then read without serialization failures or predicate locks.
+# Hot standbys can't run SERIALIZABLE, these always read from the primary.
+snapshot_engine = engine.execution_options(
+	isolation_level='SERIALIZABLE', postgresql_readonly=True, postgresql_deferrable=True,
+)
+SnapshotSessionLocal = async_sessionmaker(
+	snapshot_engine, expire_on_commit=False, info={'read_only': True},
+)
+
+for _engine in (engine, *replica_engines):
+	StatementCacheStats.register(_engine)
+
+SessionUsageStats.register()
+StatementTimeout.register()
+REGISTRY.register(DBStatsCollector((engine, *replica_engines)))
+
+
+async def warm_up_pools() -> None:
+	for _engine in (engine, *replica_engines):
+		await warm_up_pool(_engine, settings.DB_POOL_WARMUP)
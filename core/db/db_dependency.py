@@ -1,17 +1,44 @@
-from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from .db_config import AsyncSessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-@asynccontextmanager
-async def get_async_session():
-	# async with engine.begin() as connection:
-	# 	await connection.run_sync(Base.metadata.create_all)
+from .db_config import AsyncSessionLocal, ReadOnlySessionLocal, SnapshotSessionLocal
+from .session_stats import SessionUsageStats
 
-	# db = AsyncSessionLocal()
-	# try:
-	# 	yield db
-	# finally:
-	# 	await db.close()
 
-	async with AsyncSessionLocal() as db:
+async def _lazy_session(session_maker: async_sessionmaker) -> AsyncIterator[AsyncSession]:
+	"""
+	Creating a session does not touch the pool, a connection is checked out
+	on the first statement. Handlers that return before it (validation errors,
+	cache hits, early 401s) never hold a connection.
+	"""
+	async with session_maker() as db:
+		try:
+			yield db
+		finally:
+			SessionUsageStats.record(db)
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+	async for db in _lazy_session(AsyncSessionLocal):
+		yield db
+
+
+async def get_read_only_session() -> AsyncIterator[AsyncSession]:
+	"""
+	Session for pure reads (retrieve, list): transactions are opened
+	as READ ONLY and may be served by a replica. Nothing is committed,
+	closing the session rolls the transaction back.
+	"""
+	async for db in _lazy_session(ReadOnlySessionLocal):
 		yield db
+
+
+async def get_snapshot_session() -> AsyncIterator[AsyncSession]:
+	""" Read-only session with a SERIALIZABLE DEFERRABLE snapshot, for long exports """
+	async for db in _lazy_session(SnapshotSessionLocal):
+		yield db
+
+
+def is_read_only(db: AsyncSession) -> bool:
+	return db.info.get('read_only', False)
@@ -0,0 +1,365 @@
+"""
+Index auditor: redundant and missing indexes of the service's models.
+
+Compares the indexes declared on 'Base.metadata' and the live catalog:
+- duplicate: same columns, method, operator classes and predicate as another index
+- overlapping: a non-unique B-tree whose columns are a prefix of another B-tree
+- missing: a CRUD 'lookup_field' / 'order_field' with no index starting with its column
+  (for 'order_field', a B-tree with the default operator class)
+
+With '--revision' an Alembic migration is written for the catalog findings
+(redundant indexes dropped, missing ones created, both concurrently).
+Indexes backing a constraint are only reported. Redundant indexes found
+in the models must be removed from them too, or autogenerate brings them back.
+
+Needs the service's settings, run it inside a service container:
+	python -m core.db.index_audit [--models models] [--crud crud] [--revision]
+"""
+import argparse
+import asyncio
+import importlib
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Iterable, Type
+
+from sqlalchemy import MetaData, Table, Index, Column, UniqueConstraint, String, text, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from core.base_crud.base import BaseCRUD, LookupCRUD, KeysetCRUD
+from core.db import Base
+from core.db.db_config import engine
+
+CATALOG_QUERY = text("""
+	SELECT
+		t.relname AS table_name,
+		i.relname AS index_name,
+		ARRAY(
+			SELECT a.attname
+			FROM unnest(ix.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+			LEFT JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+			ORDER BY k.ord
+		) AS columns,
+		ARRAY(
+			SELECT CASE WHEN opc.opcdefault THEN NULL ELSE opc.opcname END
+			FROM unnest(ix.indclass::oid[]) WITH ORDINALITY AS c(opclass, ord)
+			JOIN pg_opclass opc ON opc.oid = c.opclass
+			ORDER BY c.ord
+		) AS opclasses,
+		ix.indisunique AS is_unique,
+		ix.indisprimary AS is_primary,
+		con.oid IS NOT NULL AS is_constraint,
+		am.amname AS method,
+		pg_get_expr(ix.indpred, ix.indrelid) AS predicate,
+		pg_get_indexdef(ix.indexrelid) AS definition
+	FROM pg_index ix
+	JOIN pg_class i ON i.oid = ix.indexrelid
+	JOIN pg_class t ON t.oid = ix.indrelid
+	JOIN pg_namespace n ON n.oid = t.relnamespace
+	JOIN pg_am am ON am.oid = i.relam
+	LEFT JOIN pg_constraint con ON con.conindid = ix.indexrelid AND con.contype IN ('p', 'u', 'x')
+	WHERE n.nspname = current_schema() AND t.relname = ANY(:tables)
+	ORDER BY t.relname, i.relname
+""").bindparams(bindparam('tables', type_=ARRAY(String)))
+
+
+class IndexInfo(NamedTuple):
+	table: str
+	name: str
+	columns: tuple[str | None, ...]  # None for expressions
+	opclasses: tuple[str | None, ...] = ()  # None for the column type's default
+	unique: bool = False
+	primary: bool = False
+	constraint: bool = False  # Backs a constraint, dropped with the constraint only
+	method: str = 'btree'
+	predicate: str | None = None
+	definition: str | None = None  # 'CREATE INDEX' statement, catalog indexes only
+
+	@property
+	def signature(self) -> tuple:
+		""" Indexes with the same signature serve the same lookups """
+		return self.table, self.columns, self.opclasses, self.method, self.predicate
+
+	@property
+	def rank(self) -> tuple[bool, bool, bool]:
+		""" Of two duplicates, the one with the lower rank is dropped """
+		return self.primary, self.constraint, self.unique
+
+	@property
+	def leading_column(self) -> str | None:
+		return self.columns[0] if self.columns else None
+
+
+class Finding(NamedTuple):
+	kind: str  # 'duplicate', 'overlapping' or 'missing'
+	source: str  # 'model' or 'catalog'
+	index: IndexInfo  # Index to drop, or to create for 'missing'
+	reason: str
+
+	@property
+	def actionable(self) -> bool:
+		return self.source == 'catalog' and not self.index.constraint
+
+	def __str__(self) -> str:
+		columns = ', '.join(column or '<expression>' for column in self.index.columns)
+		note = '' if self.actionable or self.source == 'model' else ' (constraint, not dropped)'
+		return f"[{self.source}] {self.kind}: {self.index.table}.{self.index.name} ({columns}) {self.reason}{note}"
+
+
+def metadata_indexes(metadata: MetaData) -> list[IndexInfo]:
+	""" Indexes declared on the models, including primary keys and unique constraints """
+	indexes = []
+	for table in metadata.tables.values():
+		primary_key = tuple(column.name for column in table.primary_key.columns)
+		if primary_key:
+			indexes.append(IndexInfo(
+				table.name, table.primary_key.name or f'{table.name}_pkey', primary_key,
+				(None,) * len(primary_key), unique=True, primary=True, constraint=True,
+			))
+
+		for constraint in table.constraints:
+			if not isinstance(constraint, UniqueConstraint):
+				continue
+
+			columns = tuple(column.name for column in constraint.columns)
+			name = constraint.name or f"{table.name}_{'_'.join(columns)}_key"
+			indexes.append(IndexInfo(table.name, name, columns, (None,) * len(columns), unique=True, constraint=True))
+
+		for index in table.indexes:
+			indexes.append(_metadata_index(table, index))
+
+	return indexes
+
+
+def _metadata_index(table: Table, index: Index) -> IndexInfo:
+	options = index.dialect_options['postgresql']
+	ops = options['ops'] or {}
+	columns = tuple(expression.name if isinstance(expression, Column) else None for expression in index.expressions)
+	where = options['where']
+	return IndexInfo(
+		table.name, index.name, columns,
+		tuple(ops.get(column) for column in columns),
+		unique=bool(index.unique),
+		method=options['using'] or 'btree',
+		predicate=str(where) if where is not None else None,
+	)
+
+
+async def catalog_indexes(tables: Iterable[str]) -> list[IndexInfo]:
+	async with engine.connect() as connection:
+		result = await connection.execute(CATALOG_QUERY, {'tables': list(tables)})
+		rows = result.mappings().all()
+
+	return [
+		IndexInfo(
+			row['table_name'], row['index_name'], tuple(row['columns']), tuple(row['opclasses']),
+			unique=row['is_unique'], primary=row['is_primary'], constraint=row['is_constraint'],
+			method=row['method'], predicate=row['predicate'], definition=row['definition'],
+		)
+		for row in rows
+	]
+
+
+def find_redundant(indexes: list[IndexInfo], source: str) -> list[Finding]:
+	findings = []
+	for index in indexes:
+		for other in indexes:
+			if other is index or other.table != index.table:
+				continue
+
+			if other.signature == index.signature and (other.rank, index.name) > (index.rank, other.name):
+				findings.append(Finding('duplicate', source, index, f"duplicates {other.name}"))
+				break
+
+			if _is_prefix_of(index, other):
+				findings.append(Finding('overlapping', source, index, f"is a prefix of {other.name}"))
+				break
+
+	return findings
+
+
+def _is_prefix_of(index: IndexInfo, other: IndexInfo) -> bool:
+	"""
+	A non-unique B-tree is redundant when another B-tree starts with its columns
+	(a unique one still enforces its constraint).
+	"""
+	if index.unique or index.method != 'btree' or other.method != 'btree':
+		return False
+
+	if index.predicate != other.predicate or None in index.columns:
+		return False
+
+	size = len(index.columns)
+	return (
+		size < len(other.columns)
+		and other.columns[:size] == index.columns
+		and other.opclasses[:size] == index.opclasses
+	)
+
+
+def crud_classes(metadata: MetaData) -> list[Type[BaseCRUD]]:
+	""" Loaded CRUD classes with a lookup or an order field on one of the metadata's tables """
+	found, stack = [], [LookupCRUD, KeysetCRUD]
+	while stack:
+		cls = stack.pop()
+		stack.extend(cls.__subclasses__())
+		model = getattr(cls, 'model', None)
+		if model is not None and model.__table__.name in metadata.tables and cls not in found:
+			found.append(cls)
+
+	return found
+
+
+def find_missing(indexes: list[IndexInfo], cruds: Iterable[Type[BaseCRUD]], source: str) -> list[Finding]:
+	"""
+	Lookups need an index starting with the lookup column (B-tree or hash),
+	keyset pagination a B-tree starting with the order column with its default
+	operator class: others (e.g. 'text_pattern_ops') don't serve its ORDER BY.
+	"""
+	needed: dict[tuple[str, str], list[str]] = {}
+	ordered: set[tuple[str, str]] = set()
+	for cls in cruds:
+		table = cls.model.__table__.name
+		fields = [('lookup', getattr(cls, 'lookup_field', None)), ('order', getattr(cls, 'order_field', None))]
+		for usage, field in fields:
+			if field is None or not hasattr(cls.model, field):
+				continue
+
+			column = getattr(cls.model, field).expression.name
+			needed.setdefault((table, column), []).append(f'{cls.__name__}.{usage}_field')
+			if usage == 'order':
+				ordered.add((table, column))
+
+	findings = []
+	for (table, column), users in needed.items():
+		is_ordered = (table, column) in ordered
+		usable = ('btree',) if is_ordered else ('btree', 'hash')
+		covered = any(
+			index.table == table and index.leading_column == column
+			and index.method in usable and index.predicate is None
+			and not (is_ordered and any(index.opclasses[:1]))
+			for index in indexes
+		)
+		if not covered:
+			index = IndexInfo(table, f'ix_{table}_{column}', (column,), (None,))
+			findings.append(Finding('missing', source, index, f"used by {', '.join(users)}"))
+
+	return findings
+
+
+def render_migration(findings: list[Finding], revision: str, down_revision: str | None) -> str:
+	""" Alembic migration applying the actionable findings, concurrently """
+	upgrade, downgrade = [], []
+	for finding in findings:
+		index = finding.index
+		if finding.kind == 'missing':
+			upgrade.append(
+				f"op.create_index({index.name!r}, {index.table!r}, {list(index.columns)!r}, unique=False, "
+				f"postgresql_concurrently=True, if_not_exists=True)"
+			)
+			downgrade.append(
+				f"op.drop_index({index.name!r}, table_name={index.table!r}, "
+				f"postgresql_concurrently=True, if_exists=True)"
+			)
+		else:
+			upgrade.append(
+				f"op.drop_index({index.name!r}, table_name={index.table!r}, "
+				f"postgresql_concurrently=True, if_exists=True)"
+			)
+			definition = re.sub(
+				r'^CREATE (UNIQUE )?INDEX ', r'CREATE \1INDEX CONCURRENTLY IF NOT EXISTS ', index.definition
+			)
+			downgrade.append(f"op.execute({definition!r})")
+
+	def block(ops: list[str]) -> str:
+		return '\n'.join(f'        {op}' for op in ops)
+
+	return f'''"""audit indexes
+
+Revision ID: {revision}
+Revises: {down_revision or ''}
+Create Date: {datetime.now()}
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = {revision!r}
+down_revision: Union[str, None] = {down_revision!r}
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+{block(upgrade)}
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+{block(list(reversed(downgrade)))}
+'''
+
+
+def write_migration(findings: list[Finding], alembic_config: str = 'alembic.ini') -> Path:
+	from alembic.config import Config
+	from alembic.script import ScriptDirectory
+
+	script = ScriptDirectory.from_config(Config(alembic_config))
+	revision = uuid.uuid4().hex[-12:]
+	path = Path(script.versions) / f'{revision}_audit_indexes.py'
+	path.write_text(render_migration(findings, revision, script.get_current_head()))
+	return path
+
+
+async def audit(metadata: MetaData, cruds: list[Type[BaseCRUD]]) -> list[Finding]:
+	declared = metadata_indexes(metadata)
+	live = await catalog_indexes(metadata.tables)
+	return [
+		*find_redundant(declared, 'model'),
+		*find_missing(declared, cruds, 'model'),
+		*find_redundant(live, 'catalog'),
+		*find_missing(live, cruds, 'catalog'),
+	]
+
+
+async def main(args: argparse.Namespace) -> None:
+	importlib.import_module(args.models)
+	if args.crud:
+		try:
+			importlib.import_module(args.crud)
+		except ModuleNotFoundError as e:
+			if e.name != args.crud:
+				raise
+
+			print(f"No '{args.crud}' module, lookups are not checked")
+
+	try:
+		findings = await audit(Base.metadata, crud_classes(Base.metadata))
+	finally:
+		await engine.dispose()
+
+	for finding in findings:
+		print(finding)
+
+	if not findings:
+		print("No redundant or missing indexes")
+
+	actionable = [finding for finding in findings if finding.actionable]
+	if args.revision and actionable:
+		print(f"Migration written: {write_migration(actionable, args.alembic_config)}")
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Audit redundant and missing indexes")
+	parser.add_argument('--models', default='models', help="Module declaring the service's models")
+	parser.add_argument('--crud', default='crud', help="Module declaring the service's CRUD classes, '' to skip")
+	parser.add_argument('--revision', action='store_true', help="Write an Alembic migration for the catalog findings")
+	parser.add_argument('--alembic-config', default='alembic.ini')
+	asyncio.run(main(parser.parse_args()))
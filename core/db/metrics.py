@@ -0,0 +1,68 @@
+from collections.abc import Iterable
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .pool import InstrumentedPool
+from .session_stats import SessionUsageStats
+from .statement_cache import StatementCacheStats
+
+POOL_GAUGES = {
+	'size': "Configured pool size",
+	'in_use': "Connections checked out",
+	'idle': "Connections idle in the pool",
+	'overflow': "Overflow connections open",
+	'wait_max_seconds': "Longest checkout wait",
+}
+POOL_COUNTERS = {
+	'checkouts': "Connection checkouts",
+	'wait_seconds': "Time spent waiting for checkouts",
+	'timeouts': "Checkouts that timed out",
+	'connects': "New DBAPI connections opened",
+	'invalidations': "Connections invalidated",
+}
+
+
+class DBStatsCollector(Collector):
+	"""
+	Exports the compiled cache, session usage and pool counters on scrape.
+
+	The counters are kept by the SQLAlchemy event hooks, the collector only
+	reads them, so nothing is added to the query path.
+	"""
+
+	def __init__(self, engines: Iterable[AsyncEngine]) -> None:
+		self.engines = tuple(engines)
+
+	def collect(self):
+		statements = CounterMetricFamily(
+			'db_statements', "Executed statements by compiled cache outcome", labels=['cache'],
+		)
+		for outcome, value in StatementCacheStats.snapshot().items():
+			statements.add_metric([outcome], value)
+		yield statements
+
+		sessions = CounterMetricFamily(
+			'db_sessions', "Closed request sessions by whether they used a connection", labels=['usage'],
+		)
+		for usage, value in SessionUsageStats.snapshot().items():
+			sessions.add_metric([usage], value)
+		yield sessions
+
+		pools = [
+			(engine.url.host or '', engine.pool.snapshot())
+			for engine in self.engines
+			if isinstance(engine.pool, InstrumentedPool)
+		]
+		for name, documentation in POOL_GAUGES.items():
+			gauge = GaugeMetricFamily(f'db_pool_{name}', documentation, labels=['host'])
+			for host, stats in pools:
+				gauge.add_metric([host], stats[name])
+			yield gauge
+
+		for name, documentation in POOL_COUNTERS.items():
+			counter = CounterMetricFamily(f'db_pool_{name}', documentation, labels=['host'])
+			for host, stats in pools:
+				counter.add_metric([host], stats[name])
+			yield counter
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from ..loggers import log
+
+
+class PoolStats:
+	""" Checkout and connection lifecycle counters of one pool """
+
+	def __init__(self) -> None:
+		self.checkouts = 0
+		self.wait_total = 0.0
+		self.wait_max = 0.0
+		self.timeouts = 0
+		self.connects = 0
+		self.invalidations = 0
+
+	def record_wait(self, seconds: float) -> None:
+		self.checkouts += 1
+		self.wait_total += seconds
+		self.wait_max = max(self.wait_max, seconds)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+	"""
+	Queue pool that measures checkout wait time (queueing, pre-ping and
+	connecting included) and counts timeouts, new connections and invalidations.
+	"""
+
+	def __init__(self, *args, **kwargs) -> None:
+		super().__init__(*args, **kwargs)
+		self.stats = PoolStats()
+		event.listen(self, "connect", self._on_connect)
+		event.listen(self, "invalidate", self._on_invalidate)
+		event.listen(self, "soft_invalidate", self._on_invalidate)
+
+	def connect(self):
+		start = time.perf_counter()
+		try:
+			return super().connect()
+		except exc.TimeoutError:
+			self.stats.timeouts += 1
+			raise
+		finally:
+			self.stats.record_wait(time.perf_counter() - start)
+
+	def _on_connect(self, dbapi_connection, connection_record) -> None:
+		self.stats.connects += 1
+
+	def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+		self.stats.invalidations += 1
+
+	def snapshot(self) -> dict[str, int | float]:
+		stats = self.stats
+		return {
+			'size': self.size(),
+			'in_use': self.checkedout(),
+			'idle': self.checkedin(),
+			'overflow': max(self.overflow(), 0),
+			'checkouts': stats.checkouts,
+			'wait_seconds': stats.wait_total,
+			'wait_max_seconds': stats.wait_max,
+			'timeouts': stats.timeouts,
+			'connects': stats.connects,
+			'invalidations': stats.invalidations,
+		}
+
+
+def get_pool_options(settings) -> dict:
+	""" Engine keyword arguments from the service's Settings """
+	return {
+		'poolclass': InstrumentedPool,
+		'pool_size': settings.DB_POOL_SIZE,
+		'max_overflow': settings.DB_POOL_MAX_OVERFLOW,
+		'pool_timeout': settings.DB_POOL_TIMEOUT,
+		'pool_recycle': settings.DB_POOL_RECYCLE,
+		'pool_pre_ping': settings.DB_POOL_PRE_PING,
+		'connect_args': {'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE},
+	}
+
+
+async def warm_up_pool(engine: AsyncEngine, min_connections: int) -> None:
+	""" Opens 'min_connections' connections at once and returns them to the pool as idle """
+	min_connections = min(min_connections, engine.pool.size())
+	if min_connections <= 0:
+		return
+
+	connections = [engine.connect() for _ in range(min_connections)]
+	try:
+		await asyncio.gather(*(connection.start() for connection in connections))
+	finally:
+		await asyncio.gather(*(connection.close() for connection in connections))
+
+	log.info(f"DB pool {engine.url.host}: warmed up {min_connections} connections")
@@ -0,0 +1,75 @@
+from abc import ABC
+from typing import Any, Generic, Type, TypeVar
+from weakref import WeakKeyDictionary
+
+from asyncpg import Connection
+from asyncpg.prepared_stmt import PreparedStatement
+from sqlalchemy.ext.asyncio import AsyncSession
+
+R = TypeVar('R', bound=tuple)  # NamedTuple result record
+
+
+async def get_driver_connection(db: AsyncSession, in_transaction: bool = False) -> Connection:
+	"""
+	Returns the asyncpg connection behind the session's pooled connection.
+
+	The driver BEGINs lazily on the first statement sent through SQLAlchemy,
+	pass 'in_transaction=True' when the raw work must be part of the session's
+	transaction (and be committed or rolled back with it).
+	"""
+	connection = await db.connection()
+	raw_connection = await connection.get_raw_connection()
+	driver_connection: Connection = raw_connection.driver_connection
+	if in_transaction and not driver_connection.is_in_transaction():
+		await connection.exec_driver_sql("SELECT 1")
+
+	return driver_connection
+
+
+class PreparedQuery(Generic[R], ABC):
+	"""
+	Hot query executed as a named asyncpg prepared statement,
+	bypassing SQLAlchemy statement compilation and result processing.
+
+	The statement is prepared once per pooled connection,
+	rows are decoded straight into 'record' tuples.
+	Columns in 'query' must be selected in the order of 'record' fields.
+	"""
+	name: str | None = None
+	query: str | None = None
+	record: Type[R] | None = None
+	_statements: WeakKeyDictionary[Connection, PreparedStatement]
+
+	def __init_subclass__(cls, **kwargs) -> None:
+		super().__init_subclass__(**kwargs)
+		cls._statements = WeakKeyDictionary()
+
+	@classmethod
+	def _validate_attrs(cls) -> None:
+		for attr in ('name', 'query', 'record'):
+			if getattr(cls, attr) is None:
+				raise AttributeError(f"{cls.__name__}: '{attr}' cannot be None")
+
+	@classmethod
+	async def _get_statement(cls, db: AsyncSession) -> PreparedStatement:
+		connection = await get_driver_connection(db)
+		statement = cls._statements.get(connection)
+		if statement is None:
+			cls._validate_attrs()
+			statement = await connection.prepare(cls.query, name=cls.name)
+			cls._statements[connection] = statement
+
+		return statement
+
+	@classmethod
+	async def fetchrow(cls, db: AsyncSession, *args: Any) -> R | None:
+		statement = await cls._get_statement(db)
+		row = await statement.fetchrow(*args)
+		return cls.record._make(row) if row is not None else None
+
+	@classmethod
+	async def fetch(cls, db: AsyncSession, *args: Any) -> list[R]:
+		statement = await cls._get_statement(db)
+		rows = await statement.fetch(*args)
+		make = cls.record._make
+		return [make(row) for row in rows]
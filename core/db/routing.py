@@ -0,0 +1,161 @@
+import itertools
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, Executable, Select, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+REPLICA_OPTION = 'replica_ok'  # Statement execution option, the read may be served by a replica
+WROTE_KEY = 'wrote'
+
+primary_pin_key: ContextVar[str | None] = ContextVar('primary_pin_key', default=None)
+
+
+class PrimaryPins:
+	"""
+	Keys (users, clients) that wrote recently and must read from the primary
+	until replicas had time to replay their writes.
+	Pins are kept per process, for 'window' seconds after the commit.
+	"""
+	window: float = 5.0
+	_pins: dict[str, float] = {}  # Ordered by expiry: a key pinned again is moved to the end
+
+	@classmethod
+	def pin(cls, key: str) -> None:
+		now = time.monotonic()
+		cls._pins.pop(key, None)
+		cls._pins[key] = now + cls.window
+		cls._prune(now)
+
+	@classmethod
+	def _prune(cls, now: float) -> None:
+		""" Drops expired pins from the front, so keys that never come back don't pile up """
+		expired = [key for key, _ in itertools.takewhile(lambda pin: pin[1] <= now, cls._pins.items())]
+		for key in expired:
+			del cls._pins[key]
+
+	@classmethod
+	def is_pinned(cls, key: str | None) -> bool:
+		if key is None:
+			return False
+
+		expires_at = cls._pins.get(key)
+		if expires_at is None:
+			return False
+
+		if expires_at <= time.monotonic():
+			cls._pins.pop(key, None)
+			return False
+
+		return True
+
+
+class ReplicaSelector:
+	""" Picks a replica engine: 'round_robin' or 'least_connections' (fewest checked out) """
+	strategies = ('round_robin', 'least_connections')
+
+	def __init__(self, engines: list[AsyncEngine], strategy: str = 'round_robin') -> None:
+		if strategy not in self.strategies:
+			raise ValueError(f"Unknown replica strategy '{strategy}', expected one of {self.strategies}")
+
+		self.engines = [engine.sync_engine for engine in engines]
+		self.strategy = strategy
+		self._cycle = itertools.cycle(self.engines)
+
+	def select(self) -> Engine:
+		if self.strategy == 'least_connections':
+			return min(self.engines, key=lambda engine: engine.pool.checkedout())
+
+		return next(self._cycle)
+
+
+class RoutingSession(Session):
+	"""
+	Sends reads to a replica and everything else to the session's own bind (the primary).
+
+	A read goes to a replica when the session is read-only ('read_only' in info)
+	or the statement has the 'replica_ok' execution option, as long as the session
+	has not written yet and the current pin key is not pinned to the primary.
+	One replica is picked per session, so a request reads from a single snapshot.
+	"""
+	replicas: ReplicaSelector | None = None
+	_replica: Engine | None = None
+
+	@classmethod
+	def configure(cls, replicas: ReplicaSelector | None, pin_window: float) -> None:
+		cls.replicas = replicas
+		PrimaryPins.window = pin_window
+		if not event.contains(cls, "after_commit", cls._on_commit):
+			event.listen(cls, "after_commit", cls._on_commit)
+
+	def get_bind(self, mapper=None, *, clause=None, **kw):
+		if self.replicas is not None and self.__use_replica(clause):
+			if self._replica is None:
+				self._replica = self.replicas.select()
+
+			return self._replica
+
+		if self.__is_write(clause) and not self.info.get('read_only'):
+			self.info[WROTE_KEY] = True
+
+		return super().get_bind(mapper, clause=clause, **kw)
+
+	def __is_write(self, clause) -> bool:
+		""" Flushes and statements that are not reads, a bare 'connection()' (no clause) is not a write """
+		if self._flushing:
+			return True
+
+		return clause is not None and not self.__is_read(clause)
+
+	@staticmethod
+	def __is_read(clause) -> bool:
+		""" SELECTs, and textual reads marked with the 'replica_ok' option (e.g. EXPLAIN) """
+		if isinstance(clause, Select):
+			return True
+
+		return isinstance(clause, Executable) and clause.get_execution_options().get(REPLICA_OPTION, False)
+
+	def __use_replica(self, clause) -> bool:
+		if not self.__is_read(clause) or self._flushing or self.info.get(WROTE_KEY):
+			return False
+
+		if not (self.info.get('read_only') or clause.get_execution_options().get(REPLICA_OPTION)):
+			return False
+
+		return not PrimaryPins.is_pinned(primary_pin_key.get())
+
+	@staticmethod
+	def _on_commit(session: 'RoutingSession') -> None:
+		if session.info.pop(WROTE_KEY, False):
+			key = primary_pin_key.get()
+			if key is not None:
+				PrimaryPins.pin(key)
+
+
+class PrimaryPinMiddleware:
+	"""
+	Sets the request's pin key: the 'X-User-Id' header set by the gateway,
+	or the client address for anonymous requests.
+	"""
+
+	def __init__(self, app) -> None:
+		self.app = app
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope['type'] != 'http':
+			return await self.app(scope, receive, send)
+
+		headers = dict(scope['headers'])
+		user_id = headers.get(b'x-user-id')
+		client = scope.get('client')
+		if user_id:
+			key = f"user:{user_id.decode()}"
+		else:
+			key = f"client:{client[0]}" if client else None
+
+		token = primary_pin_key.set(key)
+		try:
+			await self.app(scope, receive, send)
+		finally:
+			primary_pin_key.reset(token)
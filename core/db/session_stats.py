@@ -0,0 +1,33 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+TOUCHED_KEY = 'touched'
+
+
+class SessionUsageStats:
+	"""
+	Counts request sessions by whether they ever checked out a connection.
+
+	Sessions check out a pooled connection lazily, on the first statement.
+	A session is 'touched' once it began a transaction, 'untouched' sessions
+	were closed without a single round trip to the database.
+	"""
+	_counters: dict[str, int] = {'touched': 0, 'untouched': 0}
+
+	@classmethod
+	def register(cls) -> None:
+		if not event.contains(Session, "after_begin", cls._on_begin):
+			event.listen(Session, "after_begin", cls._on_begin)
+
+	@staticmethod
+	def _on_begin(session, transaction, connection) -> None:
+		session.info[TOUCHED_KEY] = True
+
+	@classmethod
+	def record(cls, session) -> None:
+		touched = session.info.pop(TOUCHED_KEY, False)
+		cls._counters['touched' if touched else 'untouched'] += 1
+
+	@classmethod
+	def snapshot(cls) -> dict[str, int]:
+		return dict(cls._counters)
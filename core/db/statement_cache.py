@@ -0,0 +1,32 @@
+from sqlalchemy import event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class StatementCacheStats:
+	"""
+	Counts executed statements by SQLAlchemy's compiled cache outcome.
+
+	A 'hit' means the statement's SQL was taken from the compiled cache,
+	a 'miss' means it was compiled on this execution.
+	"""
+	_counters: dict[CacheStats, int] = dict.fromkeys(CacheStats, 0)
+
+	@classmethod
+	def register(cls, engine: AsyncEngine) -> None:
+		event.listen(engine.sync_engine, "before_cursor_execute", cls._on_execute)
+
+	@classmethod
+	def _on_execute(cls, conn, cursor, statement, parameters, context, executemany) -> None:
+		if context is not None:
+			cls._counters[context.cache_hit] += 1
+
+	@classmethod
+	def snapshot(cls) -> dict[str, int]:
+		hits = cls._counters[CacheStats.CACHE_HIT]
+		misses = cls._counters[CacheStats.CACHE_MISS]
+		return {
+			'hits': hits,
+			'misses': misses,
+			'uncached': sum(cls._counters.values()) - hits - misses,
+		}
@@ -0,0 +1,40 @@
+from sqlalchemy import event, Engine
+from sqlalchemy.orm import Session
+
+from core.utils.deadline import DeadlineExceeded, get_remaining, check_deadline
+
+QUERY_CANCELED = '57014'
+
+
+class StatementTimeout:
+	"""
+	Caps every transaction begun under a request deadline with
+	'SET LOCAL statement_timeout' of the remaining budget, so Postgres
+	cancels queries the caller no longer waits for.
+	Those cancellations are raised as DeadlineExceeded (504), not as database errors.
+	"""
+
+	@classmethod
+	def register(cls) -> None:
+		if not event.contains(Session, "after_begin", cls._on_begin):
+			event.listen(Session, "after_begin", cls._on_begin)
+		if not event.contains(Engine, "handle_error", cls._on_error):
+			event.listen(Engine, "handle_error", cls._on_error)
+
+	@staticmethod
+	def _on_begin(session, transaction, connection) -> None:
+		remaining = get_remaining()
+		if remaining is None:
+			return
+
+		check_deadline()
+		timeout_ms = max(int(remaining * 1000), 1)  # 0 would disable the timeout
+		connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+	@staticmethod
+	def _on_error(context) -> None:
+		if get_remaining() is None:
+			return
+
+		if getattr(context.original_exception, 'sqlstate', None) == QUERY_CANCELED:
+			raise DeadlineExceeded("Request deadline exceeded") from context.original_exception
@@ -1,4 +1,5 @@
 from .e400 import *
 from .e401 import *
+from .e403 import *
 from .e404 import *
 from .e429 import *
@@ -0,0 +1,8 @@
+from fastapi import status
+
+from core.exceptions.custom_http_exeption import CustomHTTPException
+
+
+class ForbiddenHTTPException(CustomHTTPException):
+	status_code = status.HTTP_403_FORBIDDEN
+	detail = "Not enough permissions"
\ No newline at end of file
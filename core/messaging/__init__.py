@@ -1,3 +1,4 @@
 from .messaging_connection import MessagingConnection
 from .base_rpc import MessagingRPCClientABC, MessagingRPCWorkerABC
 from .base_master import MessagingMasterClientABC, MessagingMasterWorkerABC
+from .base_events import MessagingEventPublisherABC, MessagingEventConsumerABC
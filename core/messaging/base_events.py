@@ -0,0 +1,79 @@
+from abc import ABC, abstractmethod
+
+from aio_pika import ExchangeType, Message
+from aio_pika.abc import AbstractExchange, AbstractIncomingMessage
+
+from core.loggers import log
+from core.messaging import MessagingConnection
+from core.utils import serializers
+
+
+class MessagingEventFactoryABC(MessagingConnection, ABC):
+	""" Events are published to a durable topic exchange, routed by their routing key """
+	exchange_name: str | None = None
+	_exchange: AbstractExchange | None = None
+
+	@classmethod
+	async def get_exchange(cls) -> AbstractExchange:
+		if cls._exchange is not None:
+			return cls._exchange
+
+		if not cls.exchange_name:
+			log.error(f'{cls.__name__} Exchange name is not set')
+			raise ValueError(
+				f"{cls.__name__}: Exchange name must be defined before calling get_exchange()"
+			)
+
+		channel = await cls.get_channel()
+		cls._exchange = await channel.declare_exchange(cls.exchange_name, ExchangeType.TOPIC, durable=True)
+		return cls._exchange
+
+
+class MessagingEventPublisherABC(MessagingEventFactoryABC, ABC):
+	routing_key: str | None = None
+
+	@classmethod
+	async def publish(cls, payload: dict, routing_key: str | None = None) -> None:
+		""" Fire-and-forget: a failed publish is logged, not raised """
+		try:
+			exchange = await cls.get_exchange()
+			message = Message(serializers.dumps(payload), content_type='application/json')
+			await exchange.publish(message, routing_key=routing_key or cls.routing_key)
+		except Exception as e:
+			log.warning(f'{cls.__name__} Publish failed: {e}')
+
+
+class MessagingEventConsumerABC(MessagingEventFactoryABC, ABC):
+	"""
+	Consumes events matching 'binding_key' (topic pattern, e.g. 'user.*').
+
+	Without 'queue_name' every process gets its own exclusive queue,
+	so each of them receives every event (e.g. to keep a local cache).
+	Messages are not acked: events lost while a process is down are gone.
+	"""
+	binding_key: str | None = None
+	queue_name: str | None = None
+
+	@classmethod
+	async def consume(cls) -> None:
+		exchange = await cls.get_exchange()
+		channel = await cls.get_channel()
+		queue = await channel.declare_queue(
+			cls.queue_name,
+			exclusive=cls.queue_name is None,
+			durable=cls.queue_name is not None,
+		)
+		await queue.bind(exchange, routing_key=cls.binding_key)
+		await queue.consume(cls._on_message, no_ack=True)
+
+	@classmethod
+	async def _on_message(cls, message: AbstractIncomingMessage) -> None:
+		try:
+			await cls.callback(message.routing_key, serializers.loads(message.body))
+		except Exception as e:
+			log.warning(f'{cls.__name__} Event <{message.routing_key}> failed: {e}')
+
+	@classmethod
+	@abstractmethod
+	async def callback(cls, routing_key: str, payload: dict) -> None:
+		raise NotImplementedError
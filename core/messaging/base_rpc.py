@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 from core.messaging.base_agent import MessagingRPCFactoryABC
+from core.utils.deadline import DEADLINE_KWARG, deadline_scope, get_remaining, check_deadline
 
 
 class MessagingRPCWorkerABC(MessagingRPCFactoryABC, ABC):
@@ -11,10 +12,17 @@ class MessagingRPCWorkerABC(MessagingRPCFactoryABC, ABC):
 		rpc = await cls.get_agent()
 		await rpc.register(
 			method_name=queue_name,
-			func=cls.callback,
+			func=cls._call_with_deadline,
 			**kwargs
 		)
 
+	@classmethod
+	async def _call_with_deadline(cls, **kwargs) -> dict:
+		""" Runs the callback under the caller's remaining budget, if it sent one """
+		timeout = kwargs.pop(DEADLINE_KWARG, None)
+		with deadline_scope(timeout):
+			return await cls.callback(**kwargs)
+
 	@staticmethod
 	@abstractmethod
 	async def callback(*args, **kwargs) -> dict:
@@ -27,7 +35,17 @@ class MessagingRPCClientABC(MessagingRPCFactoryABC, ABC):
 	async def call(cls, **kwargs):
 		rpc = await cls.get_agent()
 		queue_name: str = await cls.get_queue_name()
+		remaining = get_remaining()
+		if remaining is None:
+			return await rpc.call(
+				method_name=queue_name,
+				kwargs=kwargs
+			)
+
+		# Call messages left in the queue past the deadline are dropped
+		check_deadline()
 		return await rpc.call(
 			method_name=queue_name,
-			kwargs=kwargs
+			kwargs={**kwargs, DEADLINE_KWARG: remaining},
+			expiration=remaining,
 		)
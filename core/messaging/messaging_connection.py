@@ -27,6 +27,7 @@ class MessagingConnection(BaseConnection):
 
 	@classmethod
 	async def disconnect(cls) -> None:
+		await cls.stop_monitor()
 		if cls._connection and not cls._connection.is_closed:
 			await cls._connection.close()
 			cls._connection = None
@@ -0,0 +1,3 @@
+from .serializers import dumps, loads, dumps_row, dumps_rows
+from .deadline import DeadlineExceeded, deadline_scope, get_remaining, check_deadline
+from .uuid7 import uuid7
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+DEADLINE_KWARG = '_request_timeout'  # Remaining budget passed along RPC calls, in seconds
+
+_deadline: ContextVar[float | None] = ContextVar('request_deadline', default=None)
+_timeout: ContextVar[asyncio.Timeout | None] = ContextVar('request_timeout', default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+	pass
+
+
+def get_remaining() -> float | None:
+	""" Seconds left until the current deadline, None if there is no deadline """
+	deadline = _deadline.get()
+	if deadline is None:
+		return None
+
+	return deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+	remaining = get_remaining()
+	if remaining is not None and remaining <= 0:
+		raise DeadlineExceeded("Request deadline exceeded")
+
+
+def set_deadline(timeout: float) -> Token:
+	""" Sets the deadline 'timeout' seconds from now, an earlier deadline is kept """
+	deadline = time.monotonic() + timeout
+	current = _deadline.get()
+	if current is not None:
+		deadline = min(deadline, current)
+
+	return _deadline.set(deadline)
+
+
+@contextmanager
+def deadline_scope(timeout: float | None) -> Iterator[None]:
+	""" Narrows the deadline, and the bound timeout with it, until the scope ends """
+	if timeout is None:
+		yield
+		return
+
+	token = set_deadline(timeout)
+	_reschedule_timeout()
+	try:
+		yield
+	finally:
+		_deadline.reset(token)
+		_reschedule_timeout()
+
+
+@contextmanager
+def bind_timeout(timeout: asyncio.Timeout) -> Iterator[None]:
+	""" Binds the timeout cancelling the request, deadline scopes opened inside move it """
+	token = _timeout.set(timeout)
+	try:
+		yield
+	finally:
+		_timeout.reset(token)
+
+
+def _reschedule_timeout() -> None:
+	timeout = _timeout.get()
+	if timeout is None or timeout.expired():
+		return
+
+	remaining = get_remaining()
+	timeout.reschedule(None if remaining is None else asyncio.get_running_loop().time() + remaining)
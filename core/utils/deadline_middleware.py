@@ -0,0 +1,86 @@
+import asyncio
+
+from fastapi.responses import JSONResponse
+
+from .deadline import bind_timeout, deadline_scope, get_remaining
+
+DEADLINE_HEADER = 'x-request-timeout'  # Remaining budget of the caller, in milliseconds
+
+
+class RouteDeadline:
+	"""
+	Per-route budget, as a dependency:
+
+		@router.get('/users', dependencies=[Depends(RouteDeadline(2.0))])
+
+	Tightens the request's deadline, never extends it: the request is
+	cancelled when the route's budget runs out, under DeadlineMiddleware.
+	"""
+
+	def __init__(self, timeout: float) -> None:
+		self.timeout = timeout
+
+	async def __call__(self):
+		with deadline_scope(self.timeout):
+			yield
+
+
+class DeadlineMiddleware:
+	"""
+	Starts the request's deadline from the 'X-Request-Timeout' header
+	(milliseconds) or 'default_timeout' (seconds), cancels the request
+	when it passes and answers 504 if nothing was sent yet, as it does
+	for DeadlineExceeded raised by the app. The header can only shorten 'default_timeout', invalid or
+	non-positive values are ignored.
+	"""
+
+	def __init__(self, app, default_timeout: float | None = None) -> None:
+		self.app = app
+		self.default_timeout = default_timeout
+
+	def _get_timeout(self, scope) -> float | None:
+		header = self._get_header_timeout(scope)
+		if header is None:
+			return self.default_timeout
+
+		if self.default_timeout is None:
+			return header
+
+		return min(header, self.default_timeout)
+
+	@staticmethod
+	def _get_header_timeout(scope) -> float | None:
+		for name, value in scope['headers']:
+			if name == DEADLINE_HEADER.encode():
+				try:
+					timeout = int(value) / 1000
+				except ValueError:
+					return None
+
+				return timeout if timeout > 0 else None
+
+		return None
+
+	async def __call__(self, scope, receive, send) -> None:
+		if scope['type'] != 'http':
+			return await self.app(scope, receive, send)
+
+		response_started = False
+
+		async def send_wrapper(message) -> None:
+			nonlocal response_started
+			response_started = True
+			await send(message)
+
+		# The timeout is armed even without a deadline, route deadlines can move it
+		with deadline_scope(self._get_timeout(scope)):
+			try:
+				async with asyncio.timeout(get_remaining()) as timeout:
+					with bind_timeout(timeout):
+						await self.app(scope, receive, send_wrapper)
+			except asyncio.TimeoutError:
+				if response_started:
+					raise
+
+				response = JSONResponse({'detail': "Request deadline exceeded"}, status_code=504)
+				await response(scope, receive, send)
@@ -0,0 +1,27 @@
+from typing import Any, Iterable, Mapping
+
+import orjson
+
+JSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(data: Any) -> bytes:
+	"""
+	Encodes data to JSON bytes.
+
+	UUID, datetime and Enum values are encoded natively,
+	in the same format FastAPI uses for Pydantic models.
+	"""
+	return orjson.dumps(data, option=JSON_OPTIONS)
+
+
+def loads(data: bytes | str) -> Any:
+	return orjson.loads(data)
+
+
+def dumps_row(row: Mapping) -> bytes:
+	return dumps(dict(row))
+
+
+def dumps_rows(rows: Iterable[Mapping]) -> bytes:
+	return dumps([dict(row) for row in rows])
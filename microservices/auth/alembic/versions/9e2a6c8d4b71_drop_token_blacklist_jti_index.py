@@ -0,0 +1,28 @@
+"""drop token blacklist jti index
+
+Revision ID: 9e2a6c8d4b71
+Revises: 3d7b5e0f9a14
+Create Date: 2026-10-19 13:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2a6c8d4b71'
+down_revision: Union[str, None] = '3d7b5e0f9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # token_blacklist_pkey already indexes 'jti'
+    op.drop_index(op.f('ix_token_blacklist_jti'), table_name='token_blacklist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_token_blacklist_jti'), 'token_blacklist', ['jti'], unique=False)
@@ -50,7 +50,10 @@ async def login(
 	user_id = auth_data.get('user_id')
 
 	# Create tokens with 'sub'='user_id'
-	access_token, refresh_token = jwt_token_service.obtain_token_pair(sub=user_id)
+	access_token, refresh_token = jwt_token_service.obtain_token_pair(
+		sub=user_id,
+		credential_generation=auth_data.get('credential_generation', 0),
+	)
 
 	# Set 'refresh_token' to cookie
 	jwt_token_service.set_refresh_token_cookie(response, refresh_token)
@@ -148,7 +151,10 @@ async def refresh(
 		raise CredentialsHTTPException()
 
 	# Create new tokens
-	access_token, refresh_token = jwt_token_service.obtain_token_pair(sub=payload["sub"])
+	access_token, refresh_token = jwt_token_service.obtain_token_pair(
+		sub=payload["sub"],
+		credential_generation=payload.get("gen", 0),
+	)
 
 	# Renew 'refresh_token' in cookie
 	response.delete_cookie(key="refresh_token")
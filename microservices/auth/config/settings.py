@@ -12,6 +12,20 @@ class Settings(BaseSettings):
 	DB_SOCKET: str
 	DB_TEST_SOCKET: str
 	DB_NAME: str
+	DB_REPLICA_SOCKETS: list[str] = []
+	DB_REPLICA_STRATEGY: str = 'round_robin'
+	DB_PRIMARY_PIN_SECONDS: float = 5.0
+
+	DB_POOL_SIZE: int = 5
+	DB_POOL_MAX_OVERFLOW: int = 10
+	DB_POOL_TIMEOUT: float = 30.0
+	DB_POOL_RECYCLE: int = 1800
+	DB_POOL_PRE_PING: bool = False
+	DB_POOL_WARMUP: int = 0  # Connections opened at startup, up to DB_POOL_SIZE
+	DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection
+
+	REQUEST_TIMEOUT: float | None = None  # Default request deadline, seconds
+	STARTUP_TIMEOUT: float = 60.0  # Deadline to connect to every dependency at startup, seconds
 
 	RABBITMQ_NAME: str
 	RABBITMQ_USER: str
@@ -26,6 +40,13 @@ class Settings(BaseSettings):
 		return (f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@"
 				f"{self.DB_SOCKET}/{self.DB_NAME}")
 
+	@property
+	def db_replica_urls(self) -> list[str]:
+		return [
+			f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{socket}/{self.DB_NAME}"
+			for socket in self.DB_REPLICA_SOCKETS
+		]
+
 	@property
 	def test_db_url(self) -> str:
 		return (f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@"
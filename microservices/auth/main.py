@@ -1,19 +1,32 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from prometheus_fastapi_instrumentator import Instrumentator
 
 from api.v1 import auth_router
 from config import settings
+from core.base_connection import connect_all
+from core.base_connection.health import readiness_router
+from core.db import warm_up_pools
 from core.messaging import MessagingConnection
+from core.utils.deadline_middleware import DeadlineMiddleware
+from messaging.events import UserChangedConsumer
+from services import UserStatesRPCService
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-	rabbitmq = MessagingConnection()
-	await rabbitmq.setup_connection(settings.rabbitmq_url)
+	await asyncio.gather(
+		connect_all((MessagingConnection, settings.rabbitmq_url), timeout=settings.STARTUP_TIMEOUT),
+		warm_up_pools(),
+	)
+	await UserChangedConsumer.consume()
+	states_bootstrap = asyncio.create_task(UserStatesRPCService.bootstrap())
 	yield
-	await rabbitmq.disconnect()
+	states_bootstrap.cancel()
+	await MessagingConnection.disconnect()
 
 
 app = FastAPI(
@@ -21,7 +34,10 @@ app = FastAPI(
     docs_url="/api/v1/docs",
     openapi_url="/api/v1/openapi.json",
 )
+app.add_middleware(DeadlineMiddleware, default_timeout=settings.REQUEST_TIMEOUT)
 app.include_router(auth_router)
+app.include_router(readiness_router(MessagingConnection))
+Instrumentator().instrument(app).expose(app, include_in_schema=False)
 
 if __name__ == "__main__":
 	uvicorn.run('main:app', host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1 @@
+from .user_changed import UserChangedConsumer
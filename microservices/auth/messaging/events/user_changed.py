@@ -0,0 +1,11 @@
+from core.messaging import MessagingEventConsumerABC
+from services import UserStateMap
+
+
+class UserChangedConsumer(MessagingEventConsumerABC):
+	exchange_name = 'users.events'
+	binding_key = 'user.changed'
+
+	@classmethod
+	async def callback(cls, routing_key: str, payload: dict) -> None:
+		UserStateMap.apply(payload)
@@ -6,12 +6,13 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from core.db import Base
+from core.utils import uuid7
 
 
 class TokenBlacklist(Base):
 	__tablename__ = "token_blacklist"
 
-	jti: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, index=True)  # JWT ID
+	jti: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # JWT ID
 	created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 	def __repr__(self):
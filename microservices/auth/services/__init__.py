@@ -1,2 +1,3 @@
 from .auth import AuthRPCService
-from .tokens import JWTTokenService, TokenBlacklistService
\ No newline at end of file
+from .tokens import JWTTokenService, TokenBlacklistService
+from .user_states import UserStateMap, UserStatesRPCService
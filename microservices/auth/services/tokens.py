@@ -12,9 +12,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 from config import settings
+from core.utils import uuid7
 from exceptions.exceptions import JWTTokenValidationException, DuplicateJTIException
 from core.loggers import log
 from models import TokenBlacklist
+from services.user_states import UserStateMap
 
 TokenPair = namedtuple("TokenPair", ["access_token", "refresh_token"])
 
@@ -76,7 +78,7 @@ class JWTTokenService:
 		to_encode.update({"exp": expire})
 
 		if token_type == 'refresh_token':
-			to_encode["jti"] = str(uuid.uuid4())
+			to_encode["jti"] = str(uuid7())
 
 		encoded_jwt = jwt.encode(
 			to_encode,
@@ -112,19 +114,26 @@ class JWTTokenService:
 			log.warning(f"Token can't be decoded, PyJWTError: {e}")
 			raise JWTTokenValidationException("Token is invalid")
 
-	def obtain_token_pair(self, sub: str) -> TokenPair:
-		""" Creates and returns access and refresh JWT tokens. """
+	def obtain_token_pair(self, sub: str, credential_generation: int = 0) -> TokenPair:
+		"""
+		Creates and returns access and refresh JWT tokens.
+
+		'gen' is the user's credential generation, tokens of an older
+		generation are rejected once the user's credentials are revoked.
+		"""
 
 		# Create 'access_token'
 		access_token_expires = timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
 		access_token = self.encode_token(
-			data={"sub": sub, "type": "access_token"}, expires_delta=access_token_expires
+			data={"sub": sub, "type": "access_token", "gen": credential_generation},
+			expires_delta=access_token_expires
 		)
 		# Create 'refresh_token'
 		refresh_token_expires_minutes = 60 * 24 * self.REFRESH_TOKEN_EXPIRE_DAYS
 		refresh_token_expires = timedelta(minutes=refresh_token_expires_minutes)
 		refresh_token = self.encode_token(
-			data={"sub": sub, "type": "refresh_token"}, expires_delta=refresh_token_expires
+			data={"sub": sub, "type": "refresh_token", "gen": credential_generation},
+			expires_delta=refresh_token_expires
 		)
 		return TokenPair(access_token=access_token, refresh_token=refresh_token)
 
@@ -184,6 +193,11 @@ class JWTTokenService:
 			log.warning('"user_id" is invalid')
 			raise JWTTokenValidationException("Token is invalid")
 
+		# 5: Reject tokens of blocked users or revoked credentials, from local state
+		if not UserStateMap.is_token_current(user_id, payload.get("gen", 0)):
+			log.warning(f'Token is revoked for user: <{user_id}>')
+			raise JWTTokenValidationException("Token is invalid")
+
 		return payload
 
 	async def get_user_id(
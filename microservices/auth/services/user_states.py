@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+from typing import NamedTuple
+
+from core.loggers import log
+from core.messaging import MessagingRPCClientABC
+
+
+class UserState(NamedTuple):
+	version: int
+	credential_generation: int
+	allowed: bool
+
+
+class UserStateMap:
+	"""
+	Latest authorization state of users, kept per process.
+
+	Loaded at startup from the users service snapshot of users not in the
+	default state (inactive, banned or revoked), then kept current by 'user.changed'
+	events. One small tuple is stored per such user (keyed by the UUID's int),
+	unknown users are in the default state. Snapshot rows and events are applied
+	by the user's version, in any order: late or duplicate ones are ignored.
+	"""
+	_states: dict[int, UserState] = {}
+	blocked_roles = frozenset(('banned',))
+
+	@classmethod
+	def apply(cls, payload: dict) -> None:
+		key = uuid.UUID(payload['id']).int
+		version = payload['version']
+		current = cls._states.get(key)
+		if current is not None and current.version >= version:
+			return
+
+		allowed = payload['is_active'] and payload['role'] not in cls.blocked_roles
+		cls._states[key] = UserState(version, payload['credential_generation'], allowed)
+
+	@classmethod
+	def is_token_current(cls, user_id: uuid.UUID, credential_generation: int) -> bool:
+		""" False for blocked users and tokens issued before the last credential revocation """
+		state = cls._states.get(user_id.int)
+		if state is None:
+			return True
+
+		return state.allowed and credential_generation >= state.credential_generation
+
+
+class UserStatesRPCService(MessagingRPCClientABC):
+	"""
+	Loads the users service snapshot into UserStateMap, page by page.
+
+	Run after the 'user.changed' consumer has started, so no change is missed
+	between the snapshot and the events. Until it is loaded, tokens of users
+	changed before the process started are accepted.
+	"""
+	queue_name: str = 'rpc.users.states'
+	page_size: int = 1_000
+	retry_backoff: float = 0.5
+	retry_max_backoff: float = 30.0
+
+	@classmethod
+	async def load(cls) -> int:
+		after, loaded = None, 0
+		while True:
+			data = await cls.call(after=after, limit=cls.page_size)
+			users = data['users']
+			for payload in users:
+				UserStateMap.apply(payload)
+
+			loaded += len(users)
+			if len(users) < cls.page_size:
+				return loaded
+
+			after = users[-1]['id']
+
+	@classmethod
+	async def bootstrap(cls) -> None:
+		""" Retries with jittered exponential backoff until the users service answers """
+		attempt = 0
+		while True:
+			attempt += 1
+			try:
+				loaded = await cls.load()
+				log.info(f'[X] RPC | AUTH loaded {loaded} user state(s) from USERS')
+				return
+			except Exception as e:
+				delay = cls._backoff_delay(attempt, cls.retry_backoff, cls.retry_max_backoff)
+				log.warning(f'[!] RPC | [{attempt}] Loading user states failed: {e} Retrying in {delay:.2f} seconds...')
+				await asyncio.sleep(delay)
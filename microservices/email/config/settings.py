@@ -16,6 +16,8 @@ class Settings(BaseSettings):
 	SMTP_HOST: str = 'postfix'
 	SMTP_PORT: int = 587
 
+	STARTUP_TIMEOUT: float = 60.0  # Deadline to connect to every dependency at startup, seconds
+
 	class Config:
 		env_file = ".env"
 
@@ -34,6 +34,7 @@ class SmtpConnection(BaseConnection):
 
 	@classmethod
 	async def disconnect(cls) -> None:
+		await cls.stop_monitor()
 		if await cls._check_connection():
 			await cls._connection.quit()
 
@@ -6,6 +6,7 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 import os
 
 from config import settings
+from core.base_connection import connect_all
 from core.messaging import MessagingConnection
 from core.loggers import log
 from smtp_connection.smtp_connection import SmtpConnection
@@ -21,11 +22,11 @@ def shutdown():
 
 async def main():
 	workers = (SendResetPasswordEmailWorker,)
-	rabbit = MessagingConnection()
-	smtp = SmtpConnection()
-
-	await rabbit.setup_connection(settings.rabbitmq_url)
-	await smtp.setup_connection()
+	await connect_all(
+		(MessagingConnection, settings.rabbitmq_url),
+		(SmtpConnection, None),
+		timeout=settings.STARTUP_TIMEOUT,
+	)
 
 	for worker in workers:
 		await worker.create_worker()
@@ -38,8 +39,8 @@ async def main():
 		await shutdown_event.wait()
 	finally:
 		log.info("Shutting down gracefully...")
-		await smtp.disconnect()
-		await rabbit.disconnect()
+		await SmtpConnection.disconnect()
+		await MessagingConnection.disconnect()
 
 
 if __name__ == "__main__":
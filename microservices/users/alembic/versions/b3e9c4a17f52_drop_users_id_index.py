@@ -0,0 +1,28 @@
+"""drop users id index
+
+Revision ID: b3e9c4a17f52
+Revises: 8a4f2d6c1e37
+Create Date: 2026-10-19 13:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9c4a17f52'
+down_revision: Union[str, None] = '8a4f2d6c1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # users_pkey already indexes 'id'
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
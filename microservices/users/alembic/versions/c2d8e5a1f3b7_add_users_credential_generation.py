@@ -0,0 +1,28 @@
+"""add users credential generation
+
+Revision ID: c2d8e5a1f3b7
+Revises: f7a3d9b1c5e8
+Create Date: 2026-10-19 16:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d8e5a1f3b7'
+down_revision: Union[str, None] = 'f7a3d9b1c5e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('credential_generation', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'credential_generation')
@@ -0,0 +1,40 @@
+"""replace users email pattern index
+
+Revision ID: d5b8e2f4a6c1
+Revises: c2d8e5a1f3b7
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b8e2f4a6c1'
+down_revision: Union[str, None] = 'c2d8e5a1f3b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A text_pattern_ops index can't serve the search's ORDER BY,
+    # the search pages over (lower(email), email) in "C" collation instead
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_search '
+            'ON users ((lower(email) COLLATE "C"), (email COLLATE "C"))'
+        )
+        op.drop_index('ix_users_email_pattern', table_name='users', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_pattern', 'users', ['email'], unique=False,
+            postgresql_ops={'email': 'text_pattern_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index('ix_users_email_search', table_name='users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""add users email search indexes
+
+Revision ID: e4c1f8a2b6d3
+Revises: b3e9c4a17f52
+Create Date: 2026-10-19 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c1f8a2b6d3'
+down_revision: Union[str, None] = 'b3e9c4a17f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Built concurrently, users stay writable while the indexes are built
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_trgm', 'users', ['email'], unique=False,
+            postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_users_email_pattern', 'users', ['email'], unique=False,
+            postgresql_ops={'email': 'text_pattern_ops'},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_pattern', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_email_trgm', table_name='users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,49 @@
+"""add user stats
+
+Revision ID: f7a3d9b1c5e8
+Revises: e4c1f8a2b6d3
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from models.user_stats import USER_STATS_FUNCTION, USER_STATS_TRIGGERS
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3d9b1c5e8'
+down_revision: Union[str, None] = 'e4c1f8a2b6d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_stats',
+    sa.Column('role', postgresql.ENUM('user', 'admin', 'moderator', 'banned', name='roleenum', create_type=False), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('slot', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+    sa.PrimaryKeyConstraint('role', 'is_active', 'slot')
+    )
+    op.execute(USER_STATS_FUNCTION)
+    for trigger in USER_STATS_TRIGGERS:
+        op.execute(trigger)
+    # Initial counts, later kept by the triggers
+    op.execute("""
+    INSERT INTO user_stats (role, is_active, slot, count)
+    SELECT role, is_active, 0, count(*) FROM users GROUP BY role, is_active
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS users_stats_delete ON users')
+    op.execute('DROP TRIGGER IF EXISTS users_stats_update ON users')
+    op.execute('DROP TRIGGER IF EXISTS users_stats_insert ON users')
+    op.execute('DROP FUNCTION IF EXISTS users_stats_count()')
+    op.drop_table('user_stats')
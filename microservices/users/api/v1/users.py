@@ -1,38 +1,177 @@
 import json
+import uuid
 
-from fastapi import APIRouter, Depends, Request, Response
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.security import HTTPBearer
 
 import schemas
+from config import settings
+from core.cache import json_response_with_etag
 from core.exceptions import ExceptionDocFactory
 from core.loggers import log
+from core.utils.deadline_middleware import RouteDeadline
 from core.exceptions.http import NotFoundHTTPException, BadRequestHTTPException, \
-	CredentialsHTTPException, TooManyRequestsHTTPException
-from crud.users import TestRetrieve, TestList
+	CredentialsHTTPException, TooManyRequestsHTTPException, ForbiddenHTTPException
+from crud.users import TestRetrieve, TestList, UserEmailSearch
 from dependencies import get_reset_password_email_client, \
-	get_pwd_set_conf_cache_service, get_pwd_get_conf_cache_service, get_test_list, get_test_retrieve
+	get_pwd_set_conf_cache_service, get_pwd_get_conf_cache_service, get_test_list, get_test_retrieve, \
+	get_user_email_search, get_user_stats_service, get_user_change_service, get_current_user_id, \
+	get_admin_user_id
 from exceptions import DuplicateEmailException, OperationCacheException, UserNotFoundException, \
 	PasswordUnchangedException, ValidationConfirmationCacheException, \
-	ExceedLimitConfirmationCacheException, ConfirmationCacheException
-from exceptions.http import EmailExistsHTTPException, ResetPasswordHTTPException
+	ExceedLimitConfirmationCacheException, ConfirmationCacheException, WrongPasswordException
+from exceptions.http import EmailExistsHTTPException, ResetPasswordHTTPException, WrongPasswordHTTPException
 from messaging.clients import ResetPasswordEmailClient
 from services import PasswordSetConfirmationCacheService, \
-	PasswordGetConfirmationCacheService
+	PasswordGetConfirmationCacheService, UserStatsService, UserChangeService
+from utils.cache import UserETagCache
 
 auth_scheme = HTTPBearer()
 users_router = APIRouter(prefix='/api/v1/users', tags=['users'])
 
 @users_router.get(
 	'/users',
+	response_model=list[schemas.UserRead],
+)
+async def test(
+		request: Request,
+		after: uuid.UUID | None = None,
+		limit: int = Query(50, ge=1, le=100),
+		test: TestList = Depends(get_test_list),
+):
+	"""
+	   Users ordered by id.
+	\n The next page starts after the `X-Next-After` header value, absent on the last page.
+	"""
+	rows = await test.get_list_rows(after=after, limit=limit)
+	count = await test.count()
+	headers = {
+		'X-Total-Count': str(count.total),
+		'X-Total-Count-Exact': 'true' if count.exact else 'false',
+	}
+	if len(rows) == limit:
+		headers['X-Next-After'] = str(rows[-1]['id'])
+
+	return json_response_with_etag(request, test._to_json(rows), headers)
+
+@users_router.get(
+	'/stats',
+	response_model=schemas.UserStatsRead,
+)
+async def user_stats(stats_service: UserStatsService = Depends(get_user_stats_service)):
+	"""
+	   Counts of users by role and activity, from incrementally maintained counters.
+	"""
+	return await stats_service.get_stats()
+
+@users_router.get(
+	'/users/search',
+	response_model=list[schemas.UserRead],
+	responses={400: ExceptionDocFactory.from_exception(BadRequestHTTPException)},
+	dependencies=[Depends(RouteDeadline(settings.USER_SEARCH_TIMEOUT))],
 )
-async def test(test: TestList = Depends(get_test_list),):
-	return await test.get_list()
+async def search_users(
+		request: Request,
+		q: str = Query(min_length=1, max_length=254),
+		mode: Literal['prefix', 'substring'] = 'prefix',
+		after: str | None = Query(None, max_length=254),
+		limit: int = Query(50, ge=1, le=100),
+		search: UserEmailSearch = Depends(get_user_email_search),
+):
+	"""
+	   Finds users by partial email, case-insensitively, ordered by lowercased email.
+	\n `mode=substring` needs at least 3 characters. It sorts a capped set of matches:
+	when more users match, `X-Search-Truncated: true` is set and pages may miss some of them,
+	a longer query narrows the search.
+	\n The next page starts after the `X-Next-After` header value, absent on the last page.
+	"""
+	substring = mode == 'substring'
+	if substring and len(q) < 3:  # Shorter patterns have no trigrams to match on
+		raise BadRequestHTTPException()
+
+	page = await search.search(q, substring=substring, after=after, limit=limit)
+	headers = {'X-Next-After': page.rows[-1]['email']} if len(page.rows) == limit else {}
+	if page.truncated:
+		headers['X-Search-Truncated'] = 'true'
+
+	return json_response_with_etag(request, search._to_json(page.rows), headers)
 
 @users_router.get(
 	'/users/{user_id}',
+	response_model=schemas.UserRead,
+	responses={404: ExceptionDocFactory.from_exception(NotFoundHTTPException)},
+)
+async def test(request: Request, user_id: uuid.UUID, test: TestRetrieve = Depends(get_test_retrieve),):
+	etag_key = str(user_id)
+	not_modified = await UserETagCache.check_not_modified(request, etag_key)
+	if not_modified:
+		return not_modified
+
+	content = await test.retrieve_json(user_id)
+	if content is None:
+		raise NotFoundHTTPException()
+
+	return await UserETagCache.respond(request, etag_key, content)
+
+@users_router.patch(
+	'/users/{user_id}/status',
+	response_model=schemas.UserChanged,
+	responses={
+		401: ExceptionDocFactory.from_exception(CredentialsHTTPException),
+		403: ExceptionDocFactory.from_exception(ForbiddenHTTPException),
+		404: ExceptionDocFactory.from_exception(NotFoundHTTPException),
+	},
+	dependencies=[Depends(get_admin_user_id)],
+)
+async def update_user_status(
+		user_id: uuid.UUID,
+		data: schemas.UserStatusUpdate,
+		change_service: UserChangeService = Depends(get_user_change_service),
+):
+	"""
+	   Bans (`role=banned`), deactivates or restores a user, admins only.
+	\n The user's tokens are rejected by auth as soon as it receives the change.
+	"""
+	try:
+		return await change_service.update_status(user_id, data)
+	except UserNotFoundException as e:
+		log.info(f"/users/{{user_id}}/status * User not found: {e}")
+		raise NotFoundHTTPException()
+
+@users_router.put(
+	'/me/password',
+	response_model=schemas.UserChanged,
+	responses={
+		400: ExceptionDocFactory.from_multiple_exceptions(
+			(WrongPasswordHTTPException, ResetPasswordHTTPException),
+			description='Password Errors'
+		),
+		401: ExceptionDocFactory.from_exception(CredentialsHTTPException),
+		404: ExceptionDocFactory.from_exception(NotFoundHTTPException),
+	},
 )
-async def test(user_id: str, test: TestRetrieve = Depends(get_test_retrieve),):
-	return await test.retrieve(user_id)
+async def change_password(
+		data: schemas.ChangePassword,
+		user_id: uuid.UUID = Depends(get_current_user_id),
+		change_service: UserChangeService = Depends(get_user_change_service),
+):
+	"""
+	   Changes the caller's password.
+	\n Every token issued before is revoked, the caller has to log in again.
+	"""
+	try:
+		return await change_service.change_password(user_id, data)
+	except UserNotFoundException as e:
+		log.info(f"/me/password * User not found: {e}")
+		raise NotFoundHTTPException()
+	except WrongPasswordException as e:
+		log.info(f"/me/password * {e}")
+		raise WrongPasswordHTTPException()
+	except PasswordUnchangedException as e:
+		log.info(f"/me/password * {e}")
+		raise ResetPasswordHTTPException()
 
 
 # @users_router.post(
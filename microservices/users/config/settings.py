@@ -7,6 +7,21 @@ class Settings(BaseSettings):
 	DB_SOCKET: str
 	DB_TEST_SOCKET: str
 	DB_NAME: str
+	DB_REPLICA_SOCKETS: list[str] = []
+	DB_REPLICA_STRATEGY: str = 'round_robin'
+	DB_PRIMARY_PIN_SECONDS: float = 5.0
+
+	DB_POOL_SIZE: int = 5
+	DB_POOL_MAX_OVERFLOW: int = 10
+	DB_POOL_TIMEOUT: float = 30.0
+	DB_POOL_RECYCLE: int = 1800
+	DB_POOL_PRE_PING: bool = False
+	DB_POOL_WARMUP: int = 0  # Connections opened at startup, up to DB_POOL_SIZE
+	DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection
+
+	REQUEST_TIMEOUT: float | None = None  # Default request deadline, seconds
+	USER_SEARCH_TIMEOUT: float = 2.0  # Deadline of the email search, seconds
+	STARTUP_TIMEOUT: float = 60.0  # Deadline to connect to every dependency at startup, seconds
 
 	RABBITMQ_NAME: str
 	RABBITMQ_USER: str
@@ -21,6 +36,17 @@ class Settings(BaseSettings):
 
 	RESET_PASSWORD_MAX_ATTEMPTS: int | None = None
 
+	USER_STATS_CACHE_KEY: str = 'users:stats'
+	USER_STATS_CACHE_TIMEOUT: int = 30
+	USER_STATS_RECONCILE_INTERVAL: int = 3600  # Seconds
+
+	USER_ETAG_KEY_TEMPLATE: str = 'users:etag:{key}'
+	USER_ETAG_TIMEOUT: int = 60
+
+	IDEMPOTENCY_TTL: int = 86_400  # How long responses are replayed for a key, seconds
+	IDEMPOTENCY_LOCK_TIMEOUT: int = 60
+	IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+
 	class Config:
 		env_file = ".env"
 
@@ -29,6 +55,13 @@ class Settings(BaseSettings):
 		return (f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@"
 				f"{self.DB_SOCKET}/{self.DB_NAME}")
 
+	@property
+	def db_replica_urls(self) -> list[str]:
+		return [
+			f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{socket}/{self.DB_NAME}"
+			for socket in self.DB_REPLICA_SOCKETS
+		]
+
 	@property
 	def test_db_url(self) -> str:
 		return (f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@"
@@ -1,22 +1,194 @@
-from typing import Any, Optional
+import uuid
+from typing import Any, Mapping, Optional, NamedTuple, Sequence
 
+from sqlalchemy import Select, Update, RowMapping, Integer, String, select, bindparam, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import schemas
-from core.base_crud import AbstractListCRUD, AbstractSingleRetrieverCRUD
+from core.base_crud import ListCRUD, RetrieverCRUD, CreatorCRUD, UpdaterCRUD
+from core.base_crud.base import AFTER_PARAM, LIMIT_PARAM
+from core.db import PreparedQuery
 from exceptions import UserNotFoundException, PasswordUnchangedException
 from models import User
 from utils import password as p
+from utils.cache import UserETagCache
 
 
-class TestList(AbstractListCRUD):
+class TestList(ListCRUD):
 	model = User
 	schema = schemas.UserRead
+	order_field = 'id'
+	count_strategy = 'cached'
+	trusted_source = True
 
-class TestRetrieve(AbstractSingleRetrieverCRUD):
+class TestRetrieve(RetrieverCRUD):
 	model = User
 	schema = schemas.UserRead
 	lookup_field = 'id'
+	trusted_source = True
+
+
+class SearchPage(NamedTuple):
+	rows: Sequence[Mapping]
+	truncated: bool  # Substring search only: more matches than candidates, the page may miss some
+
+
+class UserEmailSearch(ListCRUD):
+	"""
+	Case-insensitive partial email search, keyset-paged by
+	(lower(email), email) in "C" collation, as the 'ix_users_email_search' index orders them.
+
+	Prefix search is a range scan of that index ('lower(email) >= q' and '< q'
+	with its last character incremented), so a page reads 'limit' rows.
+	Substring search ('ILIKE %q%') uses the 'pg_trgm' GIN index, which returns
+	matches in no order: at most 'candidate_limit' of them are sorted for a page,
+	and the page reports whether more matched.
+	"""
+	model = User
+	schema = schemas.UserRead
+	order_field = 'email'
+	trusted_source = True
+	candidate_limit: int = 1_000
+	pattern_param: str = 'search_pattern'
+	low_param: str = 'search_low'
+	high_param: str = 'search_high'
+	candidates_label: str = 'search_candidates'
+
+	@staticmethod
+	def _get_sort_key(email) -> tuple:
+		return func.lower(email).collate('C'), email.collate('C')
+
+	def _get_after_clause(self, email):
+		after = bindparam(AFTER_PARAM, type_=String)
+		return tuple_(*self._get_sort_key(email)) > tuple_(func.lower(after).collate('C'), after.collate('C'))
+
+	def _get_search_stmt(self, substring: bool = False, with_after: bool = False) -> Select:
+		if substring:
+			return self._get_substring_stmt(with_after)
+
+		email = self._get_order_column()
+		lowered, _ = self._get_sort_key(email)
+		stmt = self._get_stmt().where(lowered >= bindparam(self.low_param), lowered < bindparam(self.high_param))
+		if with_after:
+			stmt = stmt.where(self._get_after_clause(email))
+
+		return stmt.order_by(*self._get_sort_key(email)).limit(bindparam(LIMIT_PARAM, type_=Integer))
+
+	def _get_substring_stmt(self, with_after: bool = False) -> Select:
+		email = self._get_order_column()
+		candidates = self._get_stmt().where(email.ilike(bindparam(self.pattern_param), escape='\\'))
+		if with_after:
+			candidates = candidates.where(self._get_after_clause(email))
+
+		# One more candidate than the cap tells a truncated search from one that matched exactly the cap
+		candidates = candidates.limit(self.candidate_limit + 1).subquery()
+		return (
+			select(candidates, func.count().over().label(self.candidates_label))
+			.order_by(*self._get_sort_key(candidates.c[self.order_field]))
+			.limit(bindparam(LIMIT_PARAM, type_=Integer))
+		)
+
+	@staticmethod
+	def _escape_like(query: str) -> str:
+		return query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+	def _get_search_params(self, query: str, substring: bool) -> dict:
+		if substring:
+			return {self.pattern_param: f'%{self._escape_like(query)}%'}
+
+		low = query.lower()
+		return {self.low_param: low, self.high_param: low[:-1] + chr(ord(low[-1]) + 1)}
+
+	async def search(
+			self,
+			query: str,
+			substring: bool = False,
+			after: str | None = None,
+			limit: int = 50,
+	) -> SearchPage:
+		with_after = after is not None
+		key = 'search' + '_substring' * substring + '_after' * with_after
+		stmt = self._get_cached_stmt(key, lambda: self._get_search_stmt(substring, with_after))
+		params = {**self._get_search_params(query, substring), **self._get_keyset_params(after, limit)}
+		rows = await self._execute_stmt(stmt, params)
+		if not substring:
+			return SearchPage(rows, truncated=False)
+
+		truncated = bool(rows) and rows[0][self.candidates_label] > self.candidate_limit
+		fields = self._get_schema_fields()
+		return SearchPage([{field.key: row[field.key] for field in fields} for row in rows], truncated)
+
+
+class UserBulkCreator(CreatorCRUD):
+	model = User
+	schema = schemas.UserRead
+	trusted_source = True
+	etag_cache = UserETagCache
+
+
+class UserStatusUpdater(UpdaterCRUD):
+	""" Role, activity and credential changes, returned as 'user.changed' event payloads """
+	model = User
+	schema = schemas.UserChanged
+	version_field = 'version'
+	partial_update = True
+	etag_cache = UserETagCache
+
+	def _get_password_stmt(self) -> Update:
+		generation = User.credential_generation
+		return self._get_update_stmt().values({
+			User.hashed_password: bindparam('new_hashed_password'),
+			generation: generation + 1,
+		})
+
+	async def change_password(self, user_id: Any, hashed_password: str) -> schemas.UserChanged | None:
+		""" Sets the password and bumps the credential generation, tokens issued before are rejected by auth """
+		stmt = self._get_cached_stmt('change_password', self._get_password_stmt)
+		params = {**self._get_lookup_params(user_id), 'new_hashed_password': hashed_password}
+		rows = await self._execute_stmt(stmt, params)
+		await self._invalidate_row_stamps(rows)
+		return self._to_schema(rows[0]) if rows else None
+
+
+class UserLoginRecord(NamedTuple):
+	id: uuid.UUID
+	hashed_password: str
+	is_active: bool
+	role: str
+	credential_generation: int
+
+
+class UserLoginQuery(PreparedQuery[UserLoginRecord]):
+	""" Login lookup, the hottest users query (called on every authenticate RPC) """
+	name = 'users_login_by_email'
+	query = 'SELECT id, hashed_password, is_active, role, credential_generation FROM users WHERE email = $1'
+	record = UserLoginRecord
+
+
+class UserCredentialsQuery(PreparedQuery[UserLoginRecord]):
+	""" Same record by id, to check the caller's role and current password """
+	name = 'users_login_by_id'
+	query = 'SELECT id, hashed_password, is_active, role, credential_generation FROM users WHERE id = $1'
+	record = UserLoginRecord
+
+
+class UserStateRecord(NamedTuple):
+	id: uuid.UUID
+	role: str
+	is_active: bool
+	credential_generation: int
+	version: int
+
+
+class UserStateQuery(PreparedQuery[UserStateRecord]):
+	""" Users whose tokens auth must check (inactive, banned or revoked), keyset-paged by id """
+	name = 'users_states_after_id'
+	query = (
+		'SELECT id, role, is_active, credential_generation, version FROM users '
+		"WHERE (NOT is_active OR role = 'banned' OR credential_generation > 0) AND id > $1 "
+		'ORDER BY id LIMIT $2'
+	)
+	record = UserStateRecord
 
 
 # class UserByEmailRetriever(mixins.RetrieveModelMixin,
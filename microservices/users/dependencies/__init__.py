@@ -2,3 +2,4 @@ from .clients import *
 from .crud import *
 from .rpc import *
 from .services import *
+from .permissions import *
@@ -1,21 +1,26 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.db import get_async_session
+from core.db import get_read_only_session
 # from crud import UserByEmailRetriever, UserResetPasswordCRUD
-from crud.users import TestList, TestRetrieve
+from crud.users import TestList, TestRetrieve, UserEmailSearch
 
 
 def get_test_list(
-		db: AsyncSession = Depends(get_async_session),
+		db: AsyncSession = Depends(get_read_only_session),
 ) -> TestList:
 	return TestList(db)
 
 def get_test_retrieve(
-		db: AsyncSession = Depends(get_async_session),
+		db: AsyncSession = Depends(get_read_only_session),
 ) -> TestRetrieve:
 	return TestRetrieve(db)
 
+def get_user_email_search(
+		db: AsyncSession = Depends(get_read_only_session),
+) -> UserEmailSearch:
+	return UserEmailSearch(db)
+
 
 # def get_user_by_email_crud(
 # 		db: AsyncSession = Depends(get_async_session),
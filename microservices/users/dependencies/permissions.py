@@ -0,0 +1,32 @@
+import uuid
+
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db import get_async_session
+from core.exceptions.http import CredentialsHTTPException, ForbiddenHTTPException
+from core.loggers import log
+from crud.users import UserCredentialsQuery
+from models import RoleEnum
+
+
+def get_current_user_id(request: Request) -> uuid.UUID:
+	""" Caller authenticated by the gateway, from the 'X-User-Id' header """
+	try:
+		return uuid.UUID(request.headers['X-User-Id'])
+	except (KeyError, ValueError):
+		log.warning("Missing or invalid 'X-User-Id' header")
+		raise CredentialsHTTPException()
+
+
+async def get_admin_user_id(
+		user_id: uuid.UUID = Depends(get_current_user_id),
+		db: AsyncSession = Depends(get_async_session),
+) -> uuid.UUID:
+	""" Role read from the primary, so a revoked admin is refused at once """
+	user = await UserCredentialsQuery.fetchrow(db, user_id)
+	if user is None or not user.is_active or user.role != RoleEnum.admin.name:
+		log.warning(f"User <{user_id}> is not an active admin")
+		raise ForbiddenHTTPException()
+
+	return user_id
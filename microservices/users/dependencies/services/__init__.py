@@ -1,2 +1,4 @@
 from .passwords import *
-from .users import *
\ No newline at end of file
+from .users import *
+from .user_stats import *
+from .user_changes import *
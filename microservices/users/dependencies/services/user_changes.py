@@ -0,0 +1,11 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db import get_async_session
+from services import UserChangeService
+
+
+def get_user_change_service(
+		db: AsyncSession = Depends(get_async_session),
+) -> UserChangeService:
+	return UserChangeService(db)
@@ -0,0 +1,11 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.db import get_read_only_session
+from services import UserStatsService
+
+
+def get_user_stats_service(
+		db: AsyncSession = Depends(get_read_only_session),
+) -> UserStatsService:
+	return UserStatsService(db)
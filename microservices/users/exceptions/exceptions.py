@@ -18,6 +18,11 @@ class PasswordUnchangedException(Exception):
 	pass
 
 
+class WrongPasswordException(Exception):
+	""" Raised when the current password given to change it is wrong """
+	pass
+
+
 # ---------- STARTS CacheException ----------
 
 
@@ -72,4 +77,8 @@ class CRUDException(Exception):
 class RecordNotUniqueCRUDException(CRUDException):
 	pass
 
+class StaleRecordCRUDException(CRUDException):
+	""" Raised when a record's version changed since it was read (concurrent update) """
+	pass
+
 # ---------- STOPS CRUDException ----------
\ No newline at end of file
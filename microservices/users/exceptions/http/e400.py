@@ -10,3 +10,7 @@ class EmailExistsHTTPException(CustomHTTPException):
 class ResetPasswordHTTPException(CustomHTTPException):
 	status_code = status.HTTP_400_BAD_REQUEST
 	detail = "New password matches old one"
+
+class WrongPasswordHTTPException(CustomHTTPException):
+	status_code = status.HTTP_400_BAD_REQUEST
+	detail = "Current password is wrong"
@@ -0,0 +1,140 @@
+"""
+Bulk import of users from a CSV or NDJSON file.
+
+	python import_users.py users.csv [--chunk-size 5000] [--workers 4] [--skip-existing]
+
+Each record needs 'email' and 'password', 'role' and 'is_active' are optional.
+'is_active' defaults to true and must be one of true/false, 1/0, yes/no or on/off
+(any case), the import stops on any other value.
+The file is read in chunks, passwords of a chunk are hashed in parallel
+worker processes and the chunk is written with COPY and committed.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator
+
+import schemas
+from core.db import AsyncSessionLocal
+from core.loggers import log
+from crud.users import UserBulkCreator
+from models import RoleEnum
+from utils import password as p
+
+TRUE_VALUES = frozenset(('true', '1', 'yes', 'on'))
+FALSE_VALUES = frozenset(('false', '0', 'no', 'off'))
+
+
+def read_records(path: str) -> Iterator[dict]:
+	with open(path, newline='') as file:
+		if path.endswith('.csv'):
+			yield from csv.DictReader(file)
+			return
+
+		for line in file:
+			if line.strip():
+				yield json.loads(line)
+
+
+def parse_is_active(value) -> bool:
+	if value is None or value == '':
+		return True
+
+	normalized = str(value).strip().lower()
+	if normalized in TRUE_VALUES:
+		return True
+
+	if normalized in FALSE_VALUES:
+		return False
+
+	raise ValueError(f"Invalid 'is_active' value: {value!r}")
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+	return [p.get_password_hash(password) for password in passwords]
+
+
+async def hash_passwords_parallel(
+		pool: ProcessPoolExecutor,
+		passwords: list[str],
+		workers: int,
+) -> list[str]:
+	loop = asyncio.get_running_loop()
+	size = -(-len(passwords) // workers)  # Ceil division
+	parts = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+	hashed_parts = await asyncio.gather(
+		*(loop.run_in_executor(pool, hash_passwords, part) for part in parts)
+	)
+	return [hashed for part in hashed_parts for hashed in part]
+
+
+async def prepare_users(
+		pool: ProcessPoolExecutor,
+		records: list[dict],
+		workers: int,
+) -> list[schemas.UserInDB]:
+	users = [schemas.UserCreate(**record) for record in records]
+	is_active = []
+	for user, record in zip(users, records):
+		try:
+			is_active.append(parse_is_active(record.get('is_active')))
+		except ValueError as e:
+			raise ValueError(f"Record <{user.email}> rejected: {e}") from None
+
+	hashed_passwords = await hash_passwords_parallel(
+		pool, [user.password for user in users], workers
+	)
+	return [
+		schemas.UserInDB(
+			email=user.email,
+			hashed_password=hashed_password,
+			role=record.get('role') or RoleEnum.user,
+			is_active=active,
+		)
+		for user, record, active, hashed_password in zip(users, records, is_active, hashed_passwords)
+	]
+
+
+async def import_users(path: str, chunk_size: int, workers: int, skip_existing: bool) -> int:
+	records = read_records(path)
+	imported = 0
+	with ProcessPoolExecutor(workers) as pool:
+		async with AsyncSessionLocal() as db:
+			creator = UserBulkCreator(db)
+			while chunk := list(islice(records, chunk_size)):
+				users = await prepare_users(pool, chunk, workers)
+				imported += await creator.bulk_create(
+					users,
+					ignore_conflicts=skip_existing,
+					chunk_size=chunk_size,
+				)
+				await db.commit()
+				log.info(f"Imported {imported} users")
+
+	return imported
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Bulk import of users from a CSV or NDJSON file")
+	parser.add_argument('path', help="path to a .csv or .ndjson file")
+	parser.add_argument('--chunk-size', type=int, default=5_000)
+	parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+	parser.add_argument(
+		'--skip-existing',
+		action='store_true',
+		help="skip users whose email already exists instead of failing",
+	)
+	args = parser.parse_args()
+
+	imported = asyncio.run(
+		import_users(args.path, args.chunk_size, args.workers, args.skip_existing)
+	)
+	log.info(f"Import finished, {imported} users imported")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,11 +1,18 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
+from prometheus_fastapi_instrumentator import Instrumentator
 
 from config import settings
+from core.base_connection import connect_all
+from core.base_connection.health import readiness_router
+from core.cache import IdempotencyMiddleware
 from core.cache.cache_connection import CacheConnection
+from core.db import PrimaryPinMiddleware, warm_up_pools
 from core.loggers import sql_logger
+from core.utils.deadline_middleware import DeadlineMiddleware
 
 from api.v1 import users_router
 from core.messaging import MessagingConnection
@@ -13,13 +20,17 @@ from core.messaging import MessagingConnection
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-	reddis = CacheConnection()
-	rabbitmq = MessagingConnection()
-	await reddis.setup_connection(settings.redis_url)
-	await rabbitmq.setup_connection(settings.rabbitmq_url)
+	await asyncio.gather(
+		connect_all(
+			(CacheConnection, settings.redis_url),
+			(MessagingConnection, settings.rabbitmq_url),
+			timeout=settings.STARTUP_TIMEOUT,
+		),
+		warm_up_pools(),
+	)
 	yield
-	await reddis.disconnect()
-	await rabbitmq.disconnect()
+	await CacheConnection.disconnect()
+	await MessagingConnection.disconnect()
 
 
 app = FastAPI(
@@ -28,7 +39,17 @@ app = FastAPI(
     openapi_url="/api/v1/openapi.json"
 )
 
+app.add_middleware(PrimaryPinMiddleware)
+app.add_middleware(
+	IdempotencyMiddleware,
+	ttl=settings.IDEMPOTENCY_TTL,
+	lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+	wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+)
+app.add_middleware(DeadlineMiddleware, default_timeout=settings.REQUEST_TIMEOUT)
 app.include_router(users_router)
+app.include_router(readiness_router(CacheConnection, MessagingConnection))
+Instrumentator().instrument(app).expose(app, include_in_schema=False)
 
 if __name__ == "__main__":
 	uvicorn.run('main:app', host="0.0.0.0", port=8000, reload=True)
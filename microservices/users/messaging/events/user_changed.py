@@ -0,0 +1,6 @@
+from core.messaging import MessagingEventPublisherABC
+
+
+class UserChangedPublisher(MessagingEventPublisherABC):
+	exchange_name = 'users.events'
+	routing_key = 'user.changed'
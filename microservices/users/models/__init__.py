@@ -1 +1,2 @@
 from .users import User, RoleEnum
+from .user_stats import UserStats, USER_STATS_CORRECTION_SLOT
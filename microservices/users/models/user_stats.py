@@ -0,0 +1,78 @@
+from sqlalchemy import DDL, BigInteger, Enum, SmallInteger, event, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db import Base
+from .users import RoleEnum
+
+USER_STATS_SLOTS = 16  # Counter rows per group, concurrent writers rarely update the same row
+USER_STATS_CORRECTION_SLOT = -1  # Written by reconciliation only, never by the triggers
+
+
+class UserStats(Base):
+	"""
+	User counters by role and activity, maintained by statement-level triggers
+	on 'users' in the writing transaction. A group's count is the sum of its slots.
+	"""
+	__tablename__ = 'user_stats'
+
+	role: Mapped[RoleEnum] = mapped_column(Enum(RoleEnum), primary_key=True)
+	is_active: Mapped[bool] = mapped_column(primary_key=True)
+	slot: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+	count: Mapped[int] = mapped_column(BigInteger, default=0, server_default=text('0'))
+
+	def __repr__(self):
+		return f"<UserStats(role={self.role}, is_active={self.is_active}, slot={self.slot})>"
+
+
+# Plain SQL, also executed by the migration creating the table
+USER_STATS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION users_stats_count() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+	counter_slot smallint := floor(random() * {USER_STATS_SLOTS});
+BEGIN
+	IF TG_OP = 'INSERT' THEN
+		INSERT INTO user_stats AS s (role, is_active, slot, count)
+		SELECT role, is_active, counter_slot, count(*) FROM new_rows GROUP BY role, is_active
+		ON CONFLICT (role, is_active, slot) DO UPDATE SET count = s.count + EXCLUDED.count;
+	ELSIF TG_OP = 'DELETE' THEN
+		INSERT INTO user_stats AS s (role, is_active, slot, count)
+		SELECT role, is_active, counter_slot, -count(*) FROM old_rows GROUP BY role, is_active
+		ON CONFLICT (role, is_active, slot) DO UPDATE SET count = s.count + EXCLUDED.count;
+	ELSE
+		INSERT INTO user_stats AS s (role, is_active, slot, count)
+		SELECT role, is_active, counter_slot, sum(delta) FROM (
+			SELECT role, is_active, -1 AS delta FROM old_rows
+			UNION ALL
+			SELECT role, is_active, 1 AS delta FROM new_rows
+		) AS changes
+		GROUP BY role, is_active
+		HAVING sum(delta) <> 0
+		ON CONFLICT (role, is_active, slot) DO UPDATE SET count = s.count + EXCLUDED.count;
+	END IF;
+	RETURN NULL;
+END
+$$
+"""
+
+USER_STATS_TRIGGERS = (
+	"""
+	CREATE TRIGGER users_stats_insert AFTER INSERT ON users
+	REFERENCING NEW TABLE AS new_rows
+	FOR EACH STATEMENT EXECUTE FUNCTION users_stats_count()
+	""",
+	"""
+	CREATE TRIGGER users_stats_update AFTER UPDATE ON users
+	REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+	FOR EACH STATEMENT EXECUTE FUNCTION users_stats_count()
+	""",
+	"""
+	CREATE TRIGGER users_stats_delete AFTER DELETE ON users
+	REFERENCING OLD TABLE AS old_rows
+	FOR EACH STATEMENT EXECUTE FUNCTION users_stats_count()
+	""",
+)
+
+# Databases built with 'create_all' (tests) get the triggers too, the migration runs the same statements.
+# Listening on the metadata runs them once both tables exist.
+for statement in (USER_STATS_FUNCTION, *USER_STATS_TRIGGERS):
+	event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
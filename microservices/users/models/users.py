@@ -2,11 +2,12 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, func, Enum
+from sqlalchemy import DateTime, func, Enum, text, Index
 from sqlalchemy.orm import mapped_column, Mapped
 from sqlalchemy.dialects.postgresql import UUID
 
 from core.db import Base
+from core.utils import uuid7
 
 
 class RoleEnum(enum.Enum):
@@ -18,13 +19,22 @@ class RoleEnum(enum.Enum):
 
 class User(Base):
 	__tablename__ = 'users'
+	__table_args__ = (
+		Index('ix_users_email_trgm', 'email', postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}),
+	)
 
-	id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+	id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid7)
 	email: Mapped[str] = mapped_column(unique=True, nullable=False, index=True)
 	hashed_password: Mapped[str] = mapped_column(nullable=False)
 	is_active: Mapped[bool] = mapped_column(default=False)
 	role: Mapped[RoleEnum] = mapped_column(Enum(RoleEnum), default=RoleEnum.user, nullable=False)
 	created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+	version: Mapped[int] = mapped_column(default=1, server_default=text('1'))  # Bumped by every update
+	credential_generation: Mapped[int] = mapped_column(default=0, server_default=text('0'))  # Bumped to revoke issued tokens
 
 	def __repr__(self):
 		return f"<User(email={self.email})>"
+
+
+# Email search order: case-insensitive, byte-wise so a prefix is one contiguous range
+Index('ix_users_email_search', func.lower(User.email).collate('C'), User.email.collate('C'))
@@ -1,2 +1,3 @@
-from .users import UserBase, UserRead, UserCreate, UserInDB, UserFull
-from .passwords import ForgotPassword, ResetPassword, UserForgotPassword
+from .users import UserBase, UserRead, UserCreate, UserInDB, UserFull, UserStatsRead, \
+	UserStatusUpdate, UserChanged
+from .passwords import ForgotPassword, ResetPassword, UserForgotPassword, ChangePassword
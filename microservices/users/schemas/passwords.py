@@ -24,3 +24,5 @@ class ResetPassword(UserPassword):
 		return model
 
 
+class ChangePassword(ResetPassword):
+	current_password: str
@@ -41,6 +41,29 @@ class UserRead(BaseModel):
 	model_config = ConfigDict(from_attributes=True)
 
 
+class UserStatsRead(BaseModel):
+	total: int
+	active: int
+	by_role: dict[RoleEnum, int]
+	active_by_role: dict[RoleEnum, int]
+
+
+class UserStatusUpdate(BaseModel):
+	role: RoleEnum | None = None
+	is_active: bool | None = None
+
+
+class UserChanged(BaseModel):
+	""" Payload of 'user.changed' events """
+	id: UUID
+	role: RoleEnum
+	is_active: bool
+	credential_generation: int
+	version: int
+
+	model_config = ConfigDict(from_attributes=True)
+
+
 class UserInDB(UserBase):
 	""" Validates data before creating a user instance """
 	hashed_password: str
@@ -1,2 +1,4 @@
 from .users import *
-from .passwords import PasswordGetConfirmationCacheService, PasswordSetConfirmationCacheService
\ No newline at end of file
+from .passwords import PasswordGetConfirmationCacheService, PasswordSetConfirmationCacheService
+from .user_stats import UserStatsService
+from .user_changes import UserChangeService
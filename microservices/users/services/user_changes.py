@@ -0,0 +1,68 @@
+import uuid
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import schemas
+from core.base_crud import UnitOfWork
+from crud.users import UserStatusUpdater, UserCredentialsQuery, UserStateQuery
+from exceptions import UserNotFoundException, PasswordUnchangedException, WrongPasswordException
+from messaging.events import UserChangedPublisher
+from utils import password as p
+
+
+class UserChangeService:
+	"""
+	Changes that affect authorization (role, activity, credentials).
+
+	Every change runs in a unit of work, once committed it is published as a 'user.changed' event,
+	the auth service rejects tokens of banned, deactivated or revoked users
+	from its local copy of these events. 'get_states' is the snapshot
+	auth loads at startup, events published before it started are not replayed.
+	"""
+
+	def __init__(self, db: AsyncSession):
+		self.db = db
+		self.updater = UserStatusUpdater(db)
+
+	async def update_status(self, user_id: Any, data: schemas.UserStatusUpdate) -> schemas.UserChanged:
+		async with UnitOfWork(self.db) as uow:
+			user = await self.updater.update(user_id, data)
+			self.__publish_after_commit(uow, user_id, user)
+
+		return user
+
+	async def change_password(self, user_id: uuid.UUID, data: schemas.ChangePassword) -> schemas.UserChanged:
+		""" Also revokes the tokens issued before the change """
+		user = await UserCredentialsQuery.fetchrow(self.db, user_id)
+		if user is None:
+			raise UserNotFoundException(f"User not found: <{user_id}>")
+
+		if not p.verify_password(data.current_password, user.hashed_password):
+			raise WrongPasswordException(f"Wrong current password for user: <{user_id}>")
+
+		if data.password == data.current_password:
+			raise PasswordUnchangedException(f"New password matches old one for user: <{user_id}>")
+
+		async with UnitOfWork(self.db) as uow:
+			changed = await self.updater.change_password(user_id, p.get_password_hash(data.password))
+			self.__publish_after_commit(uow, user_id, changed)
+
+		return changed
+
+	async def get_states(self, after: uuid.UUID | None = None, limit: int = 1_000) -> list[dict]:
+		""" 'user.changed' payloads of users not in the default state (active, not banned, never revoked) """
+		rows = await UserStateQuery.fetch(self.db, after or uuid.UUID(int=0), limit)
+		return [schemas.UserChanged.model_validate(row._asdict()).model_dump(mode='json') for row in rows]
+
+	@staticmethod
+	def __publish_after_commit(
+			uow: UnitOfWork,
+			user_id: Any,
+			user: schemas.UserChanged | list | None,
+	) -> None:
+		""" Raising rolls the unit of work back """
+		if not user:
+			raise UserNotFoundException(f"User not found: <{user_id}>")
+
+		uow.after_commit(lambda: UserChangedPublisher.publish(user.model_dump(mode='json')))
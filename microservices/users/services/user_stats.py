@@ -0,0 +1,163 @@
+import asyncio
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import schemas
+from config import settings
+from core.cache import CacheConnection
+from core.db import AsyncSessionLocal
+from core.loggers import log
+from models import User, UserStats, RoleEnum, USER_STATS_CORRECTION_SLOT
+
+SERIALIZATION_FAILURE = '40001'  # SQLSTATE
+
+
+class UserStatsService:
+	"""
+	Reads user counters (kept by triggers on 'users') through a Redis mirror.
+
+	The mirror is a hash of '<role>:<0|1>' -> count, expiring after
+	'cache_timeout' seconds; a miss sums the counter slots in the database.
+	"""
+	cache_key: str = settings.USER_STATS_CACHE_KEY
+	cache_timeout: int = settings.USER_STATS_CACHE_TIMEOUT
+	reconcile_attempts: int = 3
+
+	def __init__(self, db: AsyncSession) -> None:
+		self.db = db
+
+	async def get_stats(self) -> schemas.UserStatsRead:
+		counts = await self._get_cached_counts()
+		if counts is None:
+			counts = await self._get_db_counts()
+			await self._cache_counts(counts)
+
+		return self._to_schema(counts)
+
+	async def _get_db_counts(self) -> dict[str, int]:
+		stmt = (
+			select(UserStats.role, UserStats.is_active, func.sum(UserStats.count))
+			.group_by(UserStats.role, UserStats.is_active)
+		)
+		result = await self.db.execute(stmt)
+		return {self._get_field(role, is_active): int(count) for role, is_active, count in result.all()}
+
+	async def _get_cached_counts(self) -> dict[str, int] | None:
+		try:
+			cache = await CacheConnection.get_connection()
+			counts = await cache.hgetall(self.cache_key)
+		except Exception as e:
+			log.warning(f"Failed to read user stats from cache: {e}")
+			return None
+
+		if not counts:
+			return None
+
+		return {field: int(count) for field, count in counts.items()}
+
+	async def _cache_counts(self, counts: dict[str, int]) -> None:
+		try:
+			cache = await CacheConnection.get_connection()
+			async with cache.pipeline(transaction=True) as pipe:
+				pipe.delete(self.cache_key)
+				if counts:
+					pipe.hset(self.cache_key, mapping=counts)
+					pipe.expire(self.cache_key, self.cache_timeout)
+
+				await pipe.execute()
+		except Exception as e:
+			log.warning(f"Failed to write user stats to cache: {e}")
+
+	@staticmethod
+	def _get_field(role: RoleEnum, is_active: bool) -> str:
+		return f"{role.name}:{int(is_active)}"
+
+	@staticmethod
+	def _to_schema(counts: dict[str, int]) -> schemas.UserStatsRead:
+		by_role = dict.fromkeys(RoleEnum, 0)
+		active_by_role = dict.fromkeys(RoleEnum, 0)
+		for field, count in counts.items():
+			role_name, is_active = field.split(':')
+			role = RoleEnum[role_name]
+			by_role[role] += count
+			if is_active == '1':
+				active_by_role[role] += count
+
+		return schemas.UserStatsRead(
+			total=sum(by_role.values()),
+			active=sum(active_by_role.values()),
+			by_role=by_role,
+			active_by_role=active_by_role,
+		)
+
+	async def reconcile(self) -> int:
+		"""
+		Recomputes the counts with GROUP BY and adds the drift to the correction
+		slot of each group. Both sides are read in one REPEATABLE READ snapshot,
+		so writes committed meanwhile keep their own trigger deltas and are not lost.
+		The triggers never write the correction slot, so they don't conflict with it;
+		a concurrent reconciliation does, and the loser retries.
+		Returns the number of corrected groups.
+		"""
+		for attempt in range(1, self.reconcile_attempts + 1):
+			try:
+				return await self._reconcile()
+			except DBAPIError as e:
+				await self.db.rollback()
+				if getattr(e.orig, 'sqlstate', None) != SERIALIZATION_FAILURE or attempt == self.reconcile_attempts:
+					raise
+
+				log.info(f"[{attempt}/{self.reconcile_attempts}] User stats reconciliation conflicted, retrying")
+
+	async def _reconcile(self) -> int:
+		await self.db.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+		actual_stmt = select(User.role, User.is_active, func.count()).group_by(User.role, User.is_active)
+		actual = {
+			self._get_field(role, is_active): count
+			for role, is_active, count in (await self.db.execute(actual_stmt)).all()
+		}
+		counted = await self._get_db_counts()
+
+		corrections = self._get_corrections(actual, counted)
+		if corrections:
+			log.warning(f"User stats drifted, correcting: {corrections}")
+			stmt = insert(UserStats).values(corrections)
+			stmt = stmt.on_conflict_do_update(
+				index_elements=[UserStats.role, UserStats.is_active, UserStats.slot],
+				set_={UserStats.count: UserStats.count + stmt.excluded.count},
+			)
+			await self.db.execute(stmt)
+
+		await self.db.commit()
+		await self._cache_counts(actual)
+		return len(corrections)
+
+	@staticmethod
+	def _get_corrections(actual: dict[str, int], counted: dict[str, int]) -> list[dict]:
+		""" Rows adding each group's drift to its correction slot """
+		corrections = []
+		for field in sorted(actual.keys() | counted.keys()):
+			drift = actual.get(field, 0) - counted.get(field, 0)
+			if drift:
+				role_name, is_active = field.split(':')
+				corrections.append({
+					'role': RoleEnum[role_name],
+					'is_active': is_active == '1',
+					'slot': USER_STATS_CORRECTION_SLOT,
+					'count': drift,
+				})
+
+		return corrections
+
+	@classmethod
+	async def reconcile_periodically(cls, interval: float) -> None:
+		while True:
+			await asyncio.sleep(interval)
+			try:
+				async with AsyncSessionLocal() as db:
+					await cls(db).reconcile()
+			except Exception as e:
+				log.error(f"User stats reconciliation failed: {e}")
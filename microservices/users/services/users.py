@@ -1,3 +1,12 @@
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.loggers import log
+from crud.users import UserLoginQuery, UserLoginRecord
+from models import RoleEnum
+from utils import password as p
+
 # from typing import Dict
 #
 # from sqlalchemy.exc import IntegrityError
@@ -43,57 +52,52 @@
 # 			raise DuplicateEmailException
 #
 #
-# class LoginService(mixins.RetrieveModelMixin[User, schemas.UserFull],
-# 				   BaseCRUD[User, schemas.UserFull]):
-# 	model = User
-# 	schema = schemas.UserFull
-# 	lookup_field = 'email'
-#
-# 	def __init__(self, db: AsyncSession):
-# 		super().__init__(db)
-#
-# 	@staticmethod
-# 	def check_permission(user: schemas.UserFull) -> bool:
-# 		if not user.is_active:
-# 			return False
-#
-# 		if user.role == RoleEnum.banned:
-# 			return False
-#
-# 		return True
-#
-# 	async def authenticate(
-# 			self,
-# 			username: str,
-# 			password: str,
-# 	) -> Dict[str, str]:
-# 		"""
-# 		Authenticates user
-#
-# 		Returns {"user_id": user.id}
-# 		"""
-#
-# 		data = {}
-# 		user = await self.retrieve(username)
-#
-# 		if not user:
-# 			log.info(f'[!] RPC | No such user: <{username}>')
-# 			return data
-#
-# 		if not p.verify_password(password, user.hashed_password):
-# 			log.info(f'[!] RPC | Wrong password for user: <{username}>')
-# 			return data
-#
-# 		permission = self.check_permission(user)
-# 		if not permission:
-# 			log.info(f'[!] RPC | No permission for user: <{username}>')
-# 			return data
-#
-# 		data.setdefault('user_id', str(user.id)) # UUID to str
-# 		# data.setdefault('role', str(user.role.value))  # UUID to str
-# 		return data
-#
-#
+class LoginService:
+	def __init__(self, db: AsyncSession):
+		self.db = db
+
+	@staticmethod
+	def check_permission(user: UserLoginRecord) -> bool:
+		if not user.is_active:
+			return False
+
+		if user.role == RoleEnum.banned.name:
+			return False
+
+		return True
+
+	async def authenticate(
+			self,
+			username: str,
+			password: str,
+	) -> Dict[str, str | int]:
+		"""
+		Authenticates user
+
+		Returns {"user_id": user.id, "credential_generation": user.credential_generation}
+		"""
+
+		data = {}
+		user = await UserLoginQuery.fetchrow(self.db, username)
+
+		if not user:
+			log.info(f'[!] RPC | No such user: <{username}>')
+			return data
+
+		if not p.verify_password(password, user.hashed_password):
+			log.info(f'[!] RPC | Wrong password for user: <{username}>')
+			return data
+
+		permission = self.check_permission(user)
+		if not permission:
+			log.info(f'[!] RPC | No permission for user: <{username}>')
+			return data
+
+		data.setdefault('user_id', str(user.id)) # UUID to str
+		data.setdefault('credential_generation', user.credential_generation)
+		return data
+
+
 # class UserMeService(mixins.RetrieveModelMixin[User, schemas.UserRead],
 # 					BaseCRUD[User, schemas.UserRead]):
 # 	model = User
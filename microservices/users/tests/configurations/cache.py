@@ -0,0 +1,39 @@
+class InMemoryCache:
+	""" The Redis commands used by the cache helpers, expiry is not simulated """
+
+	def __init__(self):
+		self.data = {}
+
+	async def set(self, key, value, nx=False, ex=None, px=None):
+		if nx and key in self.data:
+			return None
+
+		self.data[key] = value
+		return True
+
+	async def get(self, key):
+		return self.data.get(key)
+
+	async def delete(self, key):
+		self.data.pop(key, None)
+
+	def pipeline(self, transaction=True):
+		return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+	def __init__(self, cache: InMemoryCache):
+		self.cache = cache
+		self.commands = []
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc):
+		return False
+
+	def set(self, *args, **kwargs):
+		self.commands.append(self.cache.set(*args, **kwargs))
+
+	async def execute(self):
+		return [await command for command in self.commands]
@@ -1,10 +1,10 @@
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy import NullPool
+from sqlalchemy import NullPool, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from config import settings
-from core.db import get_async_session
+from core.db import get_async_session, get_read_only_session
 from main import app
 import models
 
@@ -17,6 +17,7 @@ async def test_prepare_database():
 	print("Preparing database")
 	async with test_engine.begin() as conn:
 		await conn.run_sync(models.Base.metadata.drop_all)
+		await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))  # Email search index
 		await conn.run_sync(models.Base.metadata.create_all)
 
 
@@ -36,6 +37,7 @@ async def db():
 @pytest_asyncio.fixture(loop_scope="function")
 async def client(db):
 	app.dependency_overrides[get_async_session] = lambda: db
+	app.dependency_overrides[get_read_only_session] = lambda: db
 
 	async with AsyncClient(
 			transport=ASGITransport(app=app), base_url="http://test"
@@ -19,10 +19,7 @@ async def user(db, user_data):
 	user = User(
 		email=user_data['email'],
 		hashed_password=p.get_password_hash(user_data['password']),
-		first_name="Test",
-		last_name="User",
 		is_active=True,
-		is_admin=False
 	)
 	db.add(user)
 	await db.commit()
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from core.cache.auto_pipeline import AutoPipeline
+
+
+class FakeClient:
+	""" Answers every command with its arguments, records the pipelines sent """
+
+	def __init__(self):
+		self.commands = []
+		self.pipelines = []
+		self.error: Exception | None = None
+		self.release = asyncio.Event()
+		self.release.set()
+
+	async def execute_command(self, *args, **options):
+		self.commands.append(args)
+		return args
+
+	def pipeline(self, transaction=True):
+		return FakePipeline(self)
+
+
+class FakePipeline:
+	def __init__(self, client: FakeClient):
+		self.client = client
+		self.commands = []
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc):
+		return False
+
+	def execute_command(self, *args, **options):
+		self.commands.append(args)
+
+	async def execute(self, raise_on_error=True):
+		self.client.pipelines.append(self.commands)
+		await self.client.release.wait()
+		if self.client.error is not None:
+			raise self.client.error
+
+		return [ValueError("wrong type") if args[-1] == 'bad' else args for args in self.commands]
+
+
+@pytest.fixture
+def client():
+	return FakeClient()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_commands_share_one_pipeline(client):
+	pipeline = AutoPipeline(client)
+	results = await asyncio.gather(*(pipeline.get(f'key-{i}') for i in range(5)))
+
+	assert results == [('GET', f'key-{i}') for i in range(5)]
+	assert len(client.pipelines) == 1
+	assert not client.commands
+	assert pipeline.stats.snapshot()['batches'] == 1
+
+
+@pytest.mark.asyncio
+async def test_lone_command_skips_pipeline(client):
+	pipeline = AutoPipeline(client)
+
+	assert await pipeline.get('key') == ('GET', 'key')
+	assert client.commands == [('GET', 'key')]
+	assert not client.pipelines
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_max_batch(client):
+	pipeline = AutoPipeline(client, max_batch=2)
+	await asyncio.gather(*(pipeline.get(f'key-{i}') for i in range(5)))
+
+	assert [len(commands) for commands in client.pipelines] == [2, 2]
+	assert client.commands == [('GET', 'key-4')]
+
+
+@pytest.mark.asyncio
+async def test_command_error_fails_only_its_caller(client):
+	pipeline = AutoPipeline(client)
+	results = await asyncio.gather(pipeline.get('good'), pipeline.get('bad'), return_exceptions=True)
+
+	assert results[0] == ('GET', 'good')
+	assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_error_fans_out_to_every_caller(client):
+	pipeline = AutoPipeline(client)
+	client.error = ConnectionError("connection reset")
+	results = await asyncio.gather(*(pipeline.get(f'key-{i}') for i in range(3)), return_exceptions=True)
+
+	assert all(result is client.error for result in results)
+	assert pipeline.stats.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_fails_pending_callers(client):
+	pipeline = AutoPipeline(client)
+	client.release.clear()
+	futures = [pipeline.get(f'key-{i}') for i in range(3)]
+	while not client.pipelines:
+		await asyncio.sleep(0)
+
+	for task in list(pipeline._flushes):
+		task.cancel()
+
+	results = await asyncio.wait_for(asyncio.gather(*futures, return_exceptions=True), timeout=1)
+	assert all(isinstance(result, ConnectionError) for result in results)
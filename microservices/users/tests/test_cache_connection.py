@@ -0,0 +1,71 @@
+import pytest
+from redis.asyncio import Redis
+
+from core.cache import CacheConnection
+
+
+class FakeRedis:
+	def __init__(self, alive: bool = True):
+		self.alive = alive
+		self.closed = False
+		self.connection_pool = self
+
+	async def ping(self):
+		if not self.alive:
+			raise ConnectionError("connection refused")
+
+		return True
+
+	async def close(self):
+		self.closed = True
+
+	async def disconnect(self):
+		pass
+
+
+@pytest.fixture
+def clients(monkeypatch):
+	created = []
+
+	async def from_url(url, decode_responses):
+		client = FakeRedis()
+		created.append(client)
+		return client
+
+	monkeypatch.setattr(Redis, 'from_url', from_url)
+	monkeypatch.setattr(CacheConnection, 'auto_pipeline', False)
+	monkeypatch.setattr(CacheConnection, '_connection', None)
+	return created
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replaces_stale_client(clients):
+	stale = await CacheConnection._connect('redis://cache')
+	stale.alive = False
+
+	assert await CacheConnection._connect('redis://cache') is clients[1]
+	assert await CacheConnection._check_connection()
+	assert stale.closed
+
+
+@pytest.mark.asyncio
+async def test_failed_reconnect_keeps_current_client(clients, monkeypatch):
+	current = await CacheConnection._connect('redis://cache')
+
+	async def from_url(url, decode_responses):
+		return FakeRedis(alive=False)
+
+	monkeypatch.setattr(Redis, 'from_url', from_url)
+	with pytest.raises(ConnectionError):
+		await CacheConnection._connect('redis://cache')
+
+	assert CacheConnection._connection is current
+	assert not current.closed
+
+
+@pytest.mark.parametrize('attempt', range(1, 12))
+def test_backoff_delay_is_capped(attempt):
+	delays = [CacheConnection._backoff_delay(attempt, 0.25, 10.0) for _ in range(200)]
+
+	assert all(0 <= delay <= min(10.0, 0.25 * 2 ** attempt) for delay in delays)
+	assert len(set(delays)) > 1  # Jittered
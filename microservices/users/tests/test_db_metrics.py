@@ -0,0 +1,60 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import CollectorRegistry
+from sqlalchemy import make_url
+from sqlalchemy.engine.interfaces import CacheStats
+
+from core.db.metrics import DBStatsCollector
+from core.db.pool import InstrumentedPool
+from core.db.session_stats import SessionUsageStats
+from core.db.statement_cache import StatementCacheStats
+
+
+@pytest.fixture
+def registry(monkeypatch):
+	monkeypatch.setattr(StatementCacheStats, '_counters', dict.fromkeys(CacheStats, 0))
+	monkeypatch.setattr(SessionUsageStats, '_counters', {'touched': 0, 'untouched': 0})
+	pool = InstrumentedPool(lambda: sqlite3.connect(':memory:'), pool_size=3)
+	engines = [
+		SimpleNamespace(url=make_url('postgresql+asyncpg://db-primary/users'), pool=pool),
+		SimpleNamespace(url=make_url('postgresql+asyncpg://db-replica/users'), pool=object()),
+	]
+	registry = CollectorRegistry()
+	registry.register(DBStatsCollector(engines))
+	return registry, pool
+
+
+def test_statement_and_session_counters(registry):
+	registry, _ = registry
+	StatementCacheStats._counters[CacheStats.CACHE_HIT] += 3
+	StatementCacheStats._counters[CacheStats.CACHE_MISS] += 1
+	StatementCacheStats._counters[CacheStats.NO_DIALECT_SUPPORT] += 2
+	SessionUsageStats._counters['untouched'] += 4
+
+	assert registry.get_sample_value('db_statements_total', {'cache': 'hits'}) == 3
+	assert registry.get_sample_value('db_statements_total', {'cache': 'misses'}) == 1
+	assert registry.get_sample_value('db_statements_total', {'cache': 'uncached'}) == 2
+	assert registry.get_sample_value('db_sessions_total', {'usage': 'touched'}) == 0
+	assert registry.get_sample_value('db_sessions_total', {'usage': 'untouched'}) == 4
+
+
+def test_pool_metrics_are_read_on_scrape(registry):
+	registry, pool = registry
+	pool.stats.record_wait(0.25)
+	pool.stats.record_wait(0.5)
+	pool.stats.timeouts += 1
+	labels = {'host': 'db-primary'}
+
+	assert registry.get_sample_value('db_pool_size', labels) == 3
+	assert registry.get_sample_value('db_pool_checkouts_total', labels) == 2
+	assert registry.get_sample_value('db_pool_wait_seconds_total', labels) == 0.75
+	assert registry.get_sample_value('db_pool_wait_max_seconds', labels) == 0.5
+	assert registry.get_sample_value('db_pool_timeouts_total', labels) == 1
+
+
+def test_uninstrumented_pools_are_skipped(registry):
+	registry, _ = registry
+
+	assert registry.get_sample_value('db_pool_size', {'host': 'db-replica'}) is None
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from core.db.statement_timeout import QUERY_CANCELED, StatementTimeout
+from core.utils import DeadlineExceeded, deadline_scope, get_remaining, check_deadline
+from core.utils.deadline_middleware import DeadlineMiddleware, RouteDeadline
+
+
+def scope_with_timeout(value: str | None) -> dict:
+	headers = [(b'x-request-timeout', value.encode())] if value is not None else []
+	return {'type': 'http', 'headers': headers}
+
+
+@pytest.mark.parametrize('default_timeout, header, expected', [
+	(None, None, None),
+	(5.0, None, 5.0),
+	(None, '1500', 1.5),
+	(5.0, '1500', 1.5),
+	(5.0, '60000', 5.0),  # The header can't extend the default
+	(5.0, '0', 5.0),
+	(5.0, '-100', 5.0),
+	(None, '-100', None),
+	(5.0, 'soon', 5.0),
+])
+def test_deadline_timeout(default_timeout, header, expected):
+	middleware = DeadlineMiddleware(app=None, default_timeout=default_timeout)
+	assert middleware._get_timeout(scope_with_timeout(header)) == expected
+
+
+def test_no_deadline_outside_scope():
+	assert get_remaining() is None
+	check_deadline()
+
+
+def test_nested_scope_keeps_earlier_deadline():
+	with deadline_scope(1.0):
+		with deadline_scope(60.0):  # Can't extend the outer budget
+			assert get_remaining() <= 1.0
+
+		with deadline_scope(0.5):
+			assert get_remaining() <= 0.5
+
+		assert 0.5 < get_remaining() <= 1.0
+
+	assert get_remaining() is None
+
+
+def test_expired_deadline_raises():
+	with deadline_scope(0.0):
+		assert get_remaining() <= 0
+		with pytest.raises(DeadlineExceeded):
+			check_deadline()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def deadline_client():
+	app = FastAPI()
+
+	@app.get('/slow', dependencies=[Depends(RouteDeadline(0.05))])
+	async def slow():
+		await asyncio.sleep(5)
+
+	@app.get('/fast', dependencies=[Depends(RouteDeadline(5.0))])
+	async def fast():
+		await asyncio.sleep(0.1)
+		return {'remaining': get_remaining()}
+
+	@app.get('/cancelled')
+	async def cancelled():
+		raise DeadlineExceeded("statement timeout")
+
+	app.add_middleware(DeadlineMiddleware, default_timeout=1.0)
+	transport = ASGITransport(app=app, raise_app_exceptions=False)
+	async with AsyncClient(transport=transport, base_url="http://test") as client:
+		yield client
+
+
+@pytest.mark.asyncio
+async def test_route_deadline_cancels_request(deadline_client):
+	started = time.monotonic()
+	response = await deadline_client.get('/slow')
+
+	assert response.status_code == 504
+	assert time.monotonic() - started < 1.0  # Before the middleware's default
+
+
+@pytest.mark.asyncio
+async def test_route_deadline_does_not_extend_request_deadline(deadline_client):
+	response = await deadline_client.get('/fast')
+
+	assert response.status_code == 200
+	assert response.json()['remaining'] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_deadline_exceeded_answers_504(deadline_client):
+	response = await deadline_client.get('/cancelled')
+
+	assert response.status_code == 504
+
+
+class QueryCanceled(Exception):
+	sqlstate = QUERY_CANCELED
+
+
+def test_statement_timeout_cancellation_is_deadline_exceeded():
+	context = SimpleNamespace(original_exception=QueryCanceled())
+	StatementTimeout._on_error(context)  # No deadline, left to the database error
+
+	with deadline_scope(1.0):
+		with pytest.raises(DeadlineExceeded):
+			StatementTimeout._on_error(context)
+
+		StatementTimeout._on_error(SimpleNamespace(original_exception=ValueError()))
@@ -0,0 +1,118 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import schemas
+from core.base_crud import DeleterCRUD
+from core.cache import etag_matches
+from crud.users import UserStatusUpdater
+from models import User
+from tests.configurations.cache import InMemoryCache
+from utils.cache import UserETagCache
+
+KEY = str(uuid.uuid4())
+
+
+@pytest.fixture
+def cache(monkeypatch):
+	cache = InMemoryCache()
+	monkeypatch.setattr(UserETagCache, '_connection', cache)
+	return cache
+
+
+@pytest.mark.asyncio
+async def test_stamp_is_not_overwritten(cache):
+	await UserETagCache.set_stamp(KEY, '"new"')
+	await UserETagCache.set_stamp(KEY, '"old"')
+
+	assert await UserETagCache.get_stamp(KEY) == '"new"'
+
+
+@pytest.mark.asyncio
+async def test_stale_read_cannot_stamp_after_invalidation(cache):
+	await UserETagCache.set_stamp(KEY, '"v1"')
+	await UserETagCache.invalidate(KEY)
+	await UserETagCache.set_stamp(KEY, '"v1"')  # Read from a replica that hasn't replayed the write
+
+	assert await UserETagCache.get_stamp(KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_crud_write_invalidates_row_stamps(cache):
+	user_ids = [uuid.uuid4(), uuid.uuid4()]
+	for user_id in user_ids:
+		await UserETagCache.set_stamp(str(user_id), '"v1"')
+
+	await UserStatusUpdater(SimpleNamespace(info={}))._invalidate_row_stamps({'id': user_id} for user_id in user_ids)
+
+	for user_id in user_ids:
+		assert await UserETagCache.get_stamp(str(user_id)) is None
+
+
+@pytest.mark.asyncio
+async def test_stamps_are_keyed_on_canonical_uuid(cache):
+	user_id = uuid.uuid4()
+	await UserETagCache.set_stamp('{' + str(user_id).upper() + '}', '"v1"')
+
+	assert await UserETagCache.get_stamp(user_id.hex) == '"v1"'
+
+	await UserStatusUpdater(SimpleNamespace(info={}))._invalidate_row_stamps([{'id': user_id}])
+	assert await UserETagCache.get_stamp(str(user_id).upper()) is None
+
+
+class UserBatchDeleter(DeleterCRUD):
+	model = User
+	schema = schemas.UserRead
+	etag_cache = UserETagCache
+
+
+class BatchSession:
+	""" Deletes 'batches' of user ids in turn, records the statements and commits """
+
+	def __init__(self, batches: list[list[uuid.UUID]]):
+		self.batches = batches
+		self.statements = []
+		self.commits = 0
+		self.info = {}
+
+	async def execute(self, stmt, params=None):
+		self.statements.append(stmt)
+		keys = self.batches.pop(0)
+		return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: keys))
+
+	async def commit(self):
+		self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_destroy_in_batches_invalidates_deleted_rows(cache):
+	batches = [[uuid.uuid4(), uuid.uuid4()], [uuid.uuid4()]]
+	deleted_ids = [user_id for batch in batches for user_id in batch]
+	for user_id in deleted_ids:
+		await UserETagCache.set_stamp(str(user_id), '"v1"')
+
+	db = BatchSession([list(batch) for batch in batches])
+	deleted = await UserBatchDeleter(db).destroy_in_batches(batch_size=2)
+
+	assert deleted == 3
+	assert db.commits == 2
+	assert 'RETURNING users.id' in str(db.statements[0])
+	for user_id in deleted_ids:
+		assert await UserETagCache.get_stamp(str(user_id)) is None
+
+
+@pytest.mark.parametrize('if_none_match, etag, expected', [
+	(None, '"abc"', False),
+	('', '"abc"', False),
+	('"abc"', '"abc"', True),
+	('"abd"', '"abc"', False),
+	('W/"abc"', '"abc"', True),  # Weak comparison
+	('"abc"', 'W/"abc"', True),
+	('"x", "abc" , "y"', '"abc"', True),
+	('"x","y"', '"abc"', False),
+	(' * ', '"abc"', True),
+	('abc', '"abc"', False),  # Unquoted tags are not the same opaque tag
+])
+def test_etag_matches(if_none_match, etag, expected):
+	assert etag_matches(if_none_match, etag) is expected
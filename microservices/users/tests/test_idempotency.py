@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from fastapi import Body, FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from core.cache import CacheConnection, IdempotencyMiddleware
+from tests.configurations.cache import InMemoryCache
+
+
+class Handler:
+	def __init__(self):
+		self.calls = 0
+		self.release = asyncio.Event()
+		self.release.set()
+		self.fail = False
+
+	async def __call__(self, payload: dict = Body(...)):
+		self.calls += 1
+		await self.release.wait()
+		if self.fail:
+			raise RuntimeError("handler failed")
+
+		return {'call': self.calls, 'payload': payload}
+
+
+@pytest.fixture
+def handler():
+	return Handler()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def idempotent_client(monkeypatch, handler):
+	monkeypatch.setattr(CacheConnection, '_connection', InMemoryCache())
+	app = FastAPI()
+	app.add_api_route('/items', handler, methods=['POST'], status_code=201)
+	app.add_middleware(IdempotencyMiddleware, wait_timeout=0.2)
+
+	transport = ASGITransport(app=app, raise_app_exceptions=False)
+	async with AsyncClient(transport=transport, base_url="http://test") as client:
+		yield client
+
+
+@pytest.mark.asyncio
+async def test_idempotency_replays_stored_response(idempotent_client, handler):
+	headers = {'Idempotency-Key': 'key-1'}
+	first = await idempotent_client.post('/items', json={'name': 'a'}, headers=headers)
+	second = await idempotent_client.post('/items', json={'name': 'a'}, headers=headers)
+
+	assert first.status_code == second.status_code == 201
+	assert second.json() == first.json()
+	assert second.headers['idempotent-replayed'] == 'true'
+	assert handler.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_conflict_while_in_flight(idempotent_client, handler):
+	headers = {'Idempotency-Key': 'key-2'}
+	handler.release.clear()
+	first = asyncio.create_task(idempotent_client.post('/items', json={'name': 'a'}, headers=headers))
+	while handler.calls == 0:
+		await asyncio.sleep(0.01)
+
+	second = await idempotent_client.post('/items', json={'name': 'a'}, headers=headers)
+	handler.release.set()
+
+	assert second.status_code == 409
+	assert (await first).status_code == 201
+	assert handler.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_rejects_different_body(idempotent_client, handler):
+	headers = {'Idempotency-Key': 'key-3'}
+	await idempotent_client.post('/items', json={'name': 'a'}, headers=headers)
+	response = await idempotent_client.post('/items', json={'name': 'b'}, headers=headers)
+
+	assert response.status_code == 422
+	assert handler.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_idempotency_failed_handler_runs_once(idempotent_client, handler):
+	handler.fail = True
+	response = await idempotent_client.post('/items', json={'name': 'a'}, headers={'Idempotency-Key': 'key-4'})
+
+	assert response.status_code == 500
+	assert handler.calls == 1
@@ -0,0 +1,27 @@
+import pytest
+
+from import_users import parse_is_active
+
+
+@pytest.mark.parametrize('value, expected', [
+	(None, True),
+	('', True),
+	(True, True),
+	(False, False),
+	(1, True),
+	(0, False),
+	('true', True),
+	('FALSE', False),
+	(' Yes ', True),
+	('no', False),
+	('on', True),
+	('off', False),
+])
+def test_parse_is_active(value, expected):
+	assert parse_is_active(value) is expected
+
+
+@pytest.mark.parametrize('value', ['ture', 'n', 'disabled', 2, '-1'])
+def test_parse_is_active_rejects_unknown_values(value):
+	with pytest.raises(ValueError):
+		parse_is_active(value)
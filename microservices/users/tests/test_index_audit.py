@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from core.db.index_audit import IndexInfo, Finding, find_redundant, find_missing, render_migration
+
+
+class AuditBase(DeclarativeBase):
+	pass
+
+
+class Item(AuditBase):
+	__tablename__ = 'items'
+
+	id: Mapped[int] = mapped_column(primary_key=True)
+	code: Mapped[str] = mapped_column(String)
+	name: Mapped[str] = mapped_column(String)
+
+
+class ItemByCode:
+	model = Item
+	lookup_field = 'code'
+
+
+class ItemsByName:
+	model = Item
+	order_field = 'name'
+
+
+PRIMARY = IndexInfo('items', 'items_pkey', ('id',), (None,), unique=True, primary=True, constraint=True)
+
+
+def test_duplicate_keeps_one_of_a_pair():
+	first = IndexInfo('items', 'ix_items_code_a', ('code',), (None,))
+	second = IndexInfo('items', 'ix_items_code_b', ('code',), (None,))
+
+	findings = find_redundant([PRIMARY, second, first], 'catalog')
+
+	assert [(finding.kind, finding.index.name) for finding in findings] == [('duplicate', 'ix_items_code_b')]
+	assert findings[0].reason == 'duplicates ix_items_code_a'
+
+
+def test_duplicate_drops_the_plain_index_not_the_unique_one():
+	plain = IndexInfo('items', 'ix_a_plain', ('code',), (None,))
+	unique = IndexInfo('items', 'ix_z_unique', ('code',), (None,), unique=True)
+
+	findings = find_redundant([plain, unique], 'catalog')
+
+	assert [finding.index.name for finding in findings] == ['ix_a_plain']
+
+
+def test_duplicate_needs_same_opclasses():
+	default = IndexInfo('items', 'ix_items_code', ('code',), (None,))
+	pattern = IndexInfo('items', 'ix_items_code_pattern', ('code',), ('text_pattern_ops',))
+
+	assert find_redundant([default, pattern], 'catalog') == []
+
+
+def test_prefix_overlap_flags_plain_index_only():
+	composite = IndexInfo('items', 'ix_items_code_name', ('code', 'name'), (None, None))
+	plain = IndexInfo('items', 'ix_items_code', ('code',), (None,))
+	unique = IndexInfo('items', 'uq_items_code', ('code',), (None,), unique=True)
+
+	findings = find_redundant([composite, plain, unique], 'catalog')
+
+	assert [(finding.kind, finding.index.name) for finding in findings] == [('overlapping', 'ix_items_code')]
+	assert findings[0].reason == 'is a prefix of ix_items_code_name'
+
+
+def test_prefix_overlap_ignores_other_methods_and_predicates():
+	composite = IndexInfo('items', 'ix_items_code_name', ('code', 'name'), (None, None))
+	gin = IndexInfo('items', 'ix_items_code_gin', ('code',), (None,), method='gin')
+	partial = IndexInfo('items', 'ix_items_code_partial', ('code',), (None,), predicate='(name IS NULL)')
+
+	assert find_redundant([composite, gin, partial], 'catalog') == []
+
+
+def test_missing_lookup_field():
+	findings = find_missing([PRIMARY], [ItemByCode], 'catalog')
+
+	assert len(findings) == 1
+	assert findings[0].kind == 'missing'
+	assert findings[0].index == IndexInfo('items', 'ix_items_code', ('code',), (None,))
+	assert findings[0].reason == 'used by ItemByCode.lookup_field'
+
+
+@pytest.mark.parametrize('index', [
+	IndexInfo('items', 'ix_items_code', ('code', 'name'), (None, None)),
+	IndexInfo('items', 'ix_items_code', ('code',), (None,), method='hash'),
+	IndexInfo('items', 'ix_items_code', ('code',), ('text_pattern_ops',)),
+])
+def test_lookup_field_covered(index):
+	assert find_missing([PRIMARY, index], [ItemByCode], 'catalog') == []
+
+
+@pytest.mark.parametrize('index, covered', [
+	(IndexInfo('items', 'ix_items_name', ('name',), (None,)), True),
+	(IndexInfo('items', 'ix_items_name', ('name',), (None,), method='hash'), False),
+	(IndexInfo('items', 'ix_items_name', ('name',), ('text_pattern_ops',)), False),
+	(IndexInfo('items', 'ix_items_name', ('name',), (None,), predicate='(code IS NULL)'), False),
+])
+def test_order_field_needs_default_btree(index, covered):
+	findings = find_missing([PRIMARY, index], [ItemsByName], 'catalog')
+
+	assert (findings == []) is covered
+
+
+def test_render_migration():
+	missing = Finding('missing', 'catalog', IndexInfo('items', 'ix_items_code', ('code',), (None,)), "used by X")
+	redundant = Finding('duplicate', 'catalog', IndexInfo(
+		'items', 'ix_items_code_b', ('code',), (None,),
+		definition='CREATE INDEX ix_items_code_b ON public.items USING btree (code)',
+	), "duplicates ix_items_code_a")
+
+	migration = render_migration([missing, redundant], 'abc123', 'def456')
+	compile(migration, 'migration.py', 'exec')
+	upgrade, downgrade = migration.split('def downgrade')
+
+	assert "revision: str = 'abc123'" in migration
+	assert "down_revision: Union[str, None] = 'def456'" in migration
+	assert upgrade.index("op.create_index('ix_items_code', 'items', ['code']") < upgrade.index(
+		"op.drop_index('ix_items_code_b', table_name='items'"
+	)
+	assert 'postgresql_concurrently=True' in upgrade
+	# Undone in reverse order, the dropped index is rebuilt from its definition
+	assert downgrade.index(
+		"op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_items_code_b ON public.items USING btree (code)')"
+	) < downgrade.index("op.drop_index('ix_items_code', table_name='items'")
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, delete, insert, select, text, \
+	update
+
+from core.db.routing import PrimaryPins, RoutingSession, WROTE_KEY
+
+users = Table('users', MetaData(), Column('id', Integer, primary_key=True), Column('email', String))
+
+
+@pytest.fixture
+def pins(monkeypatch):
+	monkeypatch.setattr(PrimaryPins, '_pins', {})
+	monkeypatch.setattr(PrimaryPins, 'window', 5.0)
+	return PrimaryPins
+
+
+def test_pin_expires(pins, monkeypatch):
+	pins.pin('user:1')
+	assert pins.is_pinned('user:1')
+
+	now = time.monotonic()
+	monkeypatch.setattr(time, 'monotonic', lambda: now + 10)
+	assert not pins.is_pinned('user:1')
+
+
+def test_pin_prunes_expired_keys(pins, monkeypatch):
+	now = time.monotonic()
+	monkeypatch.setattr(time, 'monotonic', lambda: now)
+	for i in range(100):
+		pins.pin(f'client:{i}')
+
+	pins.pin('client:0')  # Pinned again, moves behind the others
+	monkeypatch.setattr(time, 'monotonic', lambda: now + 10)
+	pins.pin('client:new')
+
+	assert list(pins._pins) == ['client:new']
+
+
+def test_pin_keeps_live_keys(pins, monkeypatch):
+	now = time.monotonic()
+	for offset, key in ((0, 'user:old'), (3, 'user:recent'), (6, 'user:new')):
+		monkeypatch.setattr(time, 'monotonic', lambda: now + offset)
+		pins.pin(key)
+
+	assert list(pins._pins) == ['user:recent', 'user:new']
+
+
+@pytest.fixture
+def session():
+	with RoutingSession(bind=create_engine('sqlite://')) as session:
+		yield session
+
+
+def test_connection_without_clause_is_not_a_write(session):
+	session.get_bind()
+	session.get_bind(clause=select(users.c.id))
+
+	assert WROTE_KEY not in session.info
+
+
+@pytest.mark.parametrize('clause', [
+	insert(users).values(id=1),
+	update(users).values(email='a'),
+	delete(users),
+	text("UPDATE users SET email = 'a'"),
+])
+def test_dml_is_a_write(session, clause):
+	session.get_bind(clause=clause)
+
+	assert session.info[WROTE_KEY]
+
+
+def test_flush_is_a_write(session, monkeypatch):
+	monkeypatch.setattr(session, '_flushing', True)
+	session.get_bind()
+
+	assert session.info[WROTE_KEY]
@@ -0,0 +1,162 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import schemas
+from core.base_crud import DeleterCRUD, UnitOfWork
+from crud.users import UserStatusUpdater
+from exceptions import UserNotFoundException
+from messaging.events import UserChangedPublisher
+from models import RoleEnum, User
+from services import UserChangeService
+from tests.configurations.cache import InMemoryCache
+from utils.cache import UserETagCache
+
+
+class FakeSession:
+	""" Answers every statement with 'rows', records commits and rollbacks """
+
+	def __init__(self, rows: list[dict]):
+		self.rows = rows
+		self.info = {}
+		self.statements = 0
+		self.commits = 0
+		self.rollbacks = 0
+		self.fail_commit = False
+
+	async def execute(self, stmt, params=None):
+		self.statements += 1
+		return SimpleNamespace(mappings=lambda: SimpleNamespace(all=lambda: self.rows))
+
+	async def commit(self):
+		if self.fail_commit:
+			raise ConnectionError("connection reset")
+
+		self.commits += 1
+
+	async def rollback(self):
+		self.rollbacks += 1
+
+
+def user_row(user_id: uuid.UUID) -> dict:
+	return {'id': user_id, 'role': RoleEnum.user, 'is_active': False, 'credential_generation': 0, 'version': 2}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+	cache = InMemoryCache()
+	monkeypatch.setattr(UserETagCache, '_connection', cache)
+	return cache
+
+
+@pytest.fixture
+def published(monkeypatch):
+	published = []
+
+	async def publish(payload):
+		published.append(payload)
+
+	monkeypatch.setattr(UserChangedPublisher, 'publish', publish)
+	return published
+
+
+@pytest.mark.asyncio
+async def test_writes_commit_once_and_invalidate_after_commit(cache):
+	user_ids = [uuid.uuid4(), uuid.uuid4()]
+	for user_id in user_ids:
+		await UserETagCache.set_stamp(str(user_id), '"v1"')
+
+	db = FakeSession([])
+	updater = UserStatusUpdater(db)
+	async with UnitOfWork(db):
+		for user_id in user_ids:
+			db.rows = [user_row(user_id)]
+			await updater.update(user_id, schemas.UserStatusUpdate(is_active=False))
+
+		assert await UserETagCache.get_stamp(str(user_ids[0])) == '"v1"'  # Not committed yet
+		assert db.commits == 0
+
+	assert db.statements == 2
+	assert db.commits == 1
+	assert 'unit_of_work' not in db.info
+	for user_id in user_ids:
+		assert await UserETagCache.get_stamp(str(user_id)) is None
+
+
+@pytest.mark.asyncio
+async def test_error_rolls_back_and_skips_stamps_and_callbacks(cache):
+	user_id = uuid.uuid4()
+	await UserETagCache.set_stamp(str(user_id), '"v1"')
+	db = FakeSession([user_row(user_id)])
+	called = []
+
+	with pytest.raises(ValueError):
+		async with UnitOfWork(db) as uow:
+			await UserStatusUpdater(db).update(user_id, schemas.UserStatusUpdate(is_active=False))
+			uow.after_commit(lambda: called.append(True))
+			raise ValueError("invalid change")
+
+	assert (db.commits, db.rollbacks) == (0, 1)
+	assert not called
+	assert await UserETagCache.get_stamp(str(user_id)) == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_rolls_back(cache):
+	db = FakeSession([])
+	db.fail_commit = True
+
+	with pytest.raises(ConnectionError):
+		async with UnitOfWork(db):
+			pass
+
+	assert db.rollbacks == 1
+	assert UnitOfWork.get_active(db) is None
+
+
+@pytest.mark.asyncio
+async def test_nested_unit_of_work_is_rejected():
+	db = FakeSession([])
+	async with UnitOfWork(db):
+		with pytest.raises(RuntimeError):
+			async with UnitOfWork(db):
+				pass
+
+
+class UserBatchDeleter(DeleterCRUD):
+	model = User
+	schema = schemas.UserRead
+
+
+@pytest.mark.asyncio
+async def test_self_committing_batches_are_rejected():
+	db = FakeSession([])
+	async with UnitOfWork(db):
+		with pytest.raises(RuntimeError):
+			await UserBatchDeleter(db).destroy_in_batches()
+
+	assert db.statements == 0
+
+
+@pytest.mark.asyncio
+async def test_status_change_is_published_after_commit(cache, published):
+	user_id = uuid.uuid4()
+	db = FakeSession([user_row(user_id)])
+
+	user = await UserChangeService(db).update_status(user_id, schemas.UserStatusUpdate(is_active=False))
+
+	assert user.id == user_id
+	assert db.commits == 1
+	assert published == [user.model_dump(mode='json')]
+
+
+@pytest.mark.asyncio
+async def test_missing_user_is_rolled_back_and_not_published(cache, published):
+	db = FakeSession([])
+
+	with pytest.raises(UserNotFoundException):
+		await UserChangeService(db).update_status(uuid.uuid4(), schemas.UserStatusUpdate(is_active=False))
+
+	assert (db.commits, db.rollbacks) == (0, 1)
+	assert not published
@@ -0,0 +1,38 @@
+from models import RoleEnum, USER_STATS_CORRECTION_SLOT
+from services import UserStatsService
+
+
+def test_corrections_add_the_drift_of_each_group():
+	actual = {'user:1': 5, 'admin:0': 1}
+	counted = {'user:1': 3, 'moderator:1': 2, 'banned:0': 4}
+	counted_after = dict(counted)
+
+	corrections = UserStatsService._get_corrections(actual, counted)
+
+	assert {(row['role'], row['is_active'], row['count']) for row in corrections} == {
+		(RoleEnum.user, True, 2),
+		(RoleEnum.admin, False, 1),
+		(RoleEnum.moderator, True, -2),
+		(RoleEnum.banned, False, -4),
+	}
+	assert all(row['slot'] == USER_STATS_CORRECTION_SLOT for row in corrections)
+	for row in corrections:
+		field = UserStatsService._get_field(row['role'], row['is_active'])
+		counted_after[field] = counted_after.get(field, 0) + row['count']
+
+	assert {field: count for field, count in counted_after.items() if count} == actual
+
+
+def test_no_corrections_without_drift():
+	counts = {'user:1': 3, 'admin:1': 1}
+	assert UserStatsService._get_corrections(counts, dict(counts)) == []
+
+
+def test_stats_schema_sums_groups():
+	stats = UserStatsService._to_schema({'user:1': 3, 'user:0': 2, 'admin:1': 1})
+
+	assert stats.total == 6
+	assert stats.active == 4
+	assert stats.by_role[RoleEnum.user] == 5
+	assert stats.active_by_role[RoleEnum.user] == 3
+	assert stats.by_role[RoleEnum.banned] == 0
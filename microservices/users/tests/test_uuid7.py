@@ -0,0 +1,35 @@
+import time
+import uuid
+
+from core.utils import uuid7
+
+
+def test_uuid7_version_and_variant():
+	value = uuid7()
+
+	assert value.version == 7
+	assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_carries_unix_milliseconds():
+	before = time.time_ns() // 1_000_000
+	value = uuid7()
+	after = time.time_ns() // 1_000_000
+
+	assert before <= value.int >> 80 <= after + 1
+
+
+def test_uuid7_is_strictly_increasing():
+	values = [uuid7() for _ in range(10_000)]
+
+	assert values == sorted(values)
+	assert len(set(values)) == len(values)
+
+
+def test_uuid7_increases_within_one_millisecond(monkeypatch):
+	frozen = time.time_ns()
+	monkeypatch.setattr(time, 'time_ns', lambda: frozen)
+	values = [uuid7() for _ in range(5_000)]  # More than the 12-bit counter holds
+
+	assert all(a < b for a, b in zip(values, values[1:]))
+	assert all(value.version == 7 for value in values)
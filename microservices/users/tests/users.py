@@ -1,9 +1,14 @@
 from asyncio import sleep
 
 import pytest
-from sqlalchemy import select
+import pytest_asyncio
+from sqlalchemy import select, update, delete
 
+from crud.users import UserEmailSearch
+from dependencies import get_user_email_search
+from main import app
 from models import User
+from services import UserStatsService
 from tests.configurations.conftest import test_prepare_database
 from utils import password as p
 
@@ -164,3 +169,131 @@ async def test_blacklist_token_when_logout(auth_client, db):
 		cookies = {"refresh_token": old_refresh_token}
 	)
 	assert response.status_code == 401
+
+
+class SmallCandidateSearch(UserEmailSearch):
+	candidate_limit = 5
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def paged_emails(db):
+	emails = [f'Paged{i:02d}@example.com' for i in range(12)]
+	db.add_all(
+		User(
+			email=email,
+			hashed_password=p.get_password_hash('12345678'),
+		)
+		for email in reversed(emails)
+	)
+	await db.commit()
+	app.dependency_overrides[get_user_email_search] = lambda: SmallCandidateSearch(db)
+	yield emails
+	app.dependency_overrides.pop(get_user_email_search, None)
+
+
+async def search_all_pages(client, params: dict) -> tuple[list[str], bool]:
+	found, after, truncated = [], None, False
+	while True:
+		page_params = {**params, 'limit': 4, **({'after': after} if after else {})}
+		response = await client.get("/api/v1/users/users/search", params=page_params)
+		assert response.status_code == 200
+		found += [user['email'] for user in response.json()]
+		truncated |= response.headers.get('X-Search-Truncated') == 'true'
+		after = response.headers.get('X-Next-After')
+		if after is None:
+			return found, truncated
+
+
+@pytest.mark.asyncio
+async def test_prefix_search_pages_case_insensitively(client, paged_emails):
+	found, truncated = await search_all_pages(client, {'q': 'pAGED'})
+
+	assert found == paged_emails
+	assert not truncated
+
+
+@pytest.mark.asyncio
+async def test_substring_search_reports_truncation(client, paged_emails):
+	found, truncated = await search_all_pages(client, {'q': 'AGED0', 'mode': 'substring'})
+	assert truncated  # 10 matches, 5 candidates per page
+	assert found == sorted(found, key=str.lower)
+	assert set(found) <= set(paged_emails[:10])
+
+	found, truncated = await search_all_pages(client, {'q': 'aged1', 'mode': 'substring'})
+	assert found == paged_emails[10:]
+	assert not truncated
+
+
+@pytest.mark.asyncio
+async def test_list_pages_by_id(client, db):
+	db.add_all(
+		User(email=f"listed{i}@example.com", hashed_password=p.get_password_hash('12345678'))
+		for i in range(7)
+	)
+	await db.commit()
+	user_ids = [str(user_id) for user_id in (await db.execute(select(User.id).order_by(User.id))).scalars()]
+
+	found, after = [], None
+	while True:
+		params = {'limit': 3, **({'after': after} if after else {})}
+		response = await client.get("/api/v1/users/users", params=params)
+		assert response.status_code == 200
+		assert len(response.json()) <= 3
+		found += [user['id'] for user in response.json()]
+		after = response.headers.get('X-Next-After')
+		if after is None:
+			break
+
+	assert found == user_ids
+
+
+@pytest.mark.asyncio
+async def test_change_password_revokes_credentials(client, user):
+	data = {'current_password': user.password, 'password': 'new-password', 'confirm_password': 'new-password'}
+	response = await client.put("/api/v1/users/me/password", json=data, headers={'X-User-Id': str(user.id)})
+	assert response.status_code == 200
+	assert response.json()['credential_generation'] == 1
+
+	data['current_password'] = user.password
+	response = await client.put("/api/v1/users/me/password", json=data, headers={'X-User-Id': str(user.id)})
+	assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_update_status_admins_only(client, db, user):
+	admin = User(
+		email='admin@example.com',
+		hashed_password=p.get_password_hash('12345678'),
+		is_active=True,
+		role='admin',
+	)
+	db.add(admin)
+	await db.commit()
+
+	endpoint = f"/api/v1/users/users/{user.id}/status"
+	response = await client.patch(endpoint, json={'role': 'banned'}, headers={'X-User-Id': str(user.id)})
+	assert response.status_code == 403
+
+	response = await client.patch(endpoint, json={'role': 'banned'}, headers={'X-User-Id': str(admin.id)})
+	assert response.status_code == 200
+	assert response.json()['role'] == 'banned'
+
+
+@pytest.mark.asyncio
+async def test_user_stats_triggers_follow_writes(db):
+	async def counted() -> dict[str, int]:
+		return await UserStatsService(db)._get_db_counts()
+
+	before = await counted()
+	hashed_password = p.get_password_hash('12345678')
+	db.add_all([
+		User(email='stats1@example.com', hashed_password=hashed_password, is_active=True),
+		User(email='stats2@example.com', hashed_password=hashed_password, is_active=True),
+		User(email='stats3@example.com', hashed_password=hashed_password, is_active=False, role='admin'),
+	])
+	await db.flush()
+	await db.execute(update(User).where(User.email == 'stats1@example.com').values(role='moderator'))
+	await db.execute(delete(User).where(User.email == 'stats2@example.com'))
+
+	delta = {field: count - before.get(field, 0) for field, count in (await counted()).items()}
+	assert {field: count for field, count in delta.items() if count} == {'moderator:1': 1, 'admin:0': 1}
@@ -1,2 +1,3 @@
 from .set_confirmation_cache import BaseSetConfirmationCache
-from .get_confirmation_cache import BaseGetConfirmationCache
\ No newline at end of file
+from .get_confirmation_cache import BaseGetConfirmationCache
+from .user_etags import UserETagCache
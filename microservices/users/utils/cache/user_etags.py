@@ -0,0 +1,15 @@
+import uuid
+
+from config import settings
+from core.cache import ETagCache
+
+
+class UserETagCache(ETagCache):
+	key_template: str = settings.USER_ETAG_KEY_TEMPLATE
+	timeout: int = settings.USER_ETAG_TIMEOUT
+	invalidation_window: float = settings.DB_PRIMARY_PIN_SECONDS  # Replica lag bound, as for primary pins
+
+	@classmethod
+	def _get_key(cls, key: str) -> str:
+		""" Keyed on the canonical UUID, any spelling of an id shares its stamp """
+		return super()._get_key(str(uuid.UUID(key)))
@@ -2,9 +2,12 @@ import asyncio
 import signal
 
 from config import settings
+from core.base_connection import connect_all
+from core.cache import CacheConnection
 from core.messaging import MessagingConnection
 from core.loggers import log, sql_logger
-from workers.rpc import UsersAuthenticateRPC
+from services import UserStatsService
+from workers.rpc import UsersAuthenticateRPC, UsersStatesRPC
 
 shutdown_event = asyncio.Event()
 
@@ -16,13 +19,19 @@ def shutdown():
 
 async def main():
 	# workers = (,)
-	RPCs = (UsersAuthenticateRPC, )
-	rabbit = MessagingConnection()
-
-	await rabbit.setup_connection(settings.rabbitmq_url)
+	RPCs = (UsersAuthenticateRPC, UsersStatesRPC)
+	await connect_all(
+		(MessagingConnection, settings.rabbitmq_url),
+		(CacheConnection, settings.redis_url),
+		timeout=settings.STARTUP_TIMEOUT,
+	)
 	for RPC in RPCs:
 		await RPC.register()
 
+	stats_reconciliation = asyncio.create_task(
+		UserStatsService.reconcile_periodically(settings.USER_STATS_RECONCILE_INTERVAL)
+	)
+
 	# await rabbit.setup_connection(settings.rabbitmq_url)
 	# for worker in workers:
 	# 	await worker.create_worker()
@@ -35,7 +44,9 @@ async def main():
 		await shutdown_event.wait()
 	finally:
 		log.info("Shutting down gracefully...")
-		await rabbit.disconnect()
+		stats_reconciliation.cancel()
+		await MessagingConnection.disconnect()
+		await CacheConnection.disconnect()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
+import uuid
+
 from core.messaging import MessagingRPCWorkerABC
-from services import LoginService
+from services import LoginService, UserChangeService
 from core.db import AsyncSessionLocal
 from core.loggers import log
 
@@ -17,3 +19,16 @@ class UsersAuthenticateRPC(MessagingRPCWorkerABC):
 			data = await login_service.authenticate(username, password)
 
 		return data
+
+
+class UsersStatesRPC(MessagingRPCWorkerABC):
+	queue_name: str = 'rpc.users.states'
+
+	@staticmethod
+	async def callback(after: str | None = None, limit: int = 1_000) -> dict:
+		log.info(f'[x] RPC | USERS received AUTH call <states after: {after}>')
+		async with AsyncSessionLocal() as db:
+			change_service = UserChangeService(db)
+			users = await change_service.get_states(uuid.UUID(after) if after else None, limit)
+
+		return {'users': users}